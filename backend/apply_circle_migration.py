@@ -2,6 +2,8 @@
 """
 Apply Circle API migration to PostgreSQL database
 Adds new columns for Circle wallet integration
+
+Superseded by migration 0002 (python migrate.py); kept for databases managed by hand.
 """
 import psycopg2
 import os
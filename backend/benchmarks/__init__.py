@@ -0,0 +1 @@
+# Benchmark harnesses (run from backend/: python -m benchmarks.<name>)
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Circle Developer-Controlled Wallets API.
+
+Implements the endpoints CircleAPI calls, so the payout path can be load tested
+offline (no api.circle.com, no testnet USDC):
+    GET  /v1/w3s/config/entity/publicKey
+    POST /v1/w3s/developer/transactions/transfer
+    GET  /v1/w3s/developer/transactions/{id}
+    GET  /v1/w3s/developer/transactions?walletIds=...&pageSize=...
+    GET  /v1/w3s/developer/wallets
+    GET  /v1/w3s/developer/wallets/balances
+    GET  /v1/w3s/developer/wallets/{id}
+    GET  /v1/w3s/developer/wallets/{id}/balances
+plus GET /_fake/stats (request, rejection and transaction-state counters).
+
+Behaviour is configurable:
+  - latency: every /v1 request waits latency_ms +/- jitter_ms (asyncio.sleep, so
+    thousands of requests can be in flight)
+  - rate limit: a token bucket of rate_limit requests/second (burst = one second's
+    worth); excess requests get 429 with Retry-After
+  - errors: error_rate of /v1 requests fail with 500 before doing anything
+  - state transitions: an accepted transfer is INITIATED and moves through
+    QUEUED -> SENT -> CONFIRMED -> COMPLETE after state_delays seconds per step;
+    fail_rate of them end in FAILED instead (and debit nothing)
+Wallets are created on first use holding `balance` USDC; transfers debit them and
+are refused with 400 when the balance is short. A repeated idempotencyKey returns
+the original transaction.
+
+Point the backend at it with
+    CIRCLE_API_BASE_URL=http://127.0.0.1:8787 CIRCLE_API_KEY=TEST_API_KEY:fake:fake
+
+Usage (from backend/):
+    python -m benchmarks.fake_circle --port 8787 --latency-ms 80 --jitter-ms 40 \\
+        --rate-limit 100 --error-rate 0.01 --fail-rate 0.02 --balance 10000000
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.money import MICRO_PER_USDC, format_usdc
+
+USDC_TOKEN_ID = "15dc2b5d-0994-58b0-bf8c-3a0501148ee8"  # ARC-TESTNET USDC, as in CircleAPI
+BLOCKCHAIN = "ARC-TESTNET"
+STATES = ("INITIATED", "QUEUED", "SENT", "CONFIRMED", "COMPLETE")
+ADDRESS_RE = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+@dataclass
+class FakeCircleConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_limit: float = 0.0  # Requests/second across all /v1 endpoints; 0 = unlimited
+    error_rate: float = 0.0  # Fraction of /v1 requests answered with 500
+    fail_rate: float = 0.0  # Fraction of accepted transfers that end FAILED
+    state_delays: Tuple[float, ...] = (0.5, 1.0, 2.0, 1.0)  # Seconds spent in each state before COMPLETE
+    balance: float = 1_000_000.0  # USDC in a wallet the first time it is seen
+    seed: Optional[int] = None
+
+
+class CircleError(Exception):
+    """An error answered in Circle's {"code", "message"} shape"""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers
+
+
+class FakeTransaction:
+    __slots__ = ("id", "wallet_id", "destination", "amount_micro", "created", "created_at", "failed")
+
+    def __init__(self, wallet_id: str, destination: str, amount_micro: int, failed: bool):
+        self.id = str(uuid.uuid4())
+        self.wallet_id = wallet_id
+        self.destination = destination
+        self.amount_micro = amount_micro
+        self.created = time.monotonic()
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.failed = failed
+
+
+class FakeCircle:
+    """In-memory wallets and transactions behind the fake API (one event loop, no locks)"""
+
+    def __init__(self, config: FakeCircleConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.public_key_pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        self.balances: Dict[str, int] = {}  # wallet id -> micro-USDC
+        self.transactions: Dict[str, FakeTransaction] = {}
+        self.by_wallet: Dict[str, List[FakeTransaction]] = {}
+        self.idempotency: Dict[str, FakeTransaction] = {}
+        # Cumulative seconds at which a transaction leaves each state
+        self.state_deadlines = [sum(config.state_delays[:i + 1]) for i in range(len(config.state_delays))]
+        self.tokens = config.rate_limit
+        self.refilled = time.monotonic()
+        self.counters = {"requests": 0, "rate_limited": 0, "injected_errors": 0,
+                         "transfers": 0, "transfers_rejected": 0, "idempotent_replays": 0}
+
+    # Request gate: rate limit, injected errors, latency
+    def take_token(self) -> Optional[float]:
+        """None if the request may proceed, else the seconds until a token is available"""
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return None
+        now = time.monotonic()
+        self.tokens = min(rate, self.tokens + (now - self.refilled) * rate)
+        self.refilled = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / rate
+
+    async def gate(self, request: Request):
+        self.counters["requests"] += 1
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            raise CircleError(401, "Malformed authorization")
+        wait = self.take_token()
+        if wait is not None:
+            self.counters["rate_limited"] += 1
+            raise CircleError(429, "Too many requests", {"Retry-After": str(max(1, round(wait)))})
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            self.counters["injected_errors"] += 1
+            raise CircleError(500, "Injected failure")
+        delay = self.config.latency_ms + self.random.uniform(-1, 1) * self.config.jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    # Wallets
+    def wallet_balance(self, wallet_id: str) -> int:
+        if wallet_id not in self.balances:
+            self.balances[wallet_id] = round(self.config.balance * MICRO_PER_USDC)
+        return self.balances[wallet_id]
+
+    @staticmethod
+    def wallet_address(wallet_id: str) -> str:
+        return "0x" + hashlib.sha256(wallet_id.encode()).hexdigest()[:40]
+
+    def token_balances(self, wallet_id: str) -> list:
+        return [{
+            "token": {"id": USDC_TOKEN_ID, "blockchain": BLOCKCHAIN, "symbol": "USDC",
+                      "name": "USDC", "decimals": 6, "isNative": False},
+            "amount": format_usdc(self.wallet_balance(wallet_id)),
+            "updateDate": datetime.now(timezone.utc).isoformat(),
+        }]
+
+    def wallet(self, wallet_id: str) -> dict:
+        self.wallet_balance(wallet_id)
+        return {"id": wallet_id, "address": self.wallet_address(wallet_id), "blockchain": BLOCKCHAIN,
+                "state": "LIVE", "custodyType": "DEVELOPER", "walletSetId": None}
+
+    # Transactions
+    def state(self, transaction: FakeTransaction) -> str:
+        elapsed = time.monotonic() - transaction.created
+        for state, deadline in zip(STATES, self.state_deadlines):
+            if elapsed < deadline:
+                return state
+        return "FAILED" if transaction.failed else "COMPLETE"
+
+    def transaction_view(self, transaction: FakeTransaction) -> dict:
+        state = self.state(transaction)
+        sent = state not in ("INITIATED", "QUEUED") and state != "FAILED"
+        return {
+            "id": transaction.id,
+            "state": state,
+            "blockchain": BLOCKCHAIN,
+            "walletId": transaction.wallet_id,
+            "sourceAddress": self.wallet_address(transaction.wallet_id),
+            "destinationAddress": transaction.destination,
+            "amounts": [format_usdc(transaction.amount_micro)],
+            "tokenId": USDC_TOKEN_ID,
+            "transactionType": "OUTBOUND",
+            "txHash": "0x" + hashlib.sha256(transaction.id.encode()).hexdigest() if sent else None,
+            "errorReason": "FAILED_ON_CHAIN" if state == "FAILED" else None,
+            "createDate": transaction.created_at,
+        }
+
+    def transfer(self, body: dict) -> Tuple[int, FakeTransaction]:
+        """(HTTP status, transaction) for a transfer request"""
+        key = body.get("idempotencyKey")
+        if not key:
+            raise CircleError(400, "idempotencyKey is required")
+        if key in self.idempotency:
+            self.counters["idempotent_replays"] += 1
+            return 200, self.idempotency[key]
+        if not body.get("entitySecretCiphertext"):
+            raise CircleError(400, "entitySecretCiphertext is required")
+        wallet_id = body.get("walletId") or body.get("walletAddress")
+        if not wallet_id:
+            raise CircleError(400, "walletId or walletAddress is required")
+        if not (body.get("tokenId") or body.get("tokenAddress")):
+            raise CircleError(400, "tokenId or tokenAddress is required")
+        destination = body.get("destinationAddress") or ""
+        if not ADDRESS_RE.match(destination):
+            raise CircleError(400, f"Invalid destinationAddress: {destination}")
+        amounts = body.get("amounts") or []
+        try:
+            amount_micro = int(Decimal(amounts[0]) * MICRO_PER_USDC)
+        except (IndexError, InvalidOperation, TypeError):
+            raise CircleError(400, f"Invalid amounts: {amounts}")
+        if amount_micro <= 0:
+            raise CircleError(400, f"Invalid amounts: {amounts}")
+        if self.wallet_balance(wallet_id) < amount_micro:
+            self.counters["transfers_rejected"] += 1
+            raise CircleError(400, "Insufficient token balance")
+
+        failed = bool(self.config.fail_rate) and self.random.random() < self.config.fail_rate
+        transaction = FakeTransaction(wallet_id, destination, amount_micro, failed)
+        if not failed:
+            self.balances[wallet_id] -= amount_micro
+        self.transactions[transaction.id] = transaction
+        self.by_wallet.setdefault(wallet_id, []).append(transaction)
+        self.idempotency[key] = transaction
+        self.counters["transfers"] += 1
+        return 201, transaction
+
+    def stats(self) -> dict:
+        states: Dict[str, int] = {}
+        for transaction in self.transactions.values():
+            state = self.state(transaction)
+            states[state] = states.get(state, 0) + 1
+        transferred = sum(t.amount_micro for t in self.transactions.values() if not t.failed)
+        return {**self.counters, "states": states, "transferred": format_usdc(transferred),
+                "wallets": {wallet_id: format_usdc(micro) for wallet_id, micro in self.balances.items()}}
+
+
+def create_app(fake: FakeCircle) -> FastAPI:
+    app = FastAPI(title="Fake Circle API")
+    api = APIRouter(prefix="/v1/w3s", dependencies=[Depends(fake.gate)])
+
+    @app.exception_handler(CircleError)
+    async def circle_error(request: Request, exc: CircleError):
+        return JSONResponse({"code": exc.status_code, "message": exc.message},
+                            status_code=exc.status_code, headers=exc.headers)
+
+    @api.get("/config/entity/publicKey")
+    async def public_key():
+        return {"data": {"publicKey": fake.public_key_pem}}
+
+    @api.post("/developer/transactions/transfer")
+    async def transfer(request: Request):
+        status, transaction = fake.transfer(await request.json())
+        return JSONResponse({"data": {"id": transaction.id, "state": fake.state(transaction)}}, status_code=status)
+
+    @api.get("/developer/transactions/{transaction_id}")
+    async def get_transaction(transaction_id: str):
+        transaction = fake.transactions.get(transaction_id)
+        if transaction is None:
+            raise CircleError(404, "Cannot find the transaction")
+        return {"data": {"transaction": fake.transaction_view(transaction)}}
+
+    @api.get("/developer/transactions")
+    async def list_transactions(walletIds: str = "", pageSize: int = 10):
+        transactions = [t for wallet_id in walletIds.split(",") if wallet_id
+                        for t in fake.by_wallet.get(wallet_id, [])]
+        transactions.sort(key=lambda t: t.created, reverse=True)
+        return {"data": {"transactions": [fake.transaction_view(t) for t in transactions[:pageSize]]}}
+
+    @api.get("/developer/wallets")
+    async def list_wallets():
+        return {"data": {"wallets": [fake.wallet(wallet_id) for wallet_id in fake.balances]}}
+
+    # Declared before /developer/wallets/{wallet_id} so "balances" is not taken for a wallet id
+    @api.get("/developer/wallets/balances")
+    async def all_balances(pageSize: int = 50):
+        return {"data": {"wallets": [
+            {**fake.wallet(wallet_id), "tokenBalances": fake.token_balances(wallet_id)}
+            for wallet_id in list(fake.balances)[:pageSize]
+        ]}}
+
+    @api.get("/developer/wallets/{wallet_id}")
+    async def get_wallet(wallet_id: str):
+        return {"data": {"wallet": fake.wallet(wallet_id)}}
+
+    @api.get("/developer/wallets/{wallet_id}/balances")
+    async def wallet_balances(wallet_id: str):
+        return {"data": {"tokenBalances": fake.token_balances(wallet_id)}}
+
+    @app.get("/_fake/stats")
+    async def stats():
+        return fake.stats()
+
+    app.include_router(api)
+    return app
+
+
+class FakeCircleServer:
+    """The fake API served by uvicorn on a background thread (for benchmarks in the same process)"""
+
+    def __init__(self, config: Optional[FakeCircleConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+
+        self.fake = FakeCircle(config or FakeCircleConfig())
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port))  # Port 0: any free port
+        self.url = f"http://{host}:{self.socket.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(
+            create_app(self.fake), log_level="warning", access_log=False, backlog=4096
+        ))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]},
+                                       name="fake-circle", daemon=True)
+
+    def start(self) -> "FakeCircleServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Fake Circle server failed to start")
+            time.sleep(0.01)
+        print(f"[FAKE CIRCLE] Listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+        self.socket.close()
+
+    def __enter__(self) -> "FakeCircleServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def parse_config(args: argparse.Namespace) -> FakeCircleConfig:
+    return FakeCircleConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        fail_rate=args.fail_rate,
+        state_delays=tuple(args.state_delays),
+        balance=args.balance,
+        seed=args.seed,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Latency varies uniformly by +/- this")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second before 429 (0: unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of transfers ending FAILED")
+    parser.add_argument("--state-delays", type=float, nargs=4, default=[0.5, 1.0, 2.0, 1.0],
+                        metavar=("INITIATED", "QUEUED", "SENT", "CONFIRMED"),
+                        help="Seconds spent in each state before COMPLETE")
+    parser.add_argument("--balance", type=float, default=1_000_000.0, help="USDC in each new wallet")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a local fake of the Circle wallets API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    config = parse_config(args)
+    print(f"[FAKE CIRCLE] {config}")
+    print(f"[FAKE CIRCLE] CIRCLE_API_BASE_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(FakeCircle(config)), host=args.host, port=args.port,
+                log_level="warning", access_log=False, backlog=4096)
+
+
+if __name__ == "__main__":
+    main()
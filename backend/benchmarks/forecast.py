@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo forecast benchmark: wall time by process count.
+
+Runs ForecastEngine on synthetic inputs (N workers, 12 months of revenue and
+spending history) once per --processes value, with the same seed, and checks
+that every pool size returns the same forecast. Worker attrition is what makes
+a forecast expensive (one draw per scenario, worker and forecast).
+
+Usage (from backend/, numpy required):
+    python -m benchmarks.forecast --workers 20000 --scenarios 10000 --processes 1 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.forecast import ForecastEngine, ForecastInputs
+from src.money import MICRO_PER_USDC
+
+
+def make_inputs(rng: np.random.Generator, workers: int) -> ForecastInputs:
+    salaries = rng.integers(1_000, 20_000, size=workers) * MICRO_PER_USDC
+    payroll = int(salaries.sum())
+    return ForecastInputs(
+        starting_balance_micro=payroll,
+        salaries=salaries,
+        revenue_history=(payroll * rng.uniform(0.8, 1.3, size=12)).astype(np.int64),
+        spending_history=(payroll * rng.uniform(0.05, 0.2, size=12)).astype(np.int64),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Monte Carlo cash-flow forecast")
+    parser.add_argument("--workers", type=int, default=20_000)
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--attrition", type=float, default=0.02)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    inputs = make_inputs(np.random.default_rng(args.seed), args.workers)
+    print(f"[BENCH] {args.scenarios:,} scenarios x {args.months} months, {args.workers:,} workers, "
+          f"attrition {args.attrition:.1%}/month, {os.cpu_count()} CPU(s)")
+
+    baseline = None
+    for processes in args.processes:
+        engine = ForecastEngine(processes)
+        if processes > 1:
+            engine.run(inputs, args.months, args.scenarios, attrition_rate=args.attrition)  # Starts the pool
+        start = time.perf_counter()
+        result = engine.run(inputs, args.months, args.scenarios, attrition_rate=args.attrition, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        engine.shutdown()
+        summary = (result["insolvency_probability"], result["per_month"])
+        same = baseline is None or summary == baseline
+        baseline = baseline or summary
+        print(f"  {processes:>3} process(es) {elapsed * 1000:>10.1f} ms   "
+              f"P(insolvent by month {args.months}) = {result['insolvency_probability']:.4f}"
+              f"{'' if same else '   MISMATCH'}")
+        if not same:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
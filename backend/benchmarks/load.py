@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test: latency percentiles and throughput per API scenario.
+
+Starts the backend (uvicorn, throwaway SQLite database) and the Circle stand-in
+(benchmarks/fake_circle.py) as subprocesses, seeds N companies through the API
+with skewed sizes (log-normal workers per company, Zipf-weighted departments,
+log-normal salaries, 12 months of revenue, spendings), then drives each
+scenario at a fixed concurrency:
+    payroll_run          POST /api/payroll/execute, polled to completion
+                         (latency = run wall time, payouts_per_second)
+    payroll_preflight    POST /api/payroll/preflight
+    login                POST /api/auth/login (bcrypt)
+    dashboard_stats      GET  /api/dashboard/stats
+    list_departments     GET  /api/departments/
+    list_workers         GET  /api/workers/ (full list)
+    list_workers_page    GET  /api/workers/?limit=100
+    list_spendings       GET  /api/spendings/
+    list_transactions    GET  /api/payroll/transactions?limit=100
+Payroll runs first, so the transaction lists have rows to page through.
+
+Results (p50/p95/p99/max latency, throughput, errors) are written as JSON with
+--save and compared with a stored run with --baseline: a scenario regresses when
+its p95 or p99 grows, or its throughput drops, by more than --tolerance (and
+p95/p99 by at least --min-delta-ms), or when it has errors the baseline did not.
+The exit status is 1 on any regression.
+
+Usage (from backend/):
+    python -m benchmarks.load --companies 20 --workers 200 --concurrency 16 --save load-baseline.json
+    python -m benchmarks.load --companies 20 --workers 200 --concurrency 16 --baseline load-baseline.json
+    python -m benchmarks.load --url http://127.0.0.1:8000 --no-payroll   # an already running backend
+Against --url the backend must already point at a Circle stand-in (CIRCLE_API_BASE_URL)
+for the payroll scenarios; registered benchmark users are not cleaned up.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_PASSWORD = "benchmark-password"
+BENCHMARK_ENTITY_SECRET = "ab" * 32
+DEPARTMENT_NAMES = [
+    "Engineering", "Sales", "Operations", "Support", "Marketing", "Finance",
+    "Product", "Design", "Legal", "People", "Research", "Security",
+]
+READ_SCENARIOS = [
+    "payroll_preflight", "login", "dashboard_stats", "list_departments", "list_workers",
+    "list_workers_page", "list_spendings", "list_transactions",
+]
+PERCENTILES = (50, 95, 99)
+
+
+# Processes under test
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_stack(args, workdir: str) -> List[subprocess.Popen]:
+    """Fake Circle + backend on free ports; sets args.url. Output goes to log files in workdir."""
+    circle_port, backend_port = free_port(), free_port()
+    circle_url = f"http://127.0.0.1:{circle_port}"
+    args.url = f"http://127.0.0.1:{backend_port}"
+    circle = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_circle", "--port", str(circle_port),
+         "--latency-ms", str(args.circle_latency_ms), "--jitter-ms", str(args.circle_latency_ms / 2),
+         "--rate-limit", str(args.circle_rate_limit), "--state-delays", "0.1", "0.1", "0.1", "0.1",
+         "--balance", "1000000000", "--seed", str(args.seed)],
+        cwd=BACKEND_DIR, stdout=open(os.path.join(workdir, "fake_circle.log"), "w"), stderr=subprocess.STDOUT,
+    )
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        MIGRATE_ON_START="true",
+        CIRCLE_API_BASE_URL=circle_url,
+        CIRCLE_API_KEY="TEST_API_KEY:benchmark:benchmark",
+        ENTITY_SECRET=BENCHMARK_ENTITY_SECRET,
+        PAYOUT_CONCURRENCY=str(args.payout_concurrency),
+        # Client-side Circle limit matches the stand-in's (0 = off), so the backend is what gets measured
+        CIRCLE_RATE_LIMIT=str(args.circle_rate_limit),
+    )
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(backend_port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=open(os.path.join(workdir, "backend.log"), "w"), stderr=subprocess.STDOUT,
+    )
+    processes = [circle, backend]
+    try:
+        wait_until_up(f"{circle_url}/_fake/stats", circle)
+        wait_until_up(f"{args.url}/health", backend)
+    except Exception:
+        stop_stack(processes)
+        raise
+    print(f"[LOAD] Backend {args.url}, Circle stand-in {circle_url}, logs in {workdir}")
+    return processes
+
+
+def stop_stack(processes: List[subprocess.Popen]):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# HTTP
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    """One keep-alive session per driver thread"""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+        _local.session.mount("http://", HTTPAdapter(pool_maxsize=4))
+    return _local.session
+
+
+def call(method: str, url: str, token: Optional[str] = None, **kwargs) -> requests.Response:
+    headers = kwargs.pop("headers", {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    response = session().request(method, url, headers=headers, timeout=120, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+# Seeding
+class Tenant:
+    __slots__ = ("email", "token", "workers")
+
+    def __init__(self, email: str, token: str, workers: int):
+        self.email = email
+        self.token = token
+        self.workers = workers
+
+
+def company_sizes(rng: random.Random, companies: int, mean_workers: int, sigma: float = 1.0) -> List[int]:
+    """Log-normal workers per company with the given mean: a few large tenants, many small ones"""
+    mu = math.log(max(mean_workers, 1)) - sigma ** 2 / 2
+    return [max(1, round(rng.lognormvariate(mu, sigma))) for _ in range(companies)]
+
+
+def random_wallet(rng: random.Random) -> str:
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+
+
+def seed_company(base: str, index: int, workers: int, run_id: str, seed_value: int) -> Tenant:
+    rng = random.Random(seed_value * 100_003 + index)
+    email = f"load-{run_id}-{index}@example.com"
+    token = call("POST", f"{base}/api/auth/register", json={
+        "email": email, "password": BENCHMARK_PASSWORD, "company_name": f"Load Company {index}"
+    }).json()["access_token"]
+    call("PUT", f"{base}/api/company/master-wallet", token, json={
+        "master_wallet_address": random_wallet(rng), "circle_wallet_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    })
+
+    department_count = min(len(DEPARTMENT_NAMES), 1 + int(math.log2(workers + 1)))
+    department_ids = [
+        call("POST", f"{base}/api/departments/", token, json={"name": name}).json()["id"]
+        for name in rng.sample(DEPARTMENT_NAMES, department_count)
+    ]
+    weights = [1 / (rank + 1) for rank in range(department_count)]  # Zipf: one big department, a long tail
+    rows = "".join(json.dumps({
+        "name": f"Worker{n}", "surname": f"Load{index}",
+        "salary": f"{min(40_000.0, max(1_200.0, rng.lognormvariate(math.log(4_200), 0.45))):.2f}",
+        "wallet_address": random_wallet(rng),
+        "department_id": rng.choices(department_ids, weights)[0],
+    }) + "\n" for n in range(workers))
+    report = call("POST", f"{base}/api/workers/import", token, params={"format": "ndjson"},
+                  data=rows.encode(), headers={"Content-Type": "application/x-ndjson"}).json()
+    if report["failed"]:
+        raise RuntimeError(f"Seeding company {index}: {report['errors'][:3]}")
+
+    monthly_payroll = workers * 4_600
+    today = date.today()
+    for back in range(12):
+        month_index = today.year * 12 + today.month - 1 - back
+        call("POST", f"{base}/api/revenue/", token, json={
+            "amount": f"{monthly_payroll * rng.uniform(1.05, 1.6):.2f}",
+            "month": month_index % 12 + 1, "year": month_index // 12,
+        })
+    for n in range(rng.randint(5, 25)):
+        call("POST", f"{base}/api/spendings/", token, json={
+            "name": f"Spending {n}", "amount": f"{rng.lognormvariate(math.log(800), 0.9):.2f}",
+            "wallet_address": random_wallet(rng),
+            "department_id": rng.choice(department_ids + [None]),
+        })
+    return Tenant(email, token, workers)
+
+
+def seed(args) -> List[Tenant]:
+    rng = random.Random(args.seed)
+    sizes = company_sizes(rng, args.companies, args.workers)
+    run_id = uuid.uuid4().hex[:8]  # Unique emails, so --url targets can be loaded repeatedly
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        tenants = list(executor.map(
+            lambda item: seed_company(args.url, item[0], item[1], run_id, args.seed), enumerate(sizes)
+        ))
+    print(f"[LOAD] Seeded {len(tenants)} companies, {sum(sizes):,} workers "
+          f"(min {min(sizes)}, median {sorted(sizes)[len(sizes) // 2]}, max {max(sizes)}) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return tenants
+
+
+# Measurement
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return sorted_values[max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+def summarize(latencies: List[float], errors: int, wall: float, concurrency: int) -> dict:
+    values = sorted(latencies)
+    total = len(values) + errors
+    result = {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else None,
+        "max_ms": round(values[-1] * 1000, 2) if values else None,
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(percentile(values, p) * 1000, 2) if values else None
+    return result
+
+
+def drive(request: Callable[[int], None], total: int, concurrency: int, warmup: int) -> dict:
+    """Call request(i) `total` times from `concurrency` threads; a raised exception counts as an error"""
+    def timed(i: int):
+        start = time.perf_counter()
+        try:
+            request(i)
+        except Exception as e:
+            return None, e
+        return time.perf_counter() - start, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(warmup)))
+        start = time.perf_counter()
+        results = list(executor.map(timed, range(total)))
+        wall = time.perf_counter() - start
+    latencies = [latency for latency, _ in results if latency is not None]
+    failures = [error for _, error in results if error is not None]
+    if failures:
+        print(f"[LOAD]   {len(failures)} error(s), first: {failures[0]}")
+    return summarize(latencies, len(failures), wall, concurrency)
+
+
+def scenario_requests(base: str, tenants: List[Tenant], period: dict) -> Dict[str, Callable[[int], None]]:
+    def get(path: str, **params):
+        return lambda i: call("GET", f"{base}{path}", tenants[i % len(tenants)].token, params=params or None).content
+
+    return {
+        "payroll_preflight": lambda i: call("POST", f"{base}/api/payroll/preflight",
+                                            tenants[i % len(tenants)].token, json=period),
+        "login": lambda i: call("POST", f"{base}/api/auth/login", json={
+            "email": tenants[i % len(tenants)].email, "password": BENCHMARK_PASSWORD}),
+        "dashboard_stats": get("/api/dashboard/stats"),
+        "list_departments": get("/api/departments/"),
+        "list_workers": get("/api/workers/"),
+        "list_workers_page": get("/api/workers/", limit=100),
+        "list_spendings": get("/api/spendings/"),
+        "list_transactions": get("/api/payroll/transactions", limit=100),
+    }
+
+
+def run_payrolls(base: str, tenants: List[Tenant], period: dict, concurrency: int) -> dict:
+    """Execute payroll for every tenant, `concurrency` runs at a time; latency = run wall time"""
+    def run(i: int):
+        tenant = tenants[i]
+        progress = call("POST", f"{base}/api/payroll/execute", tenant.token, json=period).json()
+        while progress["status"] in ("queued", "running"):
+            time.sleep(0.05)
+            progress = call("GET", f"{base}/api/payroll/runs/{progress['run_id']}", tenant.token).json()
+        if progress["status"] != "completed" or progress["failed"]:
+            raise RuntimeError(f"run {progress['run_id']}: {progress['status']}, "
+                               f"{progress['failed']} failed payout(s), {progress.get('error')}")
+
+    start = time.perf_counter()
+    result = drive(run, len(tenants), concurrency, warmup=0)
+    wall = time.perf_counter() - start
+    payouts = sum(tenant.workers for tenant in tenants)
+    result["payouts"] = payouts
+    result["payouts_per_second"] = round(payouts / wall, 2)
+    return result
+
+
+# Baselines
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regression messages for scenarios present in both runs"""
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if now[key] is None or before[key] is None:
+                continue
+            if now[key] > before[key] * (1 + tolerance) and now[key] - before[key] >= min_delta_ms:
+                regressions.append(f"{name}: {key} {before[key]} -> {now[key]}")
+        if now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput_rps {before['throughput_rps']} -> {now['throughput_rps']}")
+        if now["errors"] / max(now["requests"], 1) > before["errors"] / max(before["requests"], 1):
+            regressions.append(f"{name}: errors {before['errors']}/{before['requests']} -> "
+                               f"{now['errors']}/{now['requests']}")
+    return regressions
+
+
+def delta(now: Optional[float], before: Optional[float]) -> str:
+    if now is None or not before:
+        return ""
+    return f"{(now - before) / before:+.0%}"
+
+
+def print_report(current: dict, baseline: Optional[dict]):
+    print(f"\n  {'scenario':<20} {'req':>6} {'err':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+          f"{'   vs baseline (p95 / rps)' if baseline else ''}")
+    for name, result in current["scenarios"].items():
+        line = (f"  {name:<20} {result['requests']:>6} {result['errors']:>4} {result['throughput_rps']:>9.1f} "
+                f"{result['p50_ms'] or 0:>9.1f} {result['p95_ms'] or 0:>9.1f} {result['p99_ms'] or 0:>9.1f}")
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before:
+            line += f"   {delta(result['p95_ms'], before['p95_ms']):>6} / {delta(result['throughput_rps'], before['throughput_rps'])}"
+        print(line)
+    payroll = current["scenarios"].get("payroll_run")
+    if payroll:
+        print(f"\n  payroll: {payroll['payouts']:,} payouts, {payroll['payouts_per_second']:.1f} payouts/s")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test of the BossBoard API")
+    parser.add_argument("--url", default=None, help="Load an already running backend instead of starting one")
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=100, help="Mean workers per company (log-normal)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight per scenario")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=READ_SCENARIOS, default=READ_SCENARIOS)
+    parser.add_argument("--no-payroll", action="store_true", help="Skip the payroll_run scenario")
+    parser.add_argument("--payroll-concurrency", type=int, default=2, help="Payroll runs in flight")
+    parser.add_argument("--payout-concurrency", type=int, default=8, help="PAYOUT_CONCURRENCY of the backend")
+    parser.add_argument("--circle-latency-ms", type=float, default=50.0)
+    parser.add_argument("--circle-rate-limit", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Compare with a results JSON written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore smaller p95/p99 increases")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    workdir = tempfile.mkdtemp(prefix="bossboard-load-")
+    processes = [] if args.url else start_stack(args, workdir)
+    try:
+        tenants = seed(args)
+        today = date.today()
+        period = {"period_start": date(today.year, today.month, 1).isoformat(), "period_end": today.isoformat()}
+        scenarios = {}
+        if not args.no_payroll:
+            print(f"[LOAD] payroll_run: {len(tenants)} run(s), {args.payroll_concurrency} at a time")
+            scenarios["payroll_run"] = run_payrolls(args.url, tenants, period, args.payroll_concurrency)
+        requests_by_name = scenario_requests(args.url, tenants, period)
+        for name in args.scenarios:
+            print(f"[LOAD] {name}: {args.requests} request(s), {args.concurrency} at a time")
+            scenarios[name] = drive(requests_by_name[name], args.requests, args.concurrency, args.warmup)
+    finally:
+        stop_stack(processes)
+
+    # What the numbers depend on (not where they are written or how they are compared)
+    config = {k: v for k, v in vars(args).items()
+              if k not in ("save", "baseline", "url", "tolerance", "min_delta_ms")}
+    current = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": config,
+        },
+        "scenarios": scenarios,
+    }
+    print_report(current, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n[LOAD] Results written to {args.save}")
+    if baseline is not None:
+        if baseline.get("meta", {}).get("config") != config:
+            print("[LOAD] Warning: baseline was recorded with different settings")
+        regressions = compare(current, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n[LOAD] {len(regressions)} regression(s) vs {args.baseline} "
+                  f"(commit {baseline.get('meta', {}).get('git_commit')}):")
+            for regression in regressions:
+                print(f"  - {regression}")
+            raise SystemExit(1)
+        print(f"\n[LOAD] No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
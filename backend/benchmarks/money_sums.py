@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Money aggregation benchmark: integer micro-USDC vs float amounts.
+
+Builds a table with N payroll-sized amounts stored both ways and compares
+  - SQL SUM over the BIGINT micro-USDC column (what /api/dashboard/stats does now)
+  - loading float rows and summing in Python (what it did before)
+  - per-value str() vs format_usdc_many() (a per-value loop with cached suffixes)
+and reports how far the float total drifts from the exact one.
+
+Usage (from backend/):
+    python -m benchmarks.money_sums --rows 1000000
+"""
+import argparse
+import random
+import sqlite3
+import time
+from decimal import Decimal
+
+from src.money import MICRO_PER_USDC, format_usdc, format_usdc_many, from_micro
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44} {elapsed * 1000:>10.1f} ms")
+    return value, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs float money aggregation")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Whole-cent amounts between 0.01 and 9,999.99 USDC
+    micros = [rng.randint(1, 999_999) * (MICRO_PER_USDC // 100) for _ in range(args.rows)]
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE amounts (id INTEGER PRIMARY KEY, amount_micro BIGINT NOT NULL, amount REAL NOT NULL)")
+    conn.executemany(
+        "INSERT INTO amounts (amount_micro, amount) VALUES (?, ?)",
+        ((m, m / MICRO_PER_USDC) for m in micros),
+    )
+    conn.commit()
+    print(f"[BENCH] {args.rows:,} rows\n")
+
+    print("Aggregation:")
+    exact_micro, sql_time = timed(
+        "SQL SUM(amount_micro)",
+        lambda: conn.execute("SELECT SUM(amount_micro) FROM amounts").fetchone()[0],
+    )
+    float_total, python_time = timed(
+        "fetch floats + Python sum()",
+        lambda: sum(row[0] for row in conn.execute("SELECT amount FROM amounts")),
+    )
+
+    exact = from_micro(exact_micro)
+    drift = Decimal(repr(float_total)) - exact
+    print(f"\n  exact total  {format_usdc(exact_micro)} USDC")
+    print(f"  float total  {float_total!r} USDC (drift {drift:+} USDC)")
+    print(f"  speedup      {python_time / max(sql_time, 1e-9):.1f}x")
+
+    sample = micros[:min(len(micros), 200_000)]
+    print(f"\nFormatting {len(sample):,} amounts:")
+    timed("str(float) per value", lambda: [str(m / MICRO_PER_USDC) for m in sample])
+    timed("str(Decimal) per value", lambda: [str(from_micro(m)) for m in sample])
+    timed("format_usdc_many (exact, cached suffixes)", lambda: format_usdc_many(sample))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Query plan and latency benchmark for the tenant-scoped route queries.
+
+Seeds a database with N companies worth of departments, workers, spendings,
+revenues and payroll history, then runs the same queries the API routes issue
+and reports the query plan (EXPLAIN) and latency for each one.
+
+Usage (from backend/):
+    python -m benchmarks.query_plans --companies 200 --workers 50
+    python -m benchmarks.query_plans --without-indexes     # baseline without idx_* indexes
+    python -m benchmarks.query_plans --database-url postgresql://.../bench_scratch --json plans.json
+    python -m benchmarks.query_plans --database-url postgresql://.../bench_scratch --reset
+
+The default target is a throwaway SQLite file, so it never touches DATABASE_URL.
+A --database-url target must not contain the app's tables yet; --reset drops and
+recreates them (all rows in them are lost).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+from src.database import Base
+from src.models import (
+    User, Company, Department, Worker, AdditionalSpending, Revenue, PayrollTransaction
+)
+from src.money import MICRO_PER_USDC
+
+# Placeholder bcrypt-format hash - this harness never logs in, and hashing per user
+# would dominate seeding time
+BENCHMARK_PASSWORD_HASH = "$2b$12$" + "x" * 53
+
+
+def random_usdc(rng: random.Random, low: int, high: int) -> int:
+    """Random whole-cent USDC amount in [low, high], as micro-USDC"""
+    return rng.randint(low * 100, high * 100) * (MICRO_PER_USDC // 100)
+
+
+def seed(engine, companies: int, departments: int, workers: int, months: int, seed_value: int):
+    """Bulk-insert a realistic multi-tenant dataset"""
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    today = date.today()
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": c, "email": f"bench{c}@example.com", "password_hash": BENCHMARK_PASSWORD_HASH,
+             "company_name": f"Company {c}", "created_at": now}
+            for c in range(1, companies + 1)
+        ])
+        conn.execute(insert(Company), [
+            {"id": c, "user_id": c, "created_at": now} for c in range(1, companies + 1)
+        ])
+
+        dept_rows, worker_rows, spending_rows, revenue_rows, payroll_rows = [], [], [], [], []
+        dept_id = worker_id = 0
+        for company_id in range(1, companies + 1):
+            company_workers = []
+            for _ in range(departments):
+                dept_id += 1
+                dept_rows.append({"id": dept_id, "company_id": company_id,
+                                  "name": f"Dept {dept_id}", "created_at": now})
+                for _ in range(rng.randint(max(1, workers // 2), workers * 2)):
+                    worker_id += 1
+                    company_workers.append(worker_id)
+                    worker_rows.append({
+                        "id": worker_id, "department_id": dept_id,
+                        "name": f"W{worker_id}", "surname": "Bench",
+                        "salary_micro": random_usdc(rng, 1000, 9000),
+                        "wallet_address": "0x" + f"{worker_id:040x}",
+                        "is_active": rng.random() > 0.1, "created_at": now,
+                    })
+                for _ in range(rng.randint(1, 5)):
+                    spending_rows.append({
+                        "company_id": company_id, "department_id": dept_id,
+                        "name": "Tooling", "amount_micro": random_usdc(rng, 10, 900),
+                        "wallet_address": "0x" + "ab" * 20, "created_at": now,
+                    })
+            for _ in range(rng.randint(1, 5)):
+                spending_rows.append({
+                    "company_id": company_id, "department_id": None,
+                    "name": "CEO spending", "amount_micro": random_usdc(rng, 10, 900),
+                    "wallet_address": "0x" + "cd" * 20, "created_at": now,
+                })
+            for m in range(months):
+                period_end = today - timedelta(days=30 * m)
+                period_start = period_end.replace(day=1)
+                revenue_rows.append({
+                    "company_id": company_id, "amount_micro": random_usdc(rng, 10_000, 1_000_000),
+                    "month": period_end.month, "year": period_end.year,
+                    "created_at": now,
+                })
+                created_at = datetime.combine(period_end, datetime.min.time()) + timedelta(hours=9)
+                for w in company_workers:
+                    payroll_rows.append({
+                        "company_id": company_id, "worker_id": w,
+                        "amount_micro": 1000 * MICRO_PER_USDC, "period_start": period_start, "period_end": period_end,
+                        "status": "COMPLETE", "created_at": created_at,
+                    })
+
+        for model, rows in ((Department, dept_rows), (Worker, worker_rows),
+                            (AdditionalSpending, spending_rows), (Revenue, revenue_rows),
+                            (PayrollTransaction, payroll_rows)):
+            for start in range(0, len(rows), 5000):
+                conn.execute(insert(model), rows[start:start + 5000])
+
+    return {
+        "companies": companies, "departments": len(dept_rows), "workers": len(worker_rows),
+        "spendings": len(spending_rows), "revenues": len(revenue_rows),
+        "payroll_transactions": len(payroll_rows),
+    }
+
+
+def route_queries(company_id: int, user_id: int, payroll_cursor_id: int = 0):
+    """
+    The statements issued by each API route, keyed by route.
+    payroll_cursor_id positions the deep keyset page (e.g. halfway through the history).
+    """
+    today = date.today()
+    period_start = date(today.year, today.month, 1)
+    return {
+        "GET /api/company (tenant lookup)":
+            select(Company).where(Company.user_id == user_id),
+        "GET /api/departments":
+            select(Department).where(Department.company_id == company_id),
+        "GET /api/workers":
+            select(Worker).join(Department).where(Department.company_id == company_id),
+        "GET /api/dashboard/stats (payroll per department)":
+            select(Worker.department_id, func.count(Worker.id), func.sum(Worker.salary_micro))
+            .join(Department).where(
+                Department.company_id == company_id, Worker.is_active == True  # noqa: E712
+            ).group_by(Worker.department_id),
+        "GET /api/dashboard/stats (spendings per department)":
+            select(AdditionalSpending.department_id, func.sum(AdditionalSpending.amount_micro))
+            .where(AdditionalSpending.company_id == company_id)
+            .group_by(AdditionalSpending.department_id),
+        "GET /api/spendings (CEO level)":
+            select(AdditionalSpending).where(
+                AdditionalSpending.company_id == company_id,
+                AdditionalSpending.department_id.is_(None),
+            ),
+        "GET /api/revenue":
+            select(Revenue).where(Revenue.company_id == company_id)
+            .order_by(Revenue.year.desc(), Revenue.month.desc()),
+        "POST /api/revenue (upsert lookup)":
+            select(Revenue).where(
+                Revenue.company_id == company_id, Revenue.month == today.month,
+                Revenue.year == today.year,
+            ),
+        "GET /api/payroll/transactions":
+            select(PayrollTransaction).where(PayrollTransaction.company_id == company_id)
+            .order_by(PayrollTransaction.id.desc()),
+        "GET /api/payroll/transactions?limit=100 (first page)":
+            select(PayrollTransaction).where(PayrollTransaction.company_id == company_id)
+            .order_by(PayrollTransaction.id.desc()).limit(101),
+        "GET /api/payroll/transactions?limit=100&cursor= (deep page)":
+            select(PayrollTransaction).where(
+                PayrollTransaction.company_id == company_id, PayrollTransaction.id < payroll_cursor_id,
+            ).order_by(PayrollTransaction.id.desc()).limit(101),
+        "scheduler has_payroll_been_run_today":
+            select(PayrollTransaction).where(
+                PayrollTransaction.company_id == company_id,
+                PayrollTransaction.period_start == period_start,
+                PayrollTransaction.period_end == today,
+                PayrollTransaction.created_at >= datetime.combine(today, datetime.min.time()),
+            ).limit(1),
+    }
+
+
+def explain(conn, statement) -> list:
+    """Return the database's query plan for a statement"""
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if conn.dialect.name == "postgresql":
+        rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}", params).fetchall()
+        return [row[0] for row in rows]
+    positional = tuple(params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", positional).fetchall()
+    return [row[-1] for row in rows]
+
+
+def time_query(session: Session, statement, iterations: int) -> dict:
+    """Run a statement repeatedly and collect latency percentiles (ms)"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        session.execute(statement).all()
+        samples.append((time.perf_counter() - start) * 1000)
+        session.expunge_all()
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def drop_benchmark_indexes(engine):
+    """Drop the idx_* indexes so the plans can be compared against a baseline"""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name and index.name.startswith("idx_"):
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route query plans and latency")
+    parser.add_argument("--database-url", help="Target database (default: temporary SQLite file)")
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--departments", type=int, default=5, help="Departments per company")
+    parser.add_argument("--workers", type=int, default=20, help="Average workers per department")
+    parser.add_argument("--months", type=int, default=12, help="Months of payroll history")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--without-indexes", action="store_true",
+                        help="Drop the composite idx_* indexes before measuring")
+    parser.add_argument("--reset", action="store_true",
+                        help="Drop the app's tables of --database-url first (destroys their data)")
+    parser.add_argument("--json", dest="json_path", help="Write results to a JSON file")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if not database_url:
+        fd, path = tempfile.mkstemp(suffix=".db", prefix="bossboard_bench_")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+
+    engine = create_engine(database_url)
+    print(f"[BENCH] Database: {engine.url.render_as_string(hide_password=True)}")
+
+    existing = [table for table in Base.metadata.tables if inspect(engine).has_table(table)]
+    if existing and not args.reset:
+        parser.error(f"{engine.url.render_as_string(hide_password=True)} already has tables "
+                     f"({', '.join(sorted(existing))}); point --database-url at a scratch database "
+                     f"or pass --reset to drop them")
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    if args.without_indexes:
+        drop_benchmark_indexes(engine)
+
+    start = time.perf_counter()
+    counts = seed(engine, args.companies, args.departments, args.workers, args.months, args.seed)
+    print(f"[BENCH] Seeded in {time.perf_counter() - start:.1f}s: {counts}")
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    # Measure a tenant from the middle of the id range
+    company_id = user_id = max(1, args.companies // 2)
+    results = []
+    with engine.connect() as conn, Session(engine) as session:
+        payroll_ids = conn.execute(
+            select(PayrollTransaction.id).where(PayrollTransaction.company_id == company_id)
+            .order_by(PayrollTransaction.id)
+        ).scalars().all()
+        payroll_cursor_id = payroll_ids[len(payroll_ids) // 2] if payroll_ids else 0
+        for route, statement in route_queries(company_id, user_id, payroll_cursor_id).items():
+            plan = explain(conn, statement)
+            latency = time_query(session, statement, args.iterations)
+            results.append({"route": route, "plan": plan, **latency})
+
+            print(f"\n{route}")
+            print(f"  p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms max={latency['max_ms']}ms")
+            for line in plan:
+                print(f"  | {line}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"database": engine.dialect.name, "indexes": not args.without_indexes,
+                       "counts": counts, "results": results}, f, indent=2)
+        print(f"\n[BENCH] Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
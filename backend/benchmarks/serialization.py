@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+List response serialization benchmark: encode time and bytes on the wire.
+
+Builds N Worker and PayrollTransaction rows (transient ORM objects, so attribute
+access costs the same as on loaded rows) and compares
+  - response_model through pydantic: validate from attributes, then dump_json
+    (recent FastAPI) or dump_python + json.dumps (older versions)
+  - row_encoder() dicts + src.responses.dumps (orjson, or stdlib json if missing)
+  - NDJSON streaming: total time and time to the first chunk
+then the compressed size and cost of each body with gzip and brotli at the
+levels CompressionMiddleware uses.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 50000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+from src.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from src.models import PayrollTransaction, Worker
+from src.money import MICRO_PER_USDC
+from src.responses import dumps, ndjson_lines, orjson, row_encoder
+from src.schemas import PayrollTransactionResponse, WorkerResponse
+
+
+def timed(label: str, fn, repeat: int = 3):
+    """Best of `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<52} {best * 1000:>9.1f} ms")
+    return value, best
+
+
+def make_workers(rng: random.Random, rows: int) -> List[Worker]:
+    created = datetime(2025, 1, 1)
+    return [
+        Worker(
+            id=i,
+            name=f"Worker{i}",
+            surname=rng.choice(["Smith", "Garcia", "Chen", "Okafor", "Novak"]),
+            salary_micro=rng.randint(1_000, 20_000) * MICRO_PER_USDC // 100 * 100,
+            wallet_address="0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40)),
+            is_active=rng.random() > 0.1,
+            department_id=rng.randint(1, 20),
+            created_at=created + timedelta(seconds=i),
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def make_transactions(rng: random.Random, rows: int) -> List[PayrollTransaction]:
+    created = datetime(2025, 1, 1)
+    return [
+        PayrollTransaction(
+            id=i,
+            company_id=1,
+            worker_id=rng.randint(1, 5_000),
+            amount_micro=rng.randint(1_000, 20_000) * MICRO_PER_USDC,
+            period_start=date(2025, 1 + i % 12, 1),
+            period_end=date(2025, 1 + i % 12, 28),
+            status=rng.choice(["COMPLETE", "COMPLETE", "COMPLETE", "INITIATED", "failed"]),
+            transaction_hash="0x" + "".join(rng.choice("0123456789abcdef") for _ in range(64)),
+            circle_transaction_id=f"{rng.getrandbits(128):032x}",
+            created_at=created + timedelta(seconds=i),
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def bench_collection(name: str, objs, schema):
+    print(f"\n{name} ({len(objs):,} rows):")
+    adapter = TypeAdapter(List[schema])
+    encode = row_encoder(schema)
+
+    validate = lambda: adapter.validate_python(objs, from_attributes=True)  # noqa: E731
+    pydantic_bytes, _ = timed("response_model, validate + dump_json", lambda: adapter.dump_json(validate()))
+    timed("response_model, validate + dump_python + json.dumps",
+          lambda: json.dumps(adapter.dump_python(validate(), mode="json")).encode())
+    fast_bytes, _ = timed(f"row_encoder + {'orjson' if orjson else 'json'}",
+                          lambda: dumps([encode(o) for o in objs]))
+    ndjson, _ = timed("NDJSON, all chunks", lambda: b"".join(ndjson_lines(encode(o) for o in objs)))
+
+    start = time.perf_counter()
+    next(ndjson_lines(encode(o) for o in objs))
+    print(f"  {'NDJSON, first chunk':<52} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+
+    assert json.loads(fast_bytes) == json.loads(pydantic_bytes), "fast path output differs from response_model"
+
+    print(f"\n  {'body':<20} {'identity':>12} {'gzip -' + str(GZIP_LEVEL):>18} "
+          f"{'br q' + str(BROTLI_QUALITY) if brotli else 'br (not installed)':>18}")
+    for label, body in (("JSON", fast_bytes), ("NDJSON", ndjson)):
+        start = time.perf_counter()
+        gz = gzip.compress(body, GZIP_LEVEL)
+        gz_ms = (time.perf_counter() - start) * 1000
+        br_col = "-"
+        if brotli:
+            start = time.perf_counter()
+            br = brotli.compress(body, quality=BROTLI_QUALITY)
+            br_col = f"{len(br) / 1024:,.0f} KiB {(time.perf_counter() - start) * 1000:.0f}ms"
+        print(f"  {label:<20} {len(body) / 1024:>8,.0f} KiB "
+              f"{f'{len(gz) / 1024:,.0f} KiB {gz_ms:.0f}ms':>18} {br_col:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization and compression")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"[BENCH] {args.rows:,} rows, orjson {'yes' if orjson else 'no'}, brotli {'yes' if brotli else 'no'}")
+    bench_collection("Workers", make_workers(rng, args.rows), WorkerResponse)
+    bench_collection("Payroll transactions", make_transactions(rng, args.rows), PayrollTransactionResponse)
+
+
+if __name__ == "__main__":
+    main()
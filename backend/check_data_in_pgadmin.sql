@@ -43,7 +43,7 @@ JOIN companies c ON d.company_id = c.id
 JOIN users u ON c.user_id = u.id;
 
 -- 6. Просмотр работников
-SELECT w.id, d.name as department, w.name, w.surname, w.salary, w.is_active
+SELECT w.id, d.name as department, w.name, w.surname, w.salary_micro / 1000000.0 AS salary, w.is_active
 FROM workers w
 JOIN departments d ON w.department_id = d.id
 ORDER BY w.id;
@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from dotenv import load_dotenv
 from src.database import SessionLocal
 from src.models import Company, Department, Worker
+from src.money import format_usdc
 
 # Load .env
 load_dotenv(Path(__file__).parent / ".env")
@@ -56,7 +57,7 @@ def check_schedule():
         ).all()
         
         total_workers = 0
-        total_salary = 0.0
+        total_salary_micro = 0
         
         for dept in departments:
             workers = db.query(Worker).filter(
@@ -66,7 +67,7 @@ def check_schedule():
             
             for worker in workers:
                 total_workers += 1
-                total_salary += worker.salary
+                total_salary_micro += worker.salary_micro
                 print(f"\n  Department: {dept.name}")
                 print(f"    Worker: {worker.name} {worker.surname}")
                 print(f"    Salary: {worker.salary} USDC")
@@ -76,7 +77,7 @@ def check_schedule():
         print("SUMMARY")
         print("=" * 80)
         print(f"Total active workers: {total_workers}")
-        print(f"Total salary to pay: {total_salary} USDC")
+        print(f"Total salary to pay: {format_usdc(total_salary_micro)} USDC")
         
         if company.payroll_date and company.payroll_time:
             payroll_datetime = datetime.combine(company.payroll_date, 
@@ -55,7 +55,7 @@ CREATE TABLE workers (
     department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
     name VARCHAR(255) NOT NULL,
     surname VARCHAR(255) NOT NULL,
-    salary DOUBLE PRECISION NOT NULL,
+    salary_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     wallet_address VARCHAR(255) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -70,7 +70,7 @@ CREATE TABLE additional_spendings (
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
     department_id INTEGER REFERENCES departments(id) ON DELETE SET NULL,
     name VARCHAR(255) NOT NULL,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     wallet_address VARCHAR(255) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -82,7 +82,7 @@ CREATE INDEX idx_spendings_department_id ON additional_spendings(department_id);
 CREATE TABLE revenues (
     id SERIAL PRIMARY KEY,
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     month INTEGER NOT NULL CHECK (month >= 1 AND month <= 12),
     year INTEGER NOT NULL CHECK (year >= 2000 AND year <= 2100),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -96,7 +96,7 @@ CREATE TABLE payroll_transactions (
     id SERIAL PRIMARY KEY,
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
     worker_id INTEGER NOT NULL REFERENCES workers(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     period_start DATE NOT NULL,
     period_end DATE NOT NULL,
     status VARCHAR(50) DEFAULT 'pending' NOT NULL CHECK (status IN ('pending', 'completed', 'failed')),
@@ -113,7 +113,7 @@ CREATE INDEX idx_payroll_period ON payroll_transactions(period_start, period_end
 CREATE TABLE spending_transactions (
     id SERIAL PRIMARY KEY,
     spending_id INTEGER NOT NULL REFERENCES additional_spendings(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     transaction_hash VARCHAR(255),
     status VARCHAR(50) DEFAULT 'pending' NOT NULL CHECK (status IN ('pending', 'completed', 'failed')),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
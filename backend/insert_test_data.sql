@@ -38,61 +38,61 @@ WHERE c.user_id = (SELECT id FROM users WHERE email = 'test@example.com')
 ON CONFLICT DO NOTHING;
 
 -- 4. Создание работников
-INSERT INTO workers (department_id, name, surname, salary, wallet_address, is_active, created_at)
+INSERT INTO workers (department_id, name, surname, salary_micro, wallet_address, is_active, created_at)
 SELECT 
     d.id,
     worker_data.name,
     worker_data.surname,
-    worker_data.salary,
+    worker_data.salary_micro,
     worker_data.wallet_address,
     TRUE,
     NOW()
 FROM departments d
 CROSS JOIN (VALUES 
-    ('John', 'Doe', 5000.0, '0x1111111111111111111111111111111111111111'),
-    ('Jane', 'Smith', 6000.0, '0x2222222222222222222222222222222222222222'),
-    ('Bob', 'Johnson', 5500.0, '0x3333333333333333333333333333333333333333'),
-    ('Alice', 'Williams', 5200.0, '0x4444444444444444444444444444444444444444'),
-    ('Charlie', 'Brown', 4800.0, '0x5555555555555555555555555555555555555555'),
-    ('Diana', 'Davis', 5800.0, '0x6666666666666666666666666666666666666666')
-) AS worker_data(name, surname, salary, wallet_address)
+    ('John', 'Doe', 5000000000, '0x1111111111111111111111111111111111111111'),
+    ('Jane', 'Smith', 6000000000, '0x2222222222222222222222222222222222222222'),
+    ('Bob', 'Johnson', 5500000000, '0x3333333333333333333333333333333333333333'),
+    ('Alice', 'Williams', 5200000000, '0x4444444444444444444444444444444444444444'),
+    ('Charlie', 'Brown', 4800000000, '0x5555555555555555555555555555555555555555'),
+    ('Diana', 'Davis', 5800000000, '0x6666666666666666666666666666666666666666')
+) AS worker_data(name, surname, salary_micro, wallet_address)  -- salaries in micro-USDC
 WHERE d.company_id = (SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com'))
 LIMIT 6;
 
 -- 5. Создание расходов
-INSERT INTO additional_spendings (company_id, department_id, name, amount, wallet_address, created_at)
+INSERT INTO additional_spendings (company_id, department_id, name, amount_micro, wallet_address, created_at)
 SELECT 
     c.id,
     d.id,
     spending_data.name,
-    spending_data.amount,
+    spending_data.amount_micro,
     spending_data.wallet_address,
     NOW()
 FROM companies c
 CROSS JOIN departments d
 CROSS JOIN (VALUES 
-    ('Office Supplies', 500.0, '0x7777777777777777777777777777777777777777'),
-    ('Software Licenses', 1200.0, '0x8888888888888888888888888888888888888888'),
-    ('Marketing Campaign', 3000.0, '0x9999999999999999999999999999999999999999')
-) AS spending_data(name, amount, wallet_address)
+    ('Office Supplies', 500000000, '0x7777777777777777777777777777777777777777'),
+    ('Software Licenses', 1200000000, '0x8888888888888888888888888888888888888888'),
+    ('Marketing Campaign', 3000000000, '0x9999999999999999999999999999999999999999')
+) AS spending_data(name, amount_micro, wallet_address)  -- micro-USDC
 WHERE c.user_id = (SELECT id FROM users WHERE email = 'test@example.com')
 AND d.name = 'Marketing'
 LIMIT 3;
 
 -- 6. Создание доходов (за последние 3 месяца)
-INSERT INTO revenues (company_id, amount, month, year, created_at)
+INSERT INTO revenues (company_id, amount_micro, month, year, created_at)
 SELECT 
     c.id,
-    revenue_data.amount,
+    revenue_data.amount_micro,
     revenue_data.month,
     revenue_data.year,
     NOW()
 FROM companies c
 CROSS JOIN (VALUES 
-    (50000.0, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '2 months')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '2 months')::INTEGER),
-    (55000.0, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER),
-    (60000.0, EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER)
-) AS revenue_data(amount, month, year)
+    (50000000000, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '2 months')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '2 months')::INTEGER),
+    (55000000000, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER),
+    (60000000000, EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER)
+) AS revenue_data(amount_micro, month, year)  -- micro-USDC
 WHERE c.user_id = (SELECT id FROM users WHERE email = 'test@example.com')
 ON CONFLICT DO NOTHING;
 
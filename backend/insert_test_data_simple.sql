@@ -27,31 +27,31 @@ VALUES
 ON CONFLICT DO NOTHING;
 
 -- 4. Работники
-INSERT INTO workers (department_id, name, surname, salary, wallet_address, is_active, created_at)
+INSERT INTO workers (department_id, name, surname, salary_micro, wallet_address, is_active, created_at)
 SELECT 
     d.id,
     name,
     surname,
-    salary,
+    salary_micro,
     wallet_address,
     TRUE,
     NOW()
 FROM departments d
 CROSS JOIN (VALUES 
-    ('John', 'Doe', 5000.0, '0x1111111111111111111111111111111111111111'),
-    ('Jane', 'Smith', 6000.0, '0x2222222222222222222222222222222222222222'),
-    ('Bob', 'Johnson', 5500.0, '0x3333333333333333333333333333333333333333')
-) AS t(name, surname, salary, wallet_address)
+    ('John', 'Doe', 5000000000, '0x1111111111111111111111111111111111111111'),
+    ('Jane', 'Smith', 6000000000, '0x2222222222222222222222222222222222222222'),
+    ('Bob', 'Johnson', 5500000000, '0x3333333333333333333333333333333333333333')
+) AS t(name, surname, salary_micro, wallet_address)  -- salaries in micro-USDC
 WHERE d.company_id = (SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com'))
 LIMIT 3;
 
 -- 5. Расходы
-INSERT INTO additional_spendings (company_id, department_id, name, amount, wallet_address, created_at)
+INSERT INTO additional_spendings (company_id, department_id, name, amount_micro, wallet_address, created_at)
 SELECT 
     c.id,
     d.id,
     'Office Supplies',
-    500.0,
+    500000000,  -- 500 USDC in micro-USDC
     '0x7777777777777777777777777777777777777777',
     NOW()
 FROM companies c
@@ -61,9 +61,9 @@ AND d.name = 'Marketing'
 LIMIT 1;
 
 -- 6. Доходы
-INSERT INTO revenues (company_id, amount, month, year, created_at)
+INSERT INTO revenues (company_id, amount_micro, month, year, created_at)
 VALUES 
-    ((SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com')), 50000.0, EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER, NOW()),
-    ((SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com')), 55000.0, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, NOW())
+    ((SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com')), 50000000000, EXTRACT(MONTH FROM CURRENT_DATE)::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER, NOW()),
+    ((SELECT id FROM companies WHERE user_id = (SELECT id FROM users WHERE email = 'test@example.com')), 55000000000, EXTRACT(MONTH FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, EXTRACT(YEAR FROM CURRENT_DATE - INTERVAL '1 month')::INTEGER, NOW())
 ON CONFLICT DO NOTHING;
 
@@ -6,13 +6,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore
 from apscheduler.triggers.cron import CronTrigger  # type: ignore
-from src.database import engine, Base, SessionLocal
-from src.routes import auth, company, departments, workers, spendings, revenue, payroll, dashboard, circle
+from src.database import engine, SessionLocal, DATABASE_URL
+from src.routes import auth, company, departments, workers, spendings, revenue, payroll, dashboard, circle, bundle, events, forecast
 from src.payroll_scheduler import check_and_execute_payrolls
+from src.compression import CompressionMiddleware
+from src.forecast import forecast_engine
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema changes are applied by `python migrate.py` (release step), not at import.
+# Local SQLite setups migrate on startup by default so `python main.py` just works.
+MIGRATE_ON_START = os.getenv(
+    "MIGRATE_ON_START", "true" if DATABASE_URL.startswith("sqlite") else "false"
+).lower() in ("1", "true", "yes")
 
 # Scheduler for payroll automation
 scheduler = AsyncIOScheduler()
@@ -37,6 +42,10 @@ def run_payroll_check():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
+    if MIGRATE_ON_START:
+        from src.migrations import run_migrations
+        run_migrations(engine)
+    
     # Startup: Start scheduler
     # Check every minute for payroll time
     scheduler.add_job(
@@ -53,6 +62,7 @@ async def lifespan(app: FastAPI):
     # Shutdown: Stop scheduler
     scheduler.shutdown()
     print("[APP] Payroll scheduler stopped")
+    forecast_engine.shutdown()
 
 
 app = FastAPI(title="BossBoard API", version="1.0.0", lifespan=lifespan)
@@ -75,8 +85,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor, read by browser clients
 )
 
+# brotli/gzip for bodies above COMPRESS_MIN_BYTES (streamed NDJSON is compressed per chunk)
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(company.router)
@@ -87,6 +101,9 @@ app.include_router(revenue.router)
 app.include_router(payroll.router)
 app.include_router(dashboard.router)
 app.include_router(circle.router)
+app.include_router(bundle.router)
+app.include_router(events.router)
+app.include_router(forecast.router)
 
 
 @app.get("/")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Apply database schema migrations (src/migrations/versions)
+
+Usage:
+    python migrate.py                 # apply all pending migrations
+    python migrate.py --status        # show applied / pending versions
+    python migrate.py --target 0002   # migrate up to a specific version
+
+Run this before starting the API (release / pre-deploy step). The API server
+itself no longer creates tables at startup.
+"""
+import argparse
+import sys
+from src.database import engine
+from src.migrations import applied_versions, discover_migrations, run_migrations
+
+
+def print_status():
+    applied = applied_versions(engine)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    for migration in discover_migrations():
+        state = "applied" if migration.version in applied else "PENDING"
+        online = "" if migration.transactional else " (online)"
+        print(f"  {migration.version}  {state:<8} {migration.description}{online}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply BossBoard schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show migration status and exit")
+    parser.add_argument("--target", help="Stop after this version")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+
+    try:
+        run_migrations(engine, target=args.target)
+    except Exception as e:
+        print(f"[MIGRATE] ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
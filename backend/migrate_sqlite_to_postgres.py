@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
 """
 Миграция данных из SQLite в PostgreSQL
-Запустите этот скрипт после создания таблиц в PostgreSQL
+
+- Строки читаются потоково, порциями (cursor.fetchmany), а не fetchall()
+- Загрузка в PostgreSQL через COPY FROM STDIN (одна команда на порцию)
+- Первичные ключи сохраняются, после копирования последовательности (SERIAL) сбрасываются
+- Колонки берутся из обеих схем (включая Circle-колонки), копируются общие
+- Независимые таблицы копируются параллельно, по уровням зависимостей (внешних ключей)
+- Возобновляемо по таблицам: каждая порция коммитится отдельно, а при повторном
+  запуске копирование продолжается с MAX(id), уже загруженного в PostgreSQL
+
+Перед запуском обе базы должны быть на одной версии схемы:
+    DATABASE_URL=sqlite:///./bossboard.db python migrate.py
+    python migrate.py   # с DATABASE_URL=postgresql://...
+
+Запуск:
+    python migrate_sqlite_to_postgres.py [--sqlite bossboard.db] [--chunk-size 5000] [--workers 4] [--truncate]
 """
+import argparse
+import io
 import sqlite3
+import threading
+import time
 import psycopg2
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,106 +40,225 @@ if not POSTGRES_URL or not POSTGRES_URL.startswith("postgresql"):
     print("Установите DATABASE_URL в .env файле")
     exit(1)
 
-def migrate_table(sqlite_conn, pg_conn, table_name, columns):
-    """Мигрирует таблицу из SQLite в PostgreSQL"""
-    sqlite_cursor = sqlite_conn.cursor()
-    pg_cursor = pg_conn.cursor()
-    
+# Таблицы и их зависимости (внешние ключи)
+TABLE_DEPENDENCIES = {
+    "users": [],
+    "companies": ["users"],
+    "departments": ["companies"],
+    "revenues": ["companies"],
+    "workers": ["departments"],
+    "additional_spendings": ["companies", "departments"],
+    "payroll_transactions": ["companies", "workers"],
+    "spending_transactions": ["additional_spendings"],
+}
+
+_print_lock = threading.Lock()
+
+
+def log(message: str):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def dependency_levels(dependencies: dict) -> list:
+    """Группирует таблицы по уровням: таблицы одного уровня не зависят друг от друга"""
+    levels = []
+    done = set()
+    remaining = dict(dependencies)
+    while remaining:
+        level = sorted(t for t, deps in remaining.items() if all(d in done for d in deps))
+        if not level:
+            raise RuntimeError(f"Циклическая зависимость между таблицами: {sorted(remaining)}")
+        levels.append(level)
+        done.update(level)
+        for t in level:
+            del remaining[t]
+    return levels
+
+
+def sqlite_columns(sqlite_conn, table_name: str) -> list:
+    return [row[1] for row in sqlite_conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def postgres_columns(pg_conn, table_name: str) -> list:
+    with pg_conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+            (table_name,),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_value(value) -> str:
+    """Значение в текстовом формате COPY: None -> \\N, экранирование спецсимволов"""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def rows_to_copy_buffer(rows) -> io.StringIO:
+    """Порция строк в текстовом формате COPY (табуляция между колонками)"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def reset_sequence(pg_conn, table_name: str):
+    """Сдвигает SERIAL-последовательность за максимальный id, чтобы новые INSERT не конфликтовали"""
+    with pg_conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f"FROM {table_name}",
+            (table_name,),
+        )
+    pg_conn.commit()
+
+
+def migrate_table(sqlite_path: str, table_name: str, chunk_size: int) -> dict:
+    """Мигрирует таблицу из SQLite в PostgreSQL (потоково, через COPY, с сохранением id)"""
+    sqlite_conn = sqlite3.connect(sqlite_path)
+    pg_conn = psycopg2.connect(POSTGRES_URL)
+
     try:
-        # Получить данные из SQLite
-        sqlite_cursor.execute(f"SELECT * FROM {table_name}")
-        rows = sqlite_cursor.fetchall()
-        
-        if not rows:
-            print(f"  ⚠️  Таблица {table_name} пуста, пропускаем")
-            return
-        
-        # Вставить данные в PostgreSQL
-        placeholders = ", ".join(["%s"] * len(columns))
+        source_columns = sqlite_columns(sqlite_conn, table_name)
+        if not source_columns:
+            log(f"  ⚠️  Таблица {table_name} отсутствует в SQLite, пропускаем")
+            return {"table": table_name, "rows": 0, "seconds": 0.0}
+
+        target_columns = postgres_columns(pg_conn, table_name)
+        columns = [c for c in source_columns if c in target_columns]
+        skipped = [c for c in source_columns if c not in target_columns]
+        missing = [c for c in target_columns if c not in source_columns]
+        if skipped:
+            log(f"  ⚠️  {table_name}: колонки нет в PostgreSQL, пропускаем: {', '.join(skipped)}")
+        if missing:
+            log(f"  ⚠️  {table_name}: колонки нет в SQLite, будут NULL/default: {', '.join(missing)}")
+        if "id" not in columns:
+            raise RuntimeError(f"{table_name}: нет колонки id, возобновление невозможно")
+
+        # Возобновление: продолжаем после максимального уже загруженного id
+        with pg_conn.cursor() as cursor:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}")
+            resume_after = cursor.fetchone()[0]
+        total_rows = sqlite_conn.execute(
+            f"SELECT COUNT(*) FROM {table_name} WHERE id > ?", (resume_after,)
+        ).fetchone()[0]
+
+        if resume_after:
+            log(f"  ↪️  {table_name}: продолжаем после id={resume_after} (осталось {total_rows} записей)")
+        if total_rows == 0:
+            reset_sequence(pg_conn, table_name)
+            log(f"  ✅ {table_name}: нечего копировать")
+            return {"table": table_name, "rows": 0, "seconds": 0.0}
+
         columns_str = ", ".join(columns)
-        
-        # Пропустить id для автоинкремента (если есть)
-        if "id" in columns:
-            id_index = columns.index("id")
-            insert_columns = [c for c in columns if c != "id"]
-            placeholders = ", ".join(["%s"] * len(insert_columns))
-            columns_str = ", ".join(insert_columns)
-            
-            for row in rows:
-                row_data = [val for i, val in enumerate(row) if i != id_index]
-                pg_cursor.execute(
-                    f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})",
-                    row_data
-                )
-        else:
-            for row in rows:
-                pg_cursor.execute(
-                    f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})",
-                    row
-                )
-        
-        pg_conn.commit()
-        print(f"  ✅ Мигрировано {len(rows)} записей из {table_name}")
-        
+        copy_sql = f"COPY {table_name} ({columns_str}) FROM STDIN"
+
+        # Курсор SQLite отдаёт строки по мере чтения - в памяти только одна порция
+        source = sqlite_conn.execute(
+            f"SELECT {columns_str} FROM {table_name} WHERE id > ? ORDER BY id", (resume_after,)
+        )
+
+        copied = 0
+        start = time.perf_counter()
+        while True:
+            rows = source.fetchmany(chunk_size)
+            if not rows:
+                break
+            with pg_conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql, rows_to_copy_buffer(rows))
+            # Коммит после каждой порции: MAX(id) в PostgreSQL - точная точка возобновления
+            pg_conn.commit()
+
+            copied += len(rows)
+            elapsed = time.perf_counter() - start
+            log(f"  📦 {table_name}: {copied}/{total_rows} "
+                f"({copied / max(elapsed, 1e-9):,.0f} строк/с)")
+
+        reset_sequence(pg_conn, table_name)
+        elapsed = time.perf_counter() - start
+        log(f"  ✅ Мигрировано {copied} записей из {table_name} за {elapsed:.1f}с "
+            f"({copied / max(elapsed, 1e-9):,.0f} строк/с)")
+        return {"table": table_name, "rows": copied, "seconds": elapsed}
+
     except Exception as e:
         pg_conn.rollback()
-        print(f"  ❌ Ошибка при миграции {table_name}: {e}")
+        log(f"  ❌ Ошибка при миграции {table_name}: {e}")
         raise
+    finally:
+        sqlite_conn.close()
+        pg_conn.close()
+
+
+def truncate_targets(tables: list):
+    """Очищает таблицы PostgreSQL перед полной миграцией (с --truncate)"""
+    pg_conn = psycopg2.connect(POSTGRES_URL)
+    try:
+        with pg_conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE")
+        pg_conn.commit()
+        log(f"🧹 Очищены таблицы: {', '.join(tables)}")
+    finally:
+        pg_conn.close()
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Миграция данных из SQLite в PostgreSQL")
+    parser.add_argument("--sqlite", default=SQLITE_DB, help="Путь к файлу SQLite")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Строк в одной порции COPY")
+    parser.add_argument("--workers", type=int, default=4, help="Параллельных таблиц на уровень")
+    parser.add_argument("--truncate", action="store_true",
+                        help="Очистить таблицы PostgreSQL перед миграцией (без возобновления)")
+    args = parser.parse_args()
+
     print("🚀 Начало миграции данных из SQLite в PostgreSQL...")
-    
+
     # Проверка SQLite базы
-    if not os.path.exists(SQLITE_DB):
-        print(f"❌ Файл {SQLITE_DB} не найден!")
+    if not os.path.exists(args.sqlite):
+        print(f"❌ Файл {args.sqlite} не найден!")
         return
-    
-    # Подключение к SQLite
-    try:
-        sqlite_conn = sqlite3.connect(SQLITE_DB)
-        print(f"✅ Подключено к SQLite: {SQLITE_DB}")
-    except Exception as e:
-        print(f"❌ Ошибка подключения к SQLite: {e}")
-        return
-    
-    # Подключение к PostgreSQL
+
+    # Проверка подключения к PostgreSQL
     try:
-        pg_conn = psycopg2.connect(POSTGRES_URL)
-        print(f"✅ Подключено к PostgreSQL")
+        psycopg2.connect(POSTGRES_URL).close()
+        print("✅ Подключено к PostgreSQL")
     except Exception as e:
         print(f"❌ Ошибка подключения к PostgreSQL: {e}")
         print("Проверьте DATABASE_URL в .env файле")
-        sqlite_conn.close()
         return
-    
-    # Определение таблиц и их колонок (в порядке зависимостей)
-    tables = [
-        ("users", ["id", "email", "password_hash", "company_name", "created_at"]),
-        ("companies", ["id", "user_id", "master_wallet_address", "payroll_date", "payroll_time", "created_at"]),
-        ("departments", ["id", "company_id", "name", "created_at"]),
-        ("workers", ["id", "department_id", "name", "surname", "salary", "wallet_address", "is_active", "created_at"]),
-        ("additional_spendings", ["id", "company_id", "department_id", "name", "amount", "wallet_address", "created_at"]),
-        ("revenues", ["id", "company_id", "amount", "month", "year", "created_at"]),
-        ("payroll_transactions", ["id", "company_id", "worker_id", "amount", "period_start", "period_end", "status", "transaction_hash", "created_at"]),
-        ("spending_transactions", ["id", "spending_id", "amount", "transaction_hash", "status", "created_at"]),
-    ]
-    
+
+    levels = dependency_levels(TABLE_DEPENDENCIES)
+    if args.truncate:
+        truncate_targets(list(TABLE_DEPENDENCIES))
+
+    results = []
+    start = time.perf_counter()
     try:
-        for table_name, columns in tables:
-            print(f"\n📦 Миграция таблицы: {table_name}")
-            migrate_table(sqlite_conn, pg_conn, table_name, columns)
-        
-        print("\n✅ Миграция завершена успешно!")
+        for level in levels:
+            print(f"\n📦 Уровень: {', '.join(level)}")
+            with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+                futures = [
+                    executor.submit(migrate_table, args.sqlite, table_name, args.chunk_size)
+                    for table_name in level
+                ]
+                # result() пробрасывает первую ошибку - следующий уровень не запускается
+                results.extend(future.result() for future in futures)
+
+        elapsed = time.perf_counter() - start
+        total_rows = sum(r["rows"] for r in results)
+        print(f"\n✅ Миграция завершена успешно! {total_rows} записей за {elapsed:.1f}с "
+              f"({total_rows / max(elapsed, 1e-9):,.0f} строк/с)")
         print("Теперь можно использовать PostgreSQL вместо SQLite")
-        
+
     except Exception as e:
         print(f"\n❌ Ошибка во время миграции: {e}")
-    
-    finally:
-        sqlite_conn.close()
-        pg_conn.close()
-        print("\n🔌 Соединения закрыты")
+        print("Запустите скрипт повторно - копирование продолжится с места остановки")
+
 
 if __name__ == "__main__":
     main()
-
@@ -46,7 +46,7 @@ CREATE TABLE IF NOT EXISTS workers (
     department_id INTEGER NOT NULL REFERENCES departments(id) ON DELETE CASCADE,
     name VARCHAR(255) NOT NULL,
     surname VARCHAR(255) NOT NULL,
-    salary DOUBLE PRECISION NOT NULL,
+    salary_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     wallet_address VARCHAR(255) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -55,6 +55,7 @@ CREATE TABLE IF NOT EXISTS workers (
 -- Create indexes for faster lookups
 CREATE INDEX IF NOT EXISTS idx_workers_department_id ON workers(department_id);
 CREATE INDEX IF NOT EXISTS idx_workers_is_active ON workers(is_active);
+CREATE INDEX IF NOT EXISTS idx_workers_department_active ON workers(department_id, is_active);
 
 -- Table: additional_spendings
 CREATE TABLE IF NOT EXISTS additional_spendings (
@@ -62,7 +63,7 @@ CREATE TABLE IF NOT EXISTS additional_spendings (
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
     department_id INTEGER REFERENCES departments(id) ON DELETE SET NULL,
     name VARCHAR(255) NOT NULL,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     wallet_address VARCHAR(255) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -70,12 +71,13 @@ CREATE TABLE IF NOT EXISTS additional_spendings (
 -- Create indexes for faster lookups
 CREATE INDEX IF NOT EXISTS idx_spendings_company_id ON additional_spendings(company_id);
 CREATE INDEX IF NOT EXISTS idx_spendings_department_id ON additional_spendings(department_id);
+CREATE INDEX IF NOT EXISTS idx_spendings_company_department_keyset ON additional_spendings(company_id, department_id, id);
 
 -- Table: revenues
 CREATE TABLE IF NOT EXISTS revenues (
     id SERIAL PRIMARY KEY,
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     month INTEGER NOT NULL CHECK (month >= 1 AND month <= 12),
     year INTEGER NOT NULL CHECK (year >= 2000 AND year <= 2100),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -84,13 +86,14 @@ CREATE TABLE IF NOT EXISTS revenues (
 -- Create indexes for faster lookups
 CREATE INDEX IF NOT EXISTS idx_revenues_company_id ON revenues(company_id);
 CREATE INDEX IF NOT EXISTS idx_revenues_year_month ON revenues(year DESC, month DESC);
+CREATE INDEX IF NOT EXISTS idx_revenues_company_year_month ON revenues(company_id, year, month);
 
 -- Table: payroll_transactions
 CREATE TABLE IF NOT EXISTS payroll_transactions (
     id SERIAL PRIMARY KEY,
     company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
     worker_id INTEGER NOT NULL REFERENCES workers(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     period_start DATE NOT NULL,
     period_end DATE NOT NULL,
     status VARCHAR(50) DEFAULT 'pending' NOT NULL CHECK (status IN ('pending', 'completed', 'failed')),
@@ -103,12 +106,14 @@ CREATE INDEX IF NOT EXISTS idx_payroll_company_id ON payroll_transactions(compan
 CREATE INDEX IF NOT EXISTS idx_payroll_worker_id ON payroll_transactions(worker_id);
 CREATE INDEX IF NOT EXISTS idx_payroll_status ON payroll_transactions(status);
 CREATE INDEX IF NOT EXISTS idx_payroll_period ON payroll_transactions(period_start, period_end);
+CREATE INDEX IF NOT EXISTS idx_payroll_company_period_created ON payroll_transactions(company_id, period_start, period_end, created_at);
+CREATE INDEX IF NOT EXISTS idx_payroll_company_keyset ON payroll_transactions(company_id, id);
 
 -- Table: spending_transactions
 CREATE TABLE IF NOT EXISTS spending_transactions (
     id SERIAL PRIMARY KEY,
     spending_id INTEGER NOT NULL REFERENCES additional_spendings(id) ON DELETE CASCADE,
-    amount DOUBLE PRECISION NOT NULL,
+    amount_micro BIGINT NOT NULL,  -- micro-USDC (6 decimals)
     transaction_hash VARCHAR(255),
     status VARCHAR(50) DEFAULT 'pending' NOT NULL CHECK (status IN ('pending', 'completed', 'failed')),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for scale testing (replaces add_test_data.py;
+add_test_payroll_data.py still builds a small scheduler fixture)
+
+Builds N companies with users, departments, workers, spendings, revenues and
+monthly payroll history directly in the database:
+  - one bcrypt hash is computed up front and shared by every user, so all of
+    them can log in with --password
+  - sizes are skewed like real tenants: log-normal workers per company,
+    Zipf-weighted departments, log-normal salaries and spendings
+  - rows are generated per block of companies from RNGs seeded by
+    (--seed, table, company), so the same arguments always build the same
+    database whatever --jobs is
+  - blocks are loaded with COPY on PostgreSQL (psycopg2 or psycopg 3) and
+    executemany elsewhere, --jobs processes at a time, one table level after
+    another (users, companies, departments, then workers/spendings/revenues,
+    then payroll) so foreign keys always resolve
+  - ids of users, companies, departments and workers are assigned up front
+    (after the current maximum), so child rows never read ids back
+
+Usage (from backend/, applies pending migrations first):
+    python seed_data.py                                  # 1000 companies, ~1.1M rows
+    python seed_data.py --companies 10000 --workers 100 --jobs 8
+    python seed_data.py --database-url sqlite:////tmp/bench.db --companies 50 --seed 7
+"""
+import argparse
+import csv
+import io
+import math
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+
+MICRO_PER_USDC = 1_000_000
+FIRST_NAMES = ["Alex", "Maria", "John", "Olga", "Ivan", "Sara", "David", "Anna", "Omar", "Lena",
+               "Peter", "Nina", "Chen", "Fatima", "Lucas", "Emma", "Ravi", "Sofia", "Tom", "Yuki"]
+SURNAMES = ["Smith", "Ivanova", "Garcia", "Kim", "Novak", "Silva", "Chen", "Khan", "Müller", "Rossi",
+            "Petrov", "Brown", "Sato", "Nowak", "Haddad", "Jensen", "Lopez", "Wang", "Costa", "Weber"]
+DEPARTMENT_NAMES = ["Engineering", "Sales", "Operations", "Support", "Marketing", "Finance",
+                    "Product", "Design", "Legal", "People", "Research", "Security"]
+SPENDING_NAMES = ["Cloud hosting", "Office rent", "Software licenses", "Travel", "Equipment",
+                  "Contractors", "Advertising", "Legal fees", "Training", "Catering"]
+
+COLUMNS = {
+    "users": ("id", "email", "password_hash", "company_name", "created_at"),
+    "companies": ("id", "user_id", "master_wallet_address", "circle_wallet_id", "created_at"),
+    "departments": ("id", "company_id", "name", "created_at"),
+    "workers": ("id", "department_id", "name", "surname", "salary_micro", "wallet_address",
+                "is_active", "created_at"),
+    "additional_spendings": ("company_id", "department_id", "name", "amount_micro", "wallet_address",
+                             "created_at"),
+    "revenues": ("company_id", "amount_micro", "month", "year", "created_at"),
+    "payroll_transactions": ("company_id", "worker_id", "amount_micro", "period_start", "period_end",
+                             "status", "transaction_hash", "circle_transaction_id", "idempotency_key", "created_at"),
+}
+# Tables whose ids are assigned here (the others use the database's autoincrement)
+EXPLICIT_IDS = ("users", "companies", "departments", "workers")
+# Load order: each level only references tables of earlier levels
+LEVELS = [("users",), ("companies",), ("departments",),
+          ("workers", "additional_spendings", "revenues"), ("payroll_transactions",)]
+
+
+def rng_for(seed: int, table: str, index: int) -> random.Random:
+    # String seeds are hashed with SHA-512: stable across processes and PYTHONHASHSEED
+    return random.Random(f"{seed}:{table}:{index}")
+
+
+def timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def month_start(today: date, months_back: int) -> date:
+    index = today.year * 12 + today.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Layout:
+    """
+    Sizes and id ranges of everything to generate, computed once up front.
+    Company c (0-based) owns departments dept_start[c]..dept_start[c + 1] - 1;
+    department d owns workers worker_start[d]..worker_start[d + 1] - 1 (0-based
+    indexes; database id = first_id + index).
+    """
+
+    def __init__(self, args, first_ids: Dict[str, int], password_hash: str):
+        self.seed = args.seed
+        self.months = args.months
+        self.today = date.today()
+        self.password_hash = password_hash
+        self.first_ids = first_ids
+        self.companies = args.companies
+
+        rng = rng_for(args.seed, "layout", 0)
+        sigma = 1.0
+        mu = math.log(max(args.workers, 1)) - sigma ** 2 / 2
+        self.dept_start = [0]
+        self.worker_start = [0]
+        self.spendings: List[int] = []
+        self.company_workers: List[int] = []
+        for _ in range(args.companies):
+            workers = max(1, round(rng.lognormvariate(mu, sigma)))
+            departments = min(len(DEPARTMENT_NAMES), 1 + int(math.log2(workers + 1)))
+            weights = [1 / (rank + 1) for rank in range(departments)]  # Zipf: one big department
+            counts = [0] * departments
+            for department in rng.choices(range(departments), weights, k=workers):
+                counts[department] += 1
+            for count in counts:
+                self.worker_start.append(self.worker_start[-1] + count)
+            self.dept_start.append(self.dept_start[-1] + departments)
+            self.company_workers.append(workers)
+            self.spendings.append(rng.randint(0, 2 * args.spendings * args.months))
+
+    def row_counts(self) -> Dict[str, int]:
+        return {
+            "users": self.companies,
+            "companies": self.companies,
+            "departments": self.dept_start[-1],
+            "workers": self.worker_start[-1],
+            "additional_spendings": sum(self.spendings),
+            "revenues": self.companies * self.months,
+            "payroll_transactions": None,  # Depends on hire dates and active flags
+        }
+
+    # Row generators for companies [start, stop)
+    def users(self, start: int, stop: int):
+        created = timestamp(datetime.combine(month_start(self.today, self.months + 1), datetime.min.time()))
+        for c in range(start, stop):
+            user_id = self.first_ids["users"] + c
+            yield (user_id, f"seed-{user_id}@example.com", self.password_hash, f"Seed Company {user_id}", created)
+
+    def companies_rows(self, start: int, stop: int):
+        created = timestamp(datetime.combine(month_start(self.today, self.months + 1), datetime.min.time()))
+        for c in range(start, stop):
+            rng = rng_for(self.seed, "companies", c)
+            yield (self.first_ids["companies"] + c, self.first_ids["users"] + c,
+                   f"0x{rng.getrandbits(160):040x}", str(uuid.UUID(int=rng.getrandbits(128))), created)
+
+    def departments(self, start: int, stop: int):
+        created = timestamp(datetime.combine(month_start(self.today, self.months + 1), datetime.min.time()))
+        for c in range(start, stop):
+            first = self.dept_start[c]
+            names = rng_for(self.seed, "departments", c).sample(DEPARTMENT_NAMES, self.dept_start[c + 1] - first)
+            for offset, name in enumerate(names):
+                yield (self.first_ids["departments"] + first + offset, self.first_ids["companies"] + c, name, created)
+
+    def department_workers(self, d: int) -> List[Tuple]:
+        """Workers of department d: (id, department_id, name, surname, salary_micro, wallet, is_active, hired)"""
+        rng = rng_for(self.seed, "workers", d)
+        median = rng.lognormvariate(math.log(4_200), 0.25)  # Departments pay differently
+        history_days = (self.months + 24) * 30
+        workers = []
+        for w in range(self.worker_start[d], self.worker_start[d + 1]):
+            salary = min(40_000.0, max(1_200.0, rng.lognormvariate(math.log(median), 0.4)))
+            hired = self.today - timedelta(days=rng.randrange(history_days))
+            workers.append((
+                self.first_ids["workers"] + w, self.first_ids["departments"] + d,
+                rng.choice(FIRST_NAMES), rng.choice(SURNAMES),
+                round(salary * 100) * (MICRO_PER_USDC // 100),
+                f"0x{rng.getrandbits(160):040x}",
+                1 if rng.random() > 0.08 else 0,
+                hired,
+            ))
+        return workers
+
+    def workers(self, start: int, stop: int):
+        for d in range(self.dept_start[start], self.dept_start[stop]):
+            for worker in self.department_workers(d):
+                yield worker[:7] + (timestamp(datetime.combine(worker[7], datetime.min.time())),)
+
+    def additional_spendings(self, start: int, stop: int):
+        history_days = self.months * 30
+        for c in range(start, stop):
+            rng = rng_for(self.seed, "additional_spendings", c)
+            departments = list(range(self.first_ids["departments"] + self.dept_start[c],
+                                     self.first_ids["departments"] + self.dept_start[c + 1]))
+            for _ in range(self.spendings[c]):
+                amount = max(1.0, rng.lognormvariate(math.log(800), 0.9))
+                created = datetime.combine(self.today, datetime.min.time()) - timedelta(
+                    days=rng.randrange(history_days), minutes=rng.randrange(1440))
+                yield (self.first_ids["companies"] + c,
+                       rng.choice(departments) if rng.random() < 0.7 else None,  # None: CEO level
+                       rng.choice(SPENDING_NAMES),
+                       round(amount * 100) * (MICRO_PER_USDC // 100),
+                       f"0x{rng.getrandbits(160):040x}",
+                       timestamp(created))
+
+    def revenues(self, start: int, stop: int):
+        for c in range(start, stop):
+            rng = rng_for(self.seed, "revenues", c)
+            for back in range(1, self.months + 1):
+                month = month_start(self.today, back)
+                amount = self.company_workers[c] * rng.lognormvariate(math.log(4_200 * 1.3), 0.2)
+                yield (self.first_ids["companies"] + c, round(amount * 100) * (MICRO_PER_USDC // 100),
+                       month.month, month.year, timestamp(datetime.combine(month, datetime.min.time())))
+
+    def payroll_transactions(self, start: int, stop: int):
+        from src.payout_engine import payroll_idempotency_key  # Same keys as real runs: re-running a period skips it
+        periods = []
+        for back in range(self.months, 0, -1):
+            period_start = month_start(self.today, back)
+            period_end = month_start(self.today, back - 1) - timedelta(days=1)
+            periods.append((period_start, period_end, timestamp(
+                datetime.combine(period_end + timedelta(days=1), datetime.min.time()) + timedelta(hours=9))))
+        periods = [(start_, end, start_.isoformat(), end.isoformat(), created) for start_, end, created in periods]
+        for c in range(start, stop):
+            rng = rng_for(self.seed, "payroll_transactions", c)
+            company_id = self.first_ids["companies"] + c
+            workers = [w for d in range(self.dept_start[c], self.dept_start[c + 1])
+                       for w in self.department_workers(d) if w[6]]
+            for period_start, period_end, start_text, end_text, created in periods:
+                for worker in workers:
+                    if worker[7] > period_end:
+                        continue  # Not hired yet
+                    key = payroll_idempotency_key(company_id, worker[0], period_start, period_end)
+                    if rng.random() < 0.01:
+                        yield (company_id, worker[0], worker[4], start_text, end_text, "failed", None, None, key,
+                               created)
+                        continue
+                    yield (company_id, worker[0], worker[4], start_text, end_text, "COMPLETE",
+                           f"0x{rng.getrandbits(256):064x}", str(uuid.UUID(int=rng.getrandbits(128))), key, created)
+
+    def rows(self, table: str, start: int, stop: int):
+        generator = self.companies_rows if table == "companies" else getattr(self, table)
+        return generator(start, stop)
+
+
+# Loading (one engine per process)
+_engine = None
+_layout: Optional[Layout] = None
+
+
+def make_engine(database_url: str):
+    if database_url.startswith("sqlite"):
+        # Block loads from several processes take turns on SQLite's write lock
+        return create_engine(database_url, connect_args={"timeout": 600})
+    return create_engine(database_url, pool_size=1, max_overflow=0)
+
+
+def _init_worker(database_url: str, layout: Layout):
+    global _engine, _layout
+    _engine = make_engine(database_url)
+    _layout = layout
+
+
+def bulk_insert(connection, paramstyle: str, table: str, columns: Tuple[str, ...], rows) -> int:
+    """COPY FROM STDIN on PostgreSQL drivers that support it, executemany elsewhere"""
+    cursor = connection.cursor()
+    names = ", ".join(columns)
+    if hasattr(cursor, "copy_expert") or hasattr(cursor, "copy"):
+        # CSV: None is written as an unquoted empty field, which COPY reads as NULL
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        statement = f"COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)"
+        buffer.seek(0)
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+        return count
+
+    placeholder = {"qmark": "?", "numeric": None, "named": None}.get(paramstyle, "%s")
+    if placeholder is None:
+        raise RuntimeError(f"Unsupported DB-API paramstyle: {paramstyle}")
+    rows = list(rows)
+    cursor.executemany(f"INSERT INTO {table} ({names}) VALUES ({', '.join([placeholder] * len(columns))})", rows)
+    return len(rows)
+
+
+def load_block(table: str, start: int, stop: int) -> int:
+    """Generate and load the rows of `table` for companies [start, stop); returns the row count"""
+    connection = _engine.raw_connection()
+    try:
+        if _engine.dialect.name == "sqlite":
+            connection.dbapi_connection.execute("PRAGMA synchronous = OFF")  # This connection only
+        count = bulk_insert(connection.dbapi_connection, _engine.dialect.dbapi.paramstyle,
+                            table, COLUMNS[table], _layout.rows(table, start, stop))
+        connection.commit()
+        return count
+    finally:
+        connection.close()
+
+
+def first_ids(engine) -> Dict[str, int]:
+    with engine.connect() as conn:
+        return {table: (conn.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0) + 1
+                for table in EXPLICIT_IDS}
+
+
+def reset_sequences(engine):
+    """PostgreSQL serial sequences do not move for explicit ids; point them past the loaded rows"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in EXPLICIT_IDS:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+            ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic BossBoard database")
+    parser.add_argument("--database-url", default=None, help="Default: DATABASE_URL (as the API)")
+    parser.add_argument("--companies", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=100, help="Mean workers per company (log-normal)")
+    parser.add_argument("--months", type=int, default=12, help="Months of revenue and payroll history")
+    parser.add_argument("--spendings", type=int, default=10, help="Mean spendings per company per month")
+    parser.add_argument("--password", default="test123", help="Password of every generated user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Loader processes")
+    parser.add_argument("--block", type=int, default=50, help="Companies per load task")
+    parser.add_argument("--no-migrate", action="store_true", help="Do not apply pending migrations first")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url  # Before src.database builds its engine
+    from src.auth import get_password_hash
+    from src.database import DATABASE_URL
+    from src.migrations import run_migrations
+
+    database_url = DATABASE_URL
+    engine = make_engine(database_url)
+    print(f"[SEED] Database: {engine.url.render_as_string(hide_password=True)}")
+    if not args.no_migrate:
+        run_migrations(engine)
+
+    started = time.perf_counter()
+    password_hash = get_password_hash(args.password)  # Once, not per user
+    layout = Layout(args, first_ids(engine), password_hash)
+    expected = layout.row_counts()
+    print(f"[SEED] {args.companies:,} companies, {expected['departments']:,} departments, "
+          f"{expected['workers']:,} workers, {expected['additional_spendings']:,} spendings, "
+          f"{expected['revenues']:,} revenues, {args.months} months of payroll; "
+          f"{args.jobs} job(s), seed {args.seed}")
+
+    blocks = [(start, min(start + args.block, args.companies)) for start in range(0, args.companies, args.block)]
+    loaded: Dict[str, int] = {}
+    pool = None
+    if args.jobs > 1:
+        pool = ProcessPoolExecutor(args.jobs, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(database_url, layout))
+    else:
+        _init_worker(database_url, layout)
+    try:
+        for level in LEVELS:
+            level_started = time.perf_counter()
+            tasks = [(table, start, stop) for table in level for start, stop in blocks]
+            if pool:
+                counts = list(pool.map(load_block, *zip(*tasks)))
+            else:
+                counts = [load_block(*task) for task in tasks]
+            for (table, _, _), count in zip(tasks, counts):
+                loaded[table] = loaded.get(table, 0) + count
+            rows = sum(counts)
+            elapsed = time.perf_counter() - level_started
+            print(f"[SEED]   {', '.join(level):<50} {rows:>10,} rows {elapsed:>7.1f}s "
+                  f"({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    finally:
+        if pool:
+            pool.shutdown()
+    reset_sequences(engine)
+
+    total = sum(loaded.values())
+    elapsed = time.perf_counter() - started
+    print(f"[SEED] Loaded {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s); "
+          f"users log in as seed-<id>@example.com / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
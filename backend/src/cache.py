@@ -1,12 +1,19 @@
 """
-Simple in-memory cache for dashboard statistics
+Simple in-memory cache for dashboard statistics, plus per-user collection
+version counters that drive the list endpoints' ETags
 """
+import secrets
 import time
 
 # Cache storage: {cache_key: (data, timestamp)}
 _cache = {}
 _cache_ttl = 5  # seconds
 
+# Collection versions: {(user_id, collection): counter}. Counters live in memory, so
+# every ETag also carries a per-process boot id - after a restart no old ETag matches.
+_versions = {}
+_boot_id = secrets.token_hex(4)
+
 
 def get_cache_key(user_id: int, cache_type: str = "dashboard_stats") -> str:
     """Generate cache key"""
@@ -56,3 +63,20 @@ def clear_all_cache():
     """Clear all cached data"""
     _cache.clear()
 
+
+
+def get_version(user_id: int, collection: str) -> int:
+    """Current version of a user's collection (workers, departments, ...)"""
+    return _versions.get((user_id, collection), 0)
+
+
+def bump_versions(user_id: int, *collections: str):
+    """Mark collections as changed; call after every committed mutation"""
+    for collection in collections:
+        key = (user_id, collection)
+        _versions[key] = _versions.get(key, 0) + 1
+
+
+def collection_etag(user_id: int, *collections: str) -> str:
+    """Opaque version token for a user's collections (no quotes)"""
+    return _boot_id + "-" + ".".join(str(get_version(user_id, c)) for c in collections)
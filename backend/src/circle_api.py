@@ -12,10 +12,22 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.serialization import load_pem_public_key
 from cryptography.hazmat.backends import default_backend
+from .circle_resilience import CIRCLE_READ_MAX_WAIT, CIRCLE_WRITE_MAX_WAIT, circle_guard
 
 load_dotenv()
 
-CIRCLE_API_BASE = "https://api.circle.com"
+# Override to point at a local stand-in (benchmarks/fake_circle.py) for offline load tests
+CIRCLE_API_BASE = os.getenv("CIRCLE_API_BASE_URL", "https://api.circle.com").rstrip("/")
+# Per-request timeout; a hung connection must not hold a payroll worker forever
+CIRCLE_TIMEOUT_SECONDS = float(os.getenv("CIRCLE_TIMEOUT_SECONDS", "10"))
+
+
+class CircleHTTPError(RuntimeError):
+    """Circle answered a transfer with an HTTP error status"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class CircleAPI:
@@ -47,16 +59,44 @@ class CircleAPI:
             "Accept": "application/json"
         }
     
+    def _request(self, method: str, url: str, timeout: float = CIRCLE_TIMEOUT_SECONDS,
+                 idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through circle_guard (rate limit, circuit breaker, retries).
+        Only idempotent requests are retried (GETs by default): a resent POST could pay
+        twice, and a transfer's body cannot be resent as is (single-use ciphertext).
+        Raises CircleUnavailable when the breaker is open or no slot came up in time.
+        """
+        headers = self._get_headers()
+        return circle_guard.call(
+            lambda: requests.request(method, url, headers=headers, timeout=timeout, **kwargs),
+            idempotent=method == "GET" if idempotent is None else idempotent,
+            max_wait=CIRCLE_READ_MAX_WAIT if method == "GET" else CIRCLE_WRITE_MAX_WAIT,
+        )
+    
+    def _fresh(self, kind: str, key: str, value):
+        """Remember a good read for _stale and return it"""
+        circle_guard.stale.put((kind, key), value)
+        return value
+    
+    def _stale(self, kind: str, key: str, default):
+        """Last good value of a failed read, or default if there is none recent enough"""
+        cached = circle_guard.stale.get((kind, key))
+        if cached is None:
+            return default
+        value, age = cached
+        print(f"[CIRCLE] Serving cached {kind} for {key} ({age:.0f}s old)")
+        return value
+    
     def get_public_key(self) -> str:
         """Get Circle's public key for encryption (cached)"""
         if self._public_key_cache:
             return self._public_key_cache
         
         url = f"{self.base_url}/v1/w3s/config/entity/publicKey"
-        headers = self._get_headers()
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             public_key_pem = response.json()["data"]["publicKey"]
             self._public_key_cache = public_key_pem
@@ -101,7 +141,8 @@ class CircleAPI:
         amount: str,
         token_id: Optional[str] = None,
         token_address: Optional[str] = None,
-        blockchain: str = "ARC-TESTNET"
+        blockchain: str = "ARC-TESTNET",
+        idempotency_key: Optional[str] = None
     ) -> Dict:
         """
         Transfer USDC from Circle wallet to destination address.
@@ -116,6 +157,9 @@ class CircleAPI:
             token_id: USDC token ID (UUID) - preferred if available
             token_address: USDC token contract address - use if token_id not available
             blockchain: Blockchain identifier (default: ARC-TESTNET)
+            idempotency_key: Stable key (UUID) of the payment; makes the transfer safe to
+                resend (the payout engine retries with a fresh ciphertext). A random key
+                is used when omitted
             
         Returns:
             Dict with transaction ID and state
@@ -138,9 +182,9 @@ class CircleAPI:
         print("[DEBUG] Entity secret encrypted successfully")
         
         url = f"{self.base_url}/v1/w3s/developer/transactions/transfer"
-        headers = self._get_headers()
         
-        idempotency_key = str(uuid.uuid4())
+        # A stable key makes the transfer safe to resend: Circle returns the original transaction
+        idempotency_key = idempotency_key or str(uuid.uuid4())
         print(f"[DEBUG] Idempotency Key: {idempotency_key}")
         
         # Build base data
@@ -212,7 +256,9 @@ class CircleAPI:
         print(f"[DEBUG] Request payload keys: {list(data.keys())}")
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            # Sent once: Circle rejects a reused entitySecretCiphertext, so the payout engine
+            # retries by calling transfer_usdc again (re-encrypted, same idempotency key)
+            response = self._request("POST", url, json=data, timeout=30, idempotent=False)
             print(f"[DEBUG] Response status code: {response.status_code}")
             
             try:
@@ -240,7 +286,7 @@ class CircleAPI:
                 else:
                     error_msg += f" - {error_body}"
                 
-                raise RuntimeError(error_msg)
+                raise CircleHTTPError(error_msg, response.status_code)
             
             result = response.json()
             
@@ -269,7 +315,7 @@ class CircleAPI:
             print(f"[DEBUG] Exception occurred: {e}")
             import traceback
             traceback.print_exc()
-            raise RuntimeError(f"Failed to transfer USDC: {e}")
+            raise RuntimeError(f"Failed to transfer USDC: {e}") from e
     
     def find_usdc_token_id(self, wallet_id: str) -> Optional[str]:
         """
@@ -282,10 +328,9 @@ class CircleAPI:
             USDC token ID (UUID) or None if not found
         """
         url = f"{self.base_url}/v1/w3s/developer/wallets/{wallet_id}/balances"
-        headers = self._get_headers()
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._request("GET", url)
             response.raise_for_status()
             result = response.json()
             
@@ -320,7 +365,6 @@ class CircleAPI:
         print(f"[DEBUG] CircleAPI.get_usdc_balance() called for wallet_id: {wallet_id}")
         
         url = f"{self.base_url}/v1/w3s/developer/wallets/balances"
-        headers = self._get_headers()
         
         # Get USDC token ID from environment or use default
         usdc_token_id = os.getenv("USDC_TOKEN_ID", "15dc2b5d-0994-58b0-bf8c-3a0501148ee8")  # Default ARC-TESTNET USDC token ID
@@ -341,7 +385,7 @@ class CircleAPI:
             print(f"[DEBUG] Request params: {params}")
             print(f"[DEBUG] Looking for wallet_id: {wallet_id}")
             
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = self._request("GET", url, params=params)
             print(f"[DEBUG] Response status: {response.status_code}")
             
             response.raise_for_status()
@@ -395,7 +439,7 @@ class CircleAPI:
                         try:
                             balance = float(amount_str)
                             print(f"[DEBUG] ✓ Found USDC balance by token_id: {balance} USDC")
-                            return balance
+                            return self._fresh("balance", wallet_id, balance)
                         except ValueError:
                             print(f"[DEBUG] ✗ Invalid amount format: {amount_str}")
                             return 0.0
@@ -406,7 +450,7 @@ class CircleAPI:
                         try:
                             balance = float(amount_str)
                             print(f"[DEBUG] ✓ Found USDC balance by symbol: {balance} USDC")
-                            return balance
+                            return self._fresh("balance", wallet_id, balance)
                         except ValueError:
                             print(f"[DEBUG] ✗ Invalid amount format: {amount_str}")
                             return 0.0
@@ -421,34 +465,35 @@ class CircleAPI:
             
         except requests.exceptions.RequestException as e:
             print(f"[BALANCE ERROR] Request failed: {e}")
-            return 0.0
+            return self._stale("balance", wallet_id, 0.0)
         except Exception as e:
             print(f"[BALANCE ERROR] {e}")
             import traceback
             traceback.print_exc()
-            return 0.0
+            return self._stale("balance", wallet_id, 0.0)
     
-    def get_wallet_balance(self, wallet_id: str, token_id: Optional[str] = None) -> float:
+    def get_wallet_balance(self, wallet_id: str, token_id: Optional[str] = None, strict: bool = False) -> float:
         """
         Get USDC balance for a Circle wallet.
         
         Args:
             wallet_id: Circle wallet ID (UUID) - Company wallet ID
             token_id: USDC token ID (UUID) - if None, will try to find USDC
+            strict: raise when the balance cannot be read instead of falling back to
+                a cached or 0.0 balance (payroll must not check funds against those)
             
         Returns:
-            USDC balance as float (0.0 if not found or error)
+            USDC balance as float (0.0 if not found or error, unless strict)
         """
         print(f"[DEBUG] CircleAPI.get_wallet_balance() called")
         print(f"[DEBUG] Wallet ID: {wallet_id}")
         print(f"[DEBUG] Token ID: {token_id or 'Not provided (will search by symbol)'}")
         
         url = f"{self.base_url}/v1/w3s/developer/wallets/{wallet_id}/balances"
-        headers = self._get_headers()
         
         try:
             print(f"[DEBUG] Sending GET request to: {url}")
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url)
             print(f"[DEBUG] Response status code: {response.status_code}")
             
             response.raise_for_status()
@@ -471,9 +516,11 @@ class CircleAPI:
                     try:
                         balance = float(amount_str)
                         print(f"[DEBUG] Found USDC balance by token_id: {balance} USDC")
-                        return balance
+                        return self._fresh("balance", wallet_id, balance)
                     except ValueError:
                         print(f"[DEBUG] Invalid amount format: {amount_str}")
+                        if strict:
+                            raise
                         return 0.0
                 
                 # Check by symbol if token_id not provided
@@ -482,17 +529,21 @@ class CircleAPI:
                     try:
                         balance = float(amount_str)
                         print(f"[DEBUG] Found USDC balance by symbol: {balance} USDC")
-                        return balance
+                        return self._fresh("balance", wallet_id, balance)
                     except ValueError:
                         print(f"[DEBUG] Invalid amount format: {amount_str}")
+                        if strict:
+                            raise
                         return 0.0
             
             print("[DEBUG] USDC token not found in balances")
             return 0.0
         except Exception as e:
+            if strict:
+                raise
             # Return 0.0 on error (don't fail dashboard if balance check fails)
             print(f"[DEBUG] Warning: Failed to get wallet balance: {e}")
-            return 0.0
+            return self._stale("balance", wallet_id, 0.0)
     
     def get_transaction_status(self, transaction_id: str) -> Optional[Dict]:
         """
@@ -505,23 +556,22 @@ class CircleAPI:
             Dict with transaction data or None if error
         """
         url = f"{self.base_url}/v1/w3s/developer/transactions/{transaction_id}"
-        headers = self._get_headers()
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             result = response.json()
             
             transaction = result.get("data", {}).get("transaction", {})
-            return {
+            return self._fresh("transaction", transaction_id, {
                 "id": transaction.get("id"),
                 "state": transaction.get("state"),
                 "txHash": transaction.get("txHash"),
                 "data": transaction
-            }
+            })
         except Exception as e:
             print(f"Warning: Failed to get transaction status: {e}")
-            return None
+            return self._stale("transaction", transaction_id, None)
     
     def get_wallet_transactions(self, wallet_id: str, limit: int = 50) -> list:
         """
@@ -535,7 +585,6 @@ class CircleAPI:
             List of transaction dictionaries or empty list if error
         """
         url = f"{self.base_url}/v1/w3s/developer/transactions"
-        headers = self._get_headers()
         
         params = {
             "walletIds": wallet_id,
@@ -543,19 +592,19 @@ class CircleAPI:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request("GET", url, params=params)
             response.raise_for_status()
             
             result = response.json()
             
             # Extract transactions from response
             transactions = result.get("data", {}).get("transactions", [])
-            return transactions if transactions else []
+            return self._fresh("wallet_transactions", wallet_id, transactions if transactions else [])
         except Exception as e:
             print(f"Warning: Failed to get wallet transactions: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            return self._stale("wallet_transactions", wallet_id, [])
     
     def get_wallet_address(self, wallet_id: str) -> Optional[str]:
         """
@@ -569,10 +618,9 @@ class CircleAPI:
             Blockchain address or None if error
         """
         url = f"{self.base_url}/v1/w3s/developer/wallets/{wallet_id}"
-        headers = self._get_headers()
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             result = response.json()
             
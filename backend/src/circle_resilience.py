@@ -0,0 +1,287 @@
+"""
+Client-side protection for Circle API calls, shared by every thread of the process
+
+  - AdaptiveRateLimiter: a token bucket capped at CIRCLE_RATE_LIMIT requests/second.
+    A 429 halves the rate and pauses the bucket for Retry-After; each success
+    adds a little back (AIMD), so the rate settles just under Circle's quota.
+  - CircuitBreaker: CIRCLE_BREAKER_FAILURES consecutive failures (connection
+    errors, timeouts, 429, 5xx) open it for CIRCLE_BREAKER_RESET_SECONDS; calls
+    then fail fast with CircleUnavailable instead of waiting on timeouts. After
+    the cool-down one probe is let through (half-open): success closes it,
+    failure opens it again.
+  - Retries with full-jitter exponential backoff, for reads only. Transfers are
+    sent once; the payout engine retries them with a freshly encrypted entity secret.
+  - StaleCache: last good balances and transaction statuses, served to dashboard
+    reads while the breaker is open or a read fails, for up to
+    CIRCLE_STALE_MAX_AGE_SECONDS. Payroll reads the balance strictly (no fallback).
+CircleAPI routes every request through circle_guard; GET /api/circle/metrics
+exposes its state.
+"""
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+# Requests/second across the process; keep it under the API key's quota
+CIRCLE_RATE_LIMIT = float(os.getenv("CIRCLE_RATE_LIMIT", "10"))
+CIRCLE_BREAKER_FAILURES = int(os.getenv("CIRCLE_BREAKER_FAILURES", "5"))
+CIRCLE_BREAKER_RESET_SECONDS = float(os.getenv("CIRCLE_BREAKER_RESET_SECONDS", "30"))
+# Attempts per idempotent request (1 = no retry)
+CIRCLE_READ_ATTEMPTS = int(os.getenv("CIRCLE_READ_ATTEMPTS", "3"))
+# Longest a read waits for a rate-limit slot before failing fast (dashboards should not hang)
+CIRCLE_READ_MAX_WAIT = float(os.getenv("CIRCLE_READ_MAX_WAIT", "2"))
+# Longest a transfer waits for a slot (payouts queue up instead of hammering the API)
+CIRCLE_WRITE_MAX_WAIT = float(os.getenv("CIRCLE_WRITE_MAX_WAIT", "120"))
+# Oldest last-good read served as a fallback; older entries count as missing
+CIRCLE_STALE_MAX_AGE_SECONDS = float(os.getenv("CIRCLE_STALE_MAX_AGE_SECONDS", "300"))
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 5.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircleUnavailable(RuntimeError):
+    """Circle is not called: the breaker is open or no rate-limit slot came up in time"""
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, max_rate: float = CIRCLE_RATE_LIMIT, min_rate: Optional[float] = None):
+        self.max_rate = max_rate
+        self.min_rate = min_rate if min_rate is not None else max(0.5, max_rate / 16)
+        self.rate = max_rate
+        self.tokens = max_rate  # Burst: one second's worth
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.throttled = 0  # 429 responses seen
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        if now > self.paused_until:
+            self.tokens = min(self.rate, self.tokens + (now - max(self.updated, self.paused_until)) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait: float):
+        """Take a slot, sleeping up to max_wait seconds; CircleUnavailable if none comes up in time"""
+        if self.max_rate <= 0:
+            return
+        deadline = time.monotonic() + max_wait
+        waited = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                ready = max(now, self.paused_until) + max(0.0, 1 - self.tokens) / self.rate
+                if ready > deadline:
+                    raise CircleUnavailable(f"Circle rate limit: no slot within {max_wait:.1f}s")
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                self.wait_seconds += ready - now
+            time.sleep(ready - now)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def on_throttled(self, retry_after: Optional[float]):
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "paused_seconds": round(max(0.0, self.paused_until - time.monotonic()), 3),
+                "throttled": self.throttled,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = CIRCLE_BREAKER_FAILURES,
+                 reset_seconds: float = CIRCLE_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0  # Consecutive
+        self.opened_at = 0.0
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self.probing = False
+                print("[CIRCLE] Circuit half-open - probing")
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True  # This call is the probe
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+            raise CircleUnavailable(f"Circle circuit open after {self.failures} failure(s); retry in {retry_in:.0f}s")
+
+    def release_probe(self):
+        """The probe never reached Circle (e.g. no rate-limit slot); let another call probe"""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.probing = False
+
+    def on_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print("[CIRCLE] Circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def on_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+                self.opens += 1
+                print(f"[CIRCLE] Circuit OPEN after {self.failures} consecutive failure(s) - "
+                      f"failing fast for {self.reset_seconds:.0f}s")
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 3) if self.state != self.CLOSED else 0.0,
+                "opens": self.opens,
+                "rejected": self.rejected,
+            }
+
+
+class StaleCache:
+    """Last good value per key, kept for fallbacks while younger than max_age_seconds"""
+
+    def __init__(self, max_entries: int = 1024, max_age_seconds: float = CIRCLE_STALE_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.entries: Dict[Tuple, Tuple[object, float]] = {}
+        self.lock = threading.Lock()
+        self.served = 0
+
+    def put(self, key: Tuple, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (value, time.time())
+            if len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))  # Oldest insertion
+
+    def get(self, key: Tuple):
+        """(value, age in seconds), or None if there is none or it is too old"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry[1]
+            if age > self.max_age_seconds:
+                del self.entries[key]
+                return None
+            self.served += 1
+            return entry[0], age
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class CircleGuard:
+    def __init__(self):
+        self.limiter = AdaptiveRateLimiter()
+        self.breaker = CircuitBreaker()
+        self.stale = StaleCache()
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "failures": 0, "retries": 0}
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def call(self, send: Callable[[], requests.Response], idempotent: bool, max_wait: float) -> requests.Response:
+        """
+        Run send() under the breaker and the rate limiter. Idempotent calls are retried
+        on request errors (connection, timeout), 429 and 5xx. Returns the last response (the caller
+        still checks its status); raises CircleUnavailable when Circle is not called.
+        """
+        attempts = CIRCLE_READ_ATTEMPTS if idempotent else 1
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            try:
+                self.limiter.acquire(max_wait)
+            except CircleUnavailable:
+                self.breaker.release_probe()
+                raise
+            self._count("requests")
+            retry_after = None
+            try:
+                response = send()
+            except requests.RequestException as e:
+                self._count("failures")
+                self.breaker.on_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                print(f"[CIRCLE] {type(e).__name__} - retrying ({attempt + 1}/{attempts - 1})")
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.breaker.on_success()
+                    self.limiter.on_success()
+                    return response
+                self._count("failures")
+                self.breaker.on_failure()
+                if response.status_code == 429:
+                    retry_after = retry_after_seconds(response)
+                    self.limiter.on_throttled(retry_after)
+                if attempt + 1 >= attempts:
+                    return response
+                print(f"[CIRCLE] HTTP {response.status_code} - retrying ({attempt + 1}/{attempts - 1})")
+            self._count("retries")
+            # Full jitter; never sooner than Retry-After
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            time.sleep(max(delay, min(retry_after or 0.0, BACKOFF_MAX_SECONDS)))
+        raise AssertionError("unreachable")
+
+    def metrics(self) -> dict:
+        with self.lock:
+            counters = dict(self.counters)
+        return {
+            "breaker": self.breaker.metrics(),
+            "rate_limiter": self.limiter.metrics(),
+            **counters,
+            "stale_served": self.stale.served,
+            "stale_entries": len(self.stale.entries),
+        }
+
+
+# Global guard instance (one per process, shared by all CircleAPI calls)
+circle_guard = CircleGuard()
@@ -0,0 +1,43 @@
+"""
+Conditional GET support for list endpoints
+
+Strong ETags come from the per-user collection versions in cache.py, so a
+matching If-None-Match is answered with 304 before any table is queried.
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from .cache import collection_etag
+
+
+def list_etag(request: Request, user_id: int, *collections: str) -> str:
+    """Strong ETag for one list URL: collection versions + the query string"""
+    tag = collection_etag(user_id, *collections)
+    query = str(request.query_params)
+    if query:
+        tag += "-" + hashlib.blake2b(query.encode(), digest_size=4).hexdigest()
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x", * matches anything"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_get(request: Request, response: Response, user_id: int, *collections: str) -> Optional[Response]:
+    """
+    Set ETag on the response; return a 304 to send instead when the client's copy is current.
+    Call before querying the collection.
+    """
+    etag = list_etag(request, user_id, *collections)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,112 @@
+"""
+In-process event broker for the live event stream (GET /api/events/stream)
+
+Payroll payouts, payout status changes and wallet balance updates are published
+per user; every open stream of that user receives them. publish() is safe to
+call from request handlers, threadpool handlers and the background scheduler
+thread. A short per-user history lets reconnecting clients resume with
+Last-Event-ID instead of missing events.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Events kept per user for Last-Event-ID replay
+EVENT_HISTORY_SIZE = 100
+# Undelivered events per subscriber; the oldest are dropped for slow clients
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Event:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, event_id: int, event_type: str, data: dict):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class Subscription:
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event: Event):
+        """Runs on the subscriber's loop"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, List[Subscription]] = {}
+        self._history: Dict[int, deque] = {}
+        self._last_balance: Dict[int, object] = {}
+
+    def subscribe(self, user_id: int, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a stream on the running loop, pre-filled with events missed since last_event_id"""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, []).append(subscription)
+            history = list(self._history.get(user_id, ()))
+        if last_event_id and last_event_id.isdigit():
+            for event in history:
+                if event.id > int(last_event_id):
+                    subscription.offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def subscriber_count(self, user_id: int) -> int:
+        return len(self._subscribers.get(user_id, ()))
+
+    def publish(self, user_id: int, event_type: str, data: dict) -> Event:
+        event = Event(next(self._ids), event_type, data)
+        with self._lock:
+            self._history.setdefault(user_id, deque(maxlen=EVENT_HISTORY_SIZE)).append(event)
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Loop already closed (server shutting down)
+                self.unsubscribe(subscription)
+        return event
+
+    def publish_balance(self, user_id: int, wallet_id: str, balance) -> Optional[Event]:
+        """Publish a wallet balance, but only when it differs from the last one sent"""
+        if balance is None or self._last_balance.get(user_id) == balance:
+            return None
+        self._last_balance[user_id] = balance
+        return self.publish(user_id, "balance", {"wallet_id": wallet_id, "balance": float(balance)})
+
+
+def refresh_wallet_balance(user_id: int, wallet_id: Optional[str]):
+    """Fetch the Circle balance and publish it if it changed (e.g. after a payroll run)"""
+    if not wallet_id:
+        return
+    try:
+        from .circle_api import circle_api
+        event_broker.publish_balance(user_id, wallet_id, circle_api.get_usdc_balance(wallet_id))
+    except Exception as e:
+        print(f"[EVENTS] Could not refresh wallet balance: {e}")
+
+
+# Global broker instance
+event_broker = EventBroker()
@@ -0,0 +1,308 @@
+"""
+Monte Carlo cash-flow forecast on a process pool
+
+The monthly payroll comes from the treasury simulator: the company's active
+workers are loaded into an ArcTreasuryPayroll and the salaries are whatever its
+run_payroll pays. Each scenario then simulates N months of randomized cash flow:
+  - revenue: a month drawn from the company's recorded monthly revenues, times
+    mean-preserving lognormal noise (revenue_volatility)
+  - spendings: the same over monthly AdditionalSpending totals (by date)
+  - payroll: those salaries, minus workers who have left (each worker leaves
+    with monthly probability attrition_rate)
+Revenue lands, spendings are paid, then payroll runs. A scenario is insolvent
+from the first month its balance cannot cover payroll (the contract reverts) or
+goes negative; it stops paying payroll but keeps its other cash flows.
+
+Scenarios are simulated in chunks on a pool of spawned processes. Inputs
+(salaries, monthly histories) and outputs (first insolvent month, month-end
+balances) live in one shared memory block that each task attaches to by name,
+so a task pickles only its chunk bounds and seed. Chunk sizes depend only on
+the inputs and every chunk has its own seed, so a seeded forecast returns the
+same numbers whatever the pool size. numpy is required.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional, Sequence
+from .simulator import OWNER, TREASURY, load_company, load_simulator
+
+try:
+    import numpy as np
+except ImportError:  # optional: forecasting is unavailable without it
+    np = None
+
+# Forecast worker processes (spawned on first use, then reused)
+FORECAST_PROCESSES = int(os.getenv("FORECAST_PROCESSES", str(os.cpu_count() or 1)))
+# Scenario x worker cells drawn per chunk; bounds a task's memory (8 bytes per cell)
+CHUNK_CELLS = 2_000_000
+MAX_CHUNK_SCENARIOS = 1000
+# Smaller forecasts (scenarios x (months + workers drawn)) run in the calling process:
+# starting the pool would cost more than the simulation
+INLINE_CELLS = 5_000_000
+
+NEVER_INSOLVENT = 0  # first_insolvent value of scenarios that stay solvent
+PERCENTILES = (5, 50, 95)
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays in one shared memory block. `spec` is picklable; another
+    process re-creates the same views with attach(name, spec).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: List[tuple]):
+        self.shm = shm
+        self.spec = spec
+        self.arrays: Dict[str, "np.ndarray"] = {
+            name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, dtype, shape, offset in spec
+        }
+
+    @classmethod
+    def create(cls, fields: Sequence[tuple]) -> "SharedArrays":
+        """Block for (name, dtype, shape) fields, each 8-byte aligned"""
+        spec, size = [], 0
+        for name, dtype, shape in fields:
+            spec.append((name, dtype, shape, size))
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+        return cls(shared_memory.SharedMemory(create=True, size=max(size, 8)), spec)
+
+    @classmethod
+    def attach(cls, name: str, spec: List[tuple]) -> "SharedArrays":
+        return cls(shared_memory.SharedMemory(name=name), spec)
+
+    def close(self):
+        self.arrays = {}  # The buffer can only be released once no view refers to it
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A view is still held by a propagating traceback; freed with it
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class ForecastInputs:
+    """A company's cash-flow inputs, all in micro-USDC"""
+
+    def __init__(self, starting_balance_micro: int, salaries: "np.ndarray",
+                 revenue_history: Sequence[int], spending_history: Sequence[int]):
+        self.starting_balance_micro = starting_balance_micro
+        self.salaries = np.asarray(salaries, dtype=np.int64)  # One per worker the contract pays
+        self.revenue_history = np.asarray(revenue_history, dtype=np.int64)  # One per recorded month
+        self.spending_history = np.asarray(spending_history, dtype=np.int64)
+
+    @property
+    def monthly_payroll_micro(self) -> int:
+        return int(self.salaries.sum())
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Cash-flow forecasting requires numpy (pip install numpy)")
+
+
+def contract_salaries(departments, workers) -> "np.ndarray":
+    """Salaries one run_payroll of the company's contract pays, in worker order"""
+    require_numpy()
+    sim = load_simulator()
+    company = load_company(departments, workers)
+    columnar = sim.ColumnarPayroll.from_payroll(company.contract)
+    columnar.mint(TREASURY, sum(columnar.salary[columnar.active].tolist()))
+    return columnar.run_payroll(OWNER, TREASURY)["amount"].copy()
+
+
+# ---------- Simulation (runs in pool processes) ----------
+
+def _draw_monthly(rng, history: "np.ndarray", volatility: float, shape: tuple) -> "np.ndarray":
+    """Bootstrapped monthly amounts with mean-preserving lognormal noise; zeros without history"""
+    if not len(history):
+        return np.zeros(shape, dtype=np.int64)
+    amounts = history[rng.integers(0, len(history), size=shape)]
+    if volatility <= 0:
+        return amounts
+    noise = rng.lognormal(-volatility ** 2 / 2, volatility, size=shape)
+    return np.rint(amounts * noise).astype(np.int64)
+
+
+def _draw_payroll(rng, salaries: "np.ndarray", attrition_rate: float, scenarios: int, months: int) -> "np.ndarray":
+    """Payroll due per scenario and month as workers leave"""
+    total = int(salaries.sum())
+    if attrition_rate <= 0 or not len(salaries):
+        return np.full((scenarios, months), total, dtype=np.int64)
+    # The month a worker leaves (unpaid from then on) is geometric. Inverting its CDF on one
+    # uniform per worker, only for the few who leave within the horizon, is much cheaper
+    # than drawing the month for everyone; float32 and flat indices halve the memory traffic
+    # over the scenario x worker matrix, which dominates the cost.
+    uniform = rng.random((scenarios, len(salaries)), dtype=np.float32).ravel()
+    leavers = np.flatnonzero(uniform < 1 - (1 - attrition_rate) ** months)
+    scenario_rows, worker_rows = np.divmod(leavers, len(salaries))
+    if attrition_rate >= 1:
+        leave_months = np.ones(len(leavers), dtype=np.int64)
+    else:
+        leave_months = np.floor(np.log1p(-uniform[leavers].astype(np.float64)) / np.log1p(-attrition_rate))
+        leave_months = np.minimum(leave_months.astype(np.int64), months - 1) + 1  # Float rounding at the edge
+    lost = np.zeros(scenarios * months, dtype=np.int64)
+    np.add.at(lost, scenario_rows * months + leave_months - 1, salaries[worker_rows])
+    return total - np.cumsum(lost.reshape(scenarios, months), axis=1)
+
+
+def simulate_chunk(arrays: Dict[str, "np.ndarray"], params: dict, start: int, stop: int, seed):
+    """Simulate scenarios [start, stop) and write their rows of first_insolvent and balances"""
+    rng = np.random.default_rng(seed)
+    scenarios = stop - start
+    months = params["months"]
+    revenue = _draw_monthly(rng, arrays["revenue_history"], params["revenue_volatility"], (scenarios, months))
+    spending = _draw_monthly(rng, arrays["spending_history"], params["spending_volatility"], (scenarios, months))
+    payroll = _draw_payroll(rng, arrays["salaries"], params["attrition_rate"], scenarios, months)
+
+    first_insolvent = arrays["first_insolvent"][start:stop]
+    balances = arrays["balances"][start:stop]
+    balance = np.full(scenarios, params["starting_balance"], dtype=np.int64)
+    solvent = np.ones(scenarios, dtype=bool)
+    for month in range(months):
+        balance += revenue[:, month] - spending[:, month]
+        covered = balance >= payroll[:, month]  # Payroll is >= 0, so this also catches a negative balance
+        first_insolvent[solvent & ~covered] = month + 1
+        solvent &= covered
+        balance -= np.where(solvent, payroll[:, month], 0)
+        balances[:, month] = balance
+
+
+def _run_chunk(shm_name: str, spec: List[tuple], params: dict, start: int, stop: int, seed):
+    """Pool task: attach to the shared block, simulate one chunk, detach"""
+    shared = SharedArrays.attach(shm_name, spec)
+    try:
+        simulate_chunk(shared.arrays, params, start, stop, seed)
+    finally:
+        shared.close()
+
+
+# ---------- Engine ----------
+
+def chunk_size(workers: int, attrition_rate: float) -> int:
+    """Scenarios per task: payroll draws hold one cell per scenario and worker"""
+    if attrition_rate <= 0 or not workers:
+        return MAX_CHUNK_SCENARIOS
+    return max(16, min(MAX_CHUNK_SCENARIOS, CHUNK_CELLS // workers))
+
+
+class ForecastEngine:
+    def __init__(self, processes: int = FORECAST_PROCESSES):
+        self.processes = max(1, processes)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the API process runs threads (scheduler, payouts) whose locks fork would copy
+                self._pool = ProcessPoolExecutor(self.processes, mp_context=get_context("spawn"))
+                print(f"[FORECAST] Started process pool ({self.processes} processes)")
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def run(self, inputs: ForecastInputs, months: int, scenarios: int, revenue_volatility: float = 0.2,
+            spending_volatility: float = 0.1, attrition_rate: float = 0.0, seed: Optional[int] = None) -> dict:
+        """
+        Simulate `scenarios` x `months` and summarize them:
+        insolvency probability (cumulative) and balance percentiles per month, in micro-USDC
+        """
+        require_numpy()
+        started = time.perf_counter()
+        seed_sequence = np.random.SeedSequence(seed)
+        workers = len(inputs.salaries)
+        size = chunk_size(workers, attrition_rate)
+        bounds = [(start, min(start + size, scenarios)) for start in range(0, scenarios, size)]
+        seeds = seed_sequence.spawn(len(bounds))
+        params = {
+            "months": months,
+            "starting_balance": inputs.starting_balance_micro,
+            "revenue_volatility": revenue_volatility,
+            "spending_volatility": spending_volatility,
+            "attrition_rate": attrition_rate,
+        }
+
+        shared = SharedArrays.create([
+            ("salaries", np.int64, (workers,)),
+            ("revenue_history", np.int64, (len(inputs.revenue_history),)),
+            ("spending_history", np.int64, (len(inputs.spending_history),)),
+            ("first_insolvent", np.int16, (scenarios,)),
+            ("balances", np.int64, (scenarios, months)),
+        ])
+        try:
+            arrays = shared.arrays
+            arrays["salaries"][:] = inputs.salaries
+            arrays["revenue_history"][:] = inputs.revenue_history
+            arrays["spending_history"][:] = inputs.spending_history
+            arrays["first_insolvent"][:] = NEVER_INSOLVENT
+
+            cells = scenarios * (months + (workers if attrition_rate > 0 else 0))
+            processes = 1 if len(bounds) == 1 or self.processes == 1 or cells < INLINE_CELLS else self.processes
+            if processes == 1:
+                for (start, stop), chunk_seed in zip(bounds, seeds):
+                    simulate_chunk(arrays, params, start, stop, chunk_seed)
+            else:
+                pool = self._get_pool()
+                try:
+                    futures = [
+                        pool.submit(_run_chunk, shared.shm.name, shared.spec, params, start, stop, chunk_seed)
+                        for (start, stop), chunk_seed in zip(bounds, seeds)
+                    ]
+                    for future in futures:
+                        future.result()
+                except BrokenProcessPool:
+                    with self._lock:
+                        self._pool = None  # A worker died (e.g. out of memory); start a fresh pool next time
+                    raise
+
+            result = summarize(arrays["first_insolvent"], arrays["balances"], months)
+            del arrays
+        finally:
+            shared.close()
+            shared.unlink()
+
+        elapsed = time.perf_counter() - started
+        print(f"[FORECAST] {scenarios:,} scenarios x {months} months, {workers:,} workers "
+              f"in {elapsed:.2f}s ({processes} process(es), {len(bounds)} chunk(s))")
+        result.update({
+            "scenarios": scenarios,
+            "months": months,
+            "seed": seed_sequence.entropy,
+            "workers": workers,
+            "starting_balance_micro": inputs.starting_balance_micro,
+            "monthly_payroll_micro": inputs.monthly_payroll_micro,
+            "processes": processes,
+            "elapsed_seconds": round(elapsed, 3),
+        })
+        return result
+
+
+def summarize(first_insolvent: "np.ndarray", balances: "np.ndarray", months: int) -> dict:
+    """Cumulative insolvency probability and month-end balance percentiles per month"""
+    scenarios = len(first_insolvent)
+    insolvent_by_month = np.cumsum(np.bincount(first_insolvent, minlength=months + 1)[1:]) / scenarios
+    percentiles = np.rint(np.percentile(balances, PERCENTILES, axis=0)).astype(np.int64)
+    per_month = [
+        {
+            "month_index": month + 1,
+            "insolvency_probability": float(insolvent_by_month[month]),
+            **{f"balance_p{p}_micro": int(percentiles[i, month]) for i, p in enumerate(PERCENTILES)},
+        }
+        for month in range(months)
+    ]
+    return {
+        "insolvency_probability": float(insolvent_by_month[-1]) if months else 0.0,
+        "per_month": per_month,
+    }
+
+
+forecast_engine = ForecastEngine()
@@ -0,0 +1,134 @@
+"""
+Versioned schema migrations
+
+Each migration lives in src/migrations/versions/vNNNN_<name>.py and defines:
+    VERSION = "0002"              # ordering key, recorded in schema_migrations
+    DESCRIPTION = "..."
+    TRANSACTIONAL = True          # False for online operations (concurrent indexes, backfills)
+    def upgrade(ctx): ...         # ctx is a MigrationContext (see ops.py)
+
+Migrations must be idempotent: v0001 creates missing tables from the current
+models, so a fresh database may already contain what a later migration adds.
+
+Run with `python migrate.py` (see backend/migrate.py). The API server does not
+touch the schema on import; set MIGRATE_ON_START=true to migrate on startup.
+"""
+import importlib
+import pkgutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import Engine
+from .ops import MigrationContext
+from . import versions
+
+# Arbitrary constant identifying the migration lock in pg_advisory_lock()
+MIGRATION_LOCK_ID = 720_451_001
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class Migration:
+    def __init__(self, module):
+        self.version: str = module.VERSION
+        self.description: str = module.DESCRIPTION
+        self.transactional: bool = getattr(module, "TRANSACTIONAL", True)
+        self.upgrade = module.upgrade
+
+
+def discover_migrations() -> List[Migration]:
+    """Load all migration modules from the versions package, ordered by VERSION"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(module))
+    migrations.sort(key=lambda m: m.version)
+
+    seen = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise RuntimeError(f"Duplicate migration version {migration.version}")
+        seen.add(migration.version)
+    return migrations
+
+
+def applied_versions(engine: Engine) -> set:
+    _metadata.create_all(bind=engine, tables=[schema_migrations])
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [m for m in discover_migrations() if m.version not in applied]
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    """Serialize migration runs across replicas (PostgreSQL advisory lock)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+
+def _record(conn, migration: Migration):
+    conn.execute(insert(schema_migrations).values(
+        version=migration.version,
+        description=migration.description,
+        applied_at=datetime.utcnow(),
+    ))
+
+
+def run_migrations(
+    engine: Optional[Engine] = None,
+    target: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> List[str]:
+    """
+    Apply pending migrations in order (up to and including `target` if given).
+
+    Returns:
+        List of versions applied by this run
+    """
+    if engine is None:
+        from ..database import engine
+
+    applied_now = []
+    with _migration_lock(engine):
+        # Re-read under the lock: another replica may have just migrated
+        for migration in pending_migrations(engine):
+            if target and migration.version > target:
+                break
+
+            log(f"[MIGRATE] Applying {migration.version}: {migration.description}")
+            start = time.perf_counter()
+            if migration.transactional:
+                with engine.begin() as conn:
+                    migration.upgrade(MigrationContext(engine, conn, True, log))
+                    _record(conn, migration)
+            else:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    migration.upgrade(MigrationContext(engine, conn, False, log))
+                with engine.begin() as conn:
+                    _record(conn, migration)
+            log(f"[MIGRATE] {migration.version} done in {time.perf_counter() - start:.2f}s")
+            applied_now.append(migration.version)
+
+    if not applied_now:
+        log("[MIGRATE] Database is up to date")
+    return applied_now
@@ -0,0 +1,199 @@
+"""
+Migration operations: idempotent DDL helpers plus online operations
+(concurrent index builds and self-throttling batched backfills)
+"""
+import time
+from typing import Callable, Iterable, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+class MigrationContext:
+    """
+    Handed to each migration's upgrade().
+
+    Transactional migrations get a connection inside a transaction that also
+    records the version, so a failure rolls everything back. Non-transactional
+    migrations (TRANSACTIONAL = False) get an autocommit connection, which is
+    required for CREATE INDEX CONCURRENTLY and for backfills that commit per batch.
+    """
+
+    def __init__(self, engine: Engine, connection: Connection, transactional: bool,
+                 log: Callable[[str], None] = print):
+        self.engine = engine
+        self.connection = connection
+        self.transactional = transactional
+        self.log = log
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def execute(self, sql: str, params: Optional[dict] = None):
+        """Execute raw SQL on the migration connection"""
+        return self.connection.execute(text(sql), params or {})
+
+    # ---------- Introspection ----------
+
+    def has_table(self, table: str) -> bool:
+        return inspect(self.connection).has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        if not self.has_table(table):
+            return False
+        return any(c["name"] == column for c in inspect(self.connection).get_columns(table))
+
+    def has_index(self, table: str, name: str) -> bool:
+        if not self.has_table(table):
+            return False
+        return any(i["name"] == name for i in inspect(self.connection).get_indexes(table))
+
+    # ---------- Idempotent DDL ----------
+
+    def add_column(self, table: str, column: str, ddl_type: str):
+        """
+        Add a nullable column if it does not exist yet.
+        Nullable without a default is a metadata-only change on PostgreSQL (no table rewrite).
+        """
+        if self.has_column(table, column):
+            self.log(f"  [SKIP] {table}.{column} already exists")
+            return
+        self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+        self.log(f"  [OK] Added column {table}.{column} {ddl_type}")
+
+    def drop_column(self, table: str, column: str):
+        if not self.has_column(table, column):
+            self.log(f"  [SKIP] {table}.{column} already dropped")
+            return
+        self.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        self.log(f"  [OK] Dropped column {table}.{column}")
+
+    def set_not_null(self, table: str, column: str):
+        """
+        Mark a fully backfilled column NOT NULL.
+
+        PostgreSQL: a NOT VALID check constraint is validated under a lock that
+        still allows reads and writes, after which SET NOT NULL reuses it instead
+        of scanning the table under an exclusive lock.
+        SQLite cannot alter column constraints - the ORM enforces NOT NULL there.
+        """
+        if not self.is_postgres:
+            self.log(f"  [SKIP] {table}.{column} NOT NULL (not supported by {self.engine.dialect.name})")
+            return
+        constraint = f"{table}_{column}_not_null"
+        self.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}")
+        self.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID")
+        self.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+        self.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        self.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+        self.log(f"  [OK] {table}.{column} SET NOT NULL")
+
+    # ---------- Online operations ----------
+
+    def _require_autocommit(self, operation: str):
+        if self.transactional:
+            raise RuntimeError(f"{operation} requires a migration with TRANSACTIONAL = False")
+
+    def create_index(self, name: str, table: str, columns: Iterable[str], unique: bool = False):
+        """
+        Create an index without blocking writes.
+
+        PostgreSQL: CREATE INDEX CONCURRENTLY. A previously interrupted concurrent
+        build leaves an INVALID index behind, which IF NOT EXISTS would silently
+        accept - so invalid leftovers are dropped and rebuilt.
+        SQLite: plain CREATE INDEX IF NOT EXISTS.
+        """
+        self._require_autocommit("create_index")
+        unique_sql = "UNIQUE " if unique else ""
+        columns_sql = ", ".join(columns)
+
+        if self.is_postgres:
+            invalid = self.execute(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid",
+                {"name": name},
+            ).first()
+            if invalid:
+                self.log(f"  [WARNING] {name} is INVALID (interrupted build) - rebuilding")
+                self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            sql = f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns_sql})"
+        else:
+            sql = f"CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({columns_sql})"
+
+        start = time.perf_counter()
+        self.execute(sql)
+        self.log(f"  [OK] Index {name} ON {table} ({columns_sql}) in {time.perf_counter() - start:.2f}s")
+
+    def drop_index(self, name: str, table: str):
+        """Drop an index without blocking writes (DROP INDEX CONCURRENTLY on PostgreSQL)"""
+        self._require_autocommit("drop_index")
+        if not self.has_index(table, name):
+            self.log(f"  [SKIP] Index {name} already dropped")
+            return
+        concurrently = "CONCURRENTLY " if self.is_postgres else ""
+        self.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+        self.log(f"  [OK] Dropped index {name}")
+
+    def batched_backfill(
+        self,
+        table: str,
+        assignments: str,
+        where: Optional[str] = None,
+        batch_size: int = 1000,
+        max_duty_cycle: float = 0.5,
+        key: str = "id",
+    ) -> int:
+        """
+        UPDATE a large table in primary-key windows, committing after each batch.
+
+        Each batch holds row locks only for its own window. After every batch the
+        backfill sleeps in proportion to how long the batch took, so it uses at
+        most `max_duty_cycle` of the database's time (0.5 = work half the time)
+        and backs off automatically when the database is under load.
+
+        Args:
+            table: Table to update
+            assignments: SET clause, e.g. "salary_micro = CAST(ROUND(salary * 1000000) AS BIGINT)"
+            where: Extra filter selecting rows that still need the backfill
+            batch_size: Primary-key window size per batch
+            max_duty_cycle: Fraction of wall time spent running batches (0 < x <= 1)
+            key: Integer primary key column used for windowing
+
+        Returns:
+            Number of rows updated
+        """
+        self._require_autocommit("batched_backfill")
+        if not 0 < max_duty_cycle <= 1:
+            raise ValueError("max_duty_cycle must be in (0, 1]")
+
+        bounds = self.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}").first()
+        if bounds is None or bounds[0] is None:
+            self.log(f"  [SKIP] {table} is empty - nothing to backfill")
+            return 0
+        low, high = bounds
+
+        extra = f" AND ({where})" if where else ""
+        sql = f"UPDATE {table} SET {assignments} WHERE {key} >= :start AND {key} < :end{extra}"
+
+        total = 0
+        started = last_log = time.perf_counter()
+        for window_start in range(low, high + 1, batch_size):
+            batch_started = time.perf_counter()
+            with self.engine.begin() as conn:
+                result = conn.execute(text(sql), {"start": window_start, "end": window_start + batch_size})
+            total += max(result.rowcount or 0, 0)
+            elapsed = time.perf_counter() - batch_started
+
+            # Throttle: idle long enough to keep the duty cycle under the cap
+            if max_duty_cycle < 1:
+                time.sleep(elapsed * (1 - max_duty_cycle) / max_duty_cycle)
+
+            now = time.perf_counter()
+            if now - last_log >= 2 or window_start + batch_size > high:
+                last_log = now
+                done = min(window_start + batch_size - low, high - low + 1)
+                rate = total / max(now - started, 1e-9)
+                self.log(f"  [BACKFILL] {table}: {done}/{high - low + 1} keys scanned, "
+                         f"{total} rows updated ({rate:.0f} rows/s)")
+
+        return total
@@ -0,0 +1 @@
+# Versioned migrations: vNNNN_<name>.py, applied in VERSION order
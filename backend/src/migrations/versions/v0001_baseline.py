@@ -0,0 +1,18 @@
+"""
+Baseline schema: create any missing tables from the ORM models.
+
+Replaces the Base.metadata.create_all() call that used to run at import time in
+main.py. Existing tables are left untouched (checkfirst).
+"""
+from ...database import Base
+from ... import models  # noqa: F401  (registers tables on Base.metadata)
+
+VERSION = "0001"
+DESCRIPTION = "Baseline tables"
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    missing = [t.name for t in Base.metadata.sorted_tables if not ctx.has_table(t.name)]
+    Base.metadata.create_all(bind=ctx.connection, checkfirst=True)
+    ctx.log(f"  [OK] Created tables: {', '.join(missing) if missing else 'none (all exist)'}")
@@ -0,0 +1,15 @@
+"""
+Circle wallet integration columns (previously apply_circle_migration.py).
+
+Nullable columns without defaults: metadata-only on PostgreSQL, no table rewrite.
+"""
+VERSION = "0002"
+DESCRIPTION = "Circle wallet columns on companies and payroll_transactions"
+TRANSACTIONAL = True
+
+
+def upgrade(ctx):
+    ctx.add_column("companies", "circle_wallet_id", "VARCHAR")
+    ctx.add_column("companies", "circle_wallet_set_id", "VARCHAR")
+    ctx.add_column("companies", "entity_secret_encrypted", "TEXT")
+    ctx.add_column("payroll_transactions", "circle_transaction_id", "VARCHAR")
@@ -0,0 +1,26 @@
+"""
+Composite indexes for the tenant-scoped route queries.
+
+Built online (CREATE INDEX CONCURRENTLY on PostgreSQL) so payroll_transactions
+stays writable during the build.
+"""
+VERSION = "0003"
+DESCRIPTION = "Composite indexes for tenant-scoped queries"
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("idx_departments_company_id", "departments", ["company_id"]),
+    ("idx_workers_department_active", "workers", ["department_id", "is_active"]),
+    ("idx_spendings_company_department", "additional_spendings", ["company_id", "department_id"]),
+    ("idx_revenues_company_year_month", "revenues", ["company_id", "year", "month"]),
+    ("idx_payroll_company_period_created", "payroll_transactions",
+     ["company_id", "period_start", "period_end", "created_at"]),
+    ("idx_payroll_company_created", "payroll_transactions", ["company_id", "created_at"]),
+]
+
+
+def upgrade(ctx):
+    for name, table, columns in INDEXES:
+        ctx.create_index(name, table, columns)
+    for table in sorted({table for _, table, _ in INDEXES}):
+        ctx.execute(f"ANALYZE {table}")
@@ -0,0 +1,39 @@
+"""
+Store money as integer micro-USDC instead of floats.
+
+For each float column: add a BIGINT *_micro column, backfill it in throttled
+primary-key batches (CAST(ROUND(x * 1000000) AS BIGINT)), mark it NOT NULL and
+drop the float column. Databases created after this change already have only
+the *_micro columns (v0001 builds from the models) and skip every step.
+
+The float columns are dropped in the same run, so deploy the code that writes
+*_micro right after migrating (release / preDeploy step).
+"""
+VERSION = "0004"
+DESCRIPTION = "Integer micro-USDC money columns"
+TRANSACTIONAL = False
+
+# (table, legacy float column, micro-USDC column)
+MONEY_COLUMNS = [
+    ("workers", "salary", "salary_micro"),
+    ("additional_spendings", "amount", "amount_micro"),
+    ("revenues", "amount", "amount_micro"),
+    ("payroll_transactions", "amount", "amount_micro"),
+    ("spending_transactions", "amount", "amount_micro"),
+]
+
+
+def upgrade(ctx):
+    for table, legacy, micro in MONEY_COLUMNS:
+        if not ctx.has_column(table, legacy):
+            ctx.log(f"  [SKIP] {table}.{legacy} not present - {table} already uses {micro}")
+            continue
+
+        ctx.add_column(table, micro, "BIGINT")
+        ctx.batched_backfill(
+            table,
+            f"{micro} = CAST(ROUND({legacy} * 1000000) AS BIGINT)",
+            where=f"{micro} IS NULL AND {legacy} IS NOT NULL",
+        )
+        ctx.set_not_null(table, micro)
+        ctx.drop_column(table, legacy)
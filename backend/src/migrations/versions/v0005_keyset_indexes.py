@@ -0,0 +1,30 @@
+"""
+Indexes for keyset-paginated listings.
+
+Spendings and payroll transaction lists are paged by id within a company, so the
+listing indexes end in id and a page is one index range scan. Each keyset index
+is built before the index it extends is dropped, so a listing is never left
+without one. Built and dropped online (CONCURRENTLY on PostgreSQL); keyset
+indexes that already exist (created with the tables) are kept as they are.
+"""
+VERSION = "0005"
+DESCRIPTION = "Keyset pagination indexes for spendings and payroll transactions"
+TRANSACTIONAL = False
+
+# (new index, table, columns, index it supersedes)
+INDEXES = [
+    ("idx_spendings_company_department_keyset", "additional_spendings",
+     ["company_id", "department_id", "id"], "idx_spendings_company_department"),
+    ("idx_payroll_company_keyset", "payroll_transactions", ["company_id", "id"], "idx_payroll_company_created"),
+]
+
+
+def upgrade(ctx):
+    for name, table, columns, superseded in INDEXES:
+        if ctx.has_index(table, name):
+            ctx.log(f"  [SKIP] Index {name} already exists")
+        else:
+            ctx.create_index(name, table, columns)
+        ctx.drop_index(superseded, table)
+    for table in sorted({table for _, table, _, _ in INDEXES}):
+        ctx.execute(f"ANALYZE {table}")
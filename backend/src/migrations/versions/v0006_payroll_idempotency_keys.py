@@ -0,0 +1,71 @@
+"""
+Deterministic idempotency keys on payroll transactions.
+
+Adds payroll_transactions.idempotency_key and backfills it so payroll items paid
+before this change are recognised by the next run of the same period. Periods
+may have been run more than once, so only one row per (company, worker, period)
+gets the key: the latest row that did not fail, else the latest row. The other
+rows keep NULL (the unique index allows several NULLs). Keys are computed in
+Python (UUIDv5), in throttled batches, then the unique index is built online.
+
+The key format is frozen here rather than imported from payout_engine, so a
+later change there cannot make this migration backfill different keys.
+"""
+import time
+import uuid
+from datetime import date
+from sqlalchemy import text
+
+VERSION = "0006"
+DESCRIPTION = "Idempotency keys on payroll transactions"
+TRANSACTIONAL = False
+
+BATCH_SIZE = 1000
+MAX_DUTY_CYCLE = 0.5
+# Value of payout_engine.IDEMPOTENCY_NAMESPACE when this migration was written
+IDEMPOTENCY_NAMESPACE = uuid.UUID("d13bc2c0-50c1-44df-9109-60c03b47fc1a")
+
+# Latest row of each payroll item without a key yet, preferring rows whose transfer did not fail
+KEYED_ROWS_SQL = """
+    SELECT MAX(CASE WHEN LOWER(status) NOT IN ('failed', 'denied', 'cancelled') THEN id END) AS good_id,
+           MAX(id) AS last_id, company_id, worker_id, period_start, period_end
+    FROM payroll_transactions
+    GROUP BY company_id, worker_id, period_start, period_end
+    HAVING COUNT(idempotency_key) = 0
+"""
+
+
+def _as_date(value) -> date:
+    # SQLite returns DATE columns of a raw query as ISO strings
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _payroll_key(company_id: int, worker_id: int, period_start: date, period_end: date) -> str:
+    # Same format as payout_engine.payroll_idempotency_key (without a failed transaction id)
+    name = f"payroll:{company_id}:{worker_id}:{period_start.isoformat()}:{period_end.isoformat()}"
+    return str(uuid.uuid5(IDEMPOTENCY_NAMESPACE, name))
+
+
+def upgrade(ctx):
+    ctx.add_column("payroll_transactions", "idempotency_key", "VARCHAR")
+
+    if not ctx.has_index("payroll_transactions", "idx_payroll_idempotency_key"):
+        rows = ctx.execute(KEYED_ROWS_SQL).fetchall()
+        updates = [
+            {"id": good_id or last_id,
+             "key": _payroll_key(company_id, worker_id, _as_date(period_start), _as_date(period_end))}
+            for good_id, last_id, company_id, worker_id, period_start, period_end in rows
+        ]
+        update = text("UPDATE payroll_transactions SET idempotency_key = :key WHERE id = :id")
+        started = time.perf_counter()
+        for offset in range(0, len(updates), BATCH_SIZE):
+            batch_started = time.perf_counter()
+            with ctx.engine.begin() as conn:
+                conn.execute(update, updates[offset:offset + BATCH_SIZE])
+            elapsed = time.perf_counter() - batch_started
+            time.sleep(elapsed * (1 - MAX_DUTY_CYCLE) / MAX_DUTY_CYCLE)
+        ctx.log(f"  [BACKFILL] payroll_transactions: {len(updates)} idempotency key(s) "
+                f"in {time.perf_counter() - started:.1f}s")
+
+    ctx.create_index("idx_payroll_idempotency_key", "payroll_transactions", ["idempotency_key"], unique=True)
+    ctx.execute("ANALYZE payroll_transactions")
@@ -1,10 +1,27 @@
 """
 SQLAlchemy ORM Models
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
+from .money import to_micro, from_micro
+
+
+def micro_amount(column_name: str) -> property:
+    """
+    Exact USDC view over an integer micro-USDC column.
+    Reads return Decimal, writes accept Decimal/int/float/str and store micro-USDC.
+    SQL expressions (sums, filters) should use the *_micro column directly.
+    """
+    def getter(self):
+        micro = getattr(self, column_name)
+        return None if micro is None else from_micro(micro)
+
+    def setter(self, value):
+        setattr(self, column_name, None if value is None else to_micro(value))
+
+    return property(getter, setter)
 
 
 class User(Base):
@@ -41,6 +58,10 @@ class Company(Base):
 
 class Department(Base):
     __tablename__ = "departments"
+    __table_args__ = (
+        # Every tenant-scoped query starts from the company's departments
+        Index("idx_departments_company_id", "company_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -54,15 +75,21 @@ class Department(Base):
 
 class Worker(Base):
     __tablename__ = "workers"
+    __table_args__ = (
+        # Active workers per department (dashboard stats, payroll execution)
+        Index("idx_workers_department_active", "department_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=False)
     name = Column(String, nullable=False)
     surname = Column(String, nullable=False)
-    salary = Column(Float, nullable=False)
+    salary_micro = Column(BigInteger, nullable=False)  # Monthly salary in micro-USDC (6 decimals)
     wallet_address = Column(String, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    salary = micro_amount("salary_micro")
     
     department = relationship("Department", back_populates="workers")
     payroll_transactions = relationship("PayrollTransaction", back_populates="worker", cascade="all, delete-orphan")
@@ -70,14 +97,20 @@ class Worker(Base):
 
 class AdditionalSpending(Base):
     __tablename__ = "additional_spendings"
+    __table_args__ = (
+        # Spendings list is filtered by company and department (NULL = CEO level), paged by id
+        Index("idx_spendings_company_department_keyset", "company_id", "department_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
     name = Column(String, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_micro = Column(BigInteger, nullable=False)  # Amount in micro-USDC (6 decimals)
     wallet_address = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    amount = micro_amount("amount_micro")
     
     company = relationship("Company", back_populates="spendings")
     department = relationship("Department", back_populates="spendings")
@@ -86,30 +119,48 @@ class AdditionalSpending(Base):
 
 class Revenue(Base):
     __tablename__ = "revenues"
+    __table_args__ = (
+        # Revenue upsert looks up (company, year, month); listing orders by year/month
+        Index("idx_revenues_company_year_month", "company_id", "year", "month"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_micro = Column(BigInteger, nullable=False)  # Amount in micro-USDC (6 decimals)
     month = Column(Integer, nullable=False)  # 1-12
     year = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    amount = micro_amount("amount_micro")
     
     company = relationship("Company", back_populates="revenues")
 
 
 class PayrollTransaction(Base):
     __tablename__ = "payroll_transactions"
+    __table_args__ = (
+        # has_payroll_been_run_today(): company + period + created_at range
+        Index("idx_payroll_company_period_created", "company_id", "period_start", "period_end", "created_at"),
+        # Transaction history listing: company, newest first, keyset-paged by id
+        Index("idx_payroll_company_keyset", "company_id", "id"),
+        # One row per payroll item: a second run of the same period finds it instead of paying again
+        Index("idx_payroll_idempotency_key", "idempotency_key", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     worker_id = Column(Integer, ForeignKey("workers.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_micro = Column(BigInteger, nullable=False)  # Amount in micro-USDC (6 decimals)
     period_start = Column(Date, nullable=False)
     period_end = Column(Date, nullable=False)
     status = Column(String, default="pending", nullable=False)  # pending, completed, failed, INITIATED, QUEUED, SENT, CONFIRMED, COMPLETE
     transaction_hash = Column(String, nullable=True)  # Circle transaction ID or blockchain tx hash
     circle_transaction_id = Column(String, nullable=True)  # Circle transaction ID (UUID)
+    # Circle idempotency key of the transfer, derived from company, worker and period (payroll_idempotency_key)
+    idempotency_key = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    amount = micro_amount("amount_micro")
     
     company = relationship("Company", back_populates="payroll_transactions")
     worker = relationship("Worker", back_populates="payroll_transactions")
@@ -120,10 +171,12 @@ class SpendingTransaction(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     spending_id = Column(Integer, ForeignKey("additional_spendings.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_micro = Column(BigInteger, nullable=False)  # Amount in micro-USDC (6 decimals)
     transaction_hash = Column(String, nullable=True)
     status = Column(String, default="pending", nullable=False)  # pending, completed, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    amount = micro_amount("amount_micro")
     
     spending = relationship("AdditionalSpending", back_populates="spending_transactions")
 
@@ -0,0 +1,68 @@
+"""
+Keyset pagination for list endpoints
+
+Pages are sliced by primary key (`WHERE id > :after ORDER BY id LIMIT n`) instead
+of OFFSET, so fetching a page costs the same however much history precedes it.
+The id is the key because it is unique (no tie-breaking) and assigned at insert:
+payroll created_at comes from the same insert, while spending dates are
+user-editable and SQLite compares timestamps as text.
+
+Without `limit` or `cursor` a list endpoint returns the whole collection as
+before. The cursor for the next page is returned in the X-Next-Cursor header
+(absent on the last page); the body stays a plain array.
+"""
+import base64
+import binascii
+from typing import Optional, Tuple
+from fastapi import HTTPException, Response
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Last id of the previous page, or None for the first page; 400 on a malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError(raw)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def is_paginated(cursor: Optional[str], limit: Optional[int]) -> bool:
+    return cursor is not None or limit is not None
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Requested size capped at MAX_PAGE_SIZE"""
+    return min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+
+def keyset_page(query, id_column, cursor: Optional[str], limit: Optional[int],
+                descending: bool = False) -> Tuple[list, Optional[str]]:
+    """One page of `query` ordered by `id_column`, and the cursor of the next page (None on the last)"""
+    size = page_size(limit)
+    after = decode_cursor(cursor)
+    if after is not None:
+        query = query.filter(id_column < after if descending else id_column > after)
+    query = query.order_by(id_column.desc() if descending else id_column.asc())
+    rows = query.limit(size + 1).all()  # One extra row tells whether another page exists
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1].id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
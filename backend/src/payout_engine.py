@@ -0,0 +1,156 @@
+"""
+Concurrent payout engine shared by manual (job) and scheduled payroll runs
+
+Transfers are independent Circle API calls, so they are sent from a bounded
+thread pool instead of one after another. Results are handed back to the
+calling thread as they complete, which keeps all DB writes on the caller's
+session.
+
+Every transfer carries the idempotency key of its payroll item (company,
+worker, pay period), stored on the PayrollTransaction. Circle returns the
+original transaction for a repeated key, so a transfer whose outcome is unknown
+(timeout, 5xx, breaker open) is simply sent again: it cannot pay twice.
+"""
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Callable, List, Optional
+import requests
+from .circle_api import circle_api
+from .circle_resilience import CIRCLE_BREAKER_RESET_SECONDS, RETRYABLE_STATUS, CircleUnavailable
+from .money import format_usdc
+
+# Transfers in flight per run (the Circle rate limiter paces them)
+PAYOUT_CONCURRENCY = int(os.getenv("PAYOUT_CONCURRENCY", "16"))
+# Attempts per transfer on transient errors (same idempotency key every time)
+PAYOUT_ATTEMPTS = int(os.getenv("PAYOUT_ATTEMPTS", "4"))
+PAYOUT_RETRY_BASE_SECONDS = 1.0
+# Namespace of the payroll idempotency keys (never change: keys of past runs would no longer match;
+# migration 0006 keeps a frozen copy for its backfill)
+IDEMPOTENCY_NAMESPACE = uuid.UUID("d13bc2c0-50c1-44df-9109-60c03b47fc1a")
+# Circle states after which the transfer definitely did not pay, so the item may be paid again
+CIRCLE_FAILED_STATES = {"FAILED", "DENIED", "CANCELLED"}
+
+
+def payroll_idempotency_key(company_id: int, worker_id: int, period_start: date, period_end: date,
+                            failed_transaction_id: Optional[str] = None) -> str:
+    """
+    Circle idempotency key (a UUID) of one payroll item. The same item always gets the
+    same key; failed_transaction_id derives a fresh one to re-pay an item whose Circle
+    transfer ended FAILED (its key would only return the failed transaction).
+    """
+    name = f"payroll:{company_id}:{worker_id}:{period_start.isoformat()}:{period_end.isoformat()}"
+    if failed_transaction_id:
+        name += f":after:{failed_transaction_id}"
+    return str(uuid.uuid5(IDEMPOTENCY_NAMESPACE, name))
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed transfer may have another go: Circle was busy or unreachable, not a rejection"""
+    if isinstance(error, CircleUnavailable) or isinstance(error.__cause__, requests.RequestException):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS
+
+
+class PayoutItem:
+    """One transfer to make: a pending PayrollTransaction row and its receiver"""
+    __slots__ = ("transaction_id", "worker_id", "worker_name", "wallet_address", "amount_micro", "idempotency_key")
+
+    def __init__(self, transaction_id: int, worker_id: int, worker_name: str, wallet_address: str, amount_micro: int,
+                 idempotency_key: Optional[str] = None):
+        self.transaction_id = transaction_id
+        self.worker_id = worker_id
+        self.worker_name = worker_name
+        self.wallet_address = wallet_address
+        self.amount_micro = amount_micro
+        self.idempotency_key = idempotency_key
+
+
+class PayoutResult:
+    __slots__ = ("item", "status", "circle_transaction_id", "transaction_hash", "error", "duration")
+
+    def __init__(self, item: PayoutItem, status: str, circle_transaction_id: Optional[str] = None,
+                 transaction_hash: Optional[str] = None, error: Optional[str] = None, duration: float = 0.0):
+        self.item = item
+        self.status = status
+        self.circle_transaction_id = circle_transaction_id
+        self.transaction_hash = transaction_hash
+        self.error = error
+        self.duration = duration
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "failed"
+
+
+def resolve_usdc_token_id(wallet_id: str) -> Optional[str]:
+    """USDC token id for a run: USDC_TOKEN_ID if valid, else looked up once from the wallet"""
+    token_id = os.getenv("USDC_TOKEN_ID", None)
+    if token_id and len(token_id) == 36:  # Valid UUID length
+        return token_id
+    # None lets transfer_usdc auto-detect per transfer
+    return circle_api.find_usdc_token_id(wallet_id)
+
+
+class PayoutEngine:
+    def __init__(self, concurrency: int = PAYOUT_CONCURRENCY, attempts: int = PAYOUT_ATTEMPTS):
+        self.concurrency = max(1, concurrency)
+        self.attempts = max(1, attempts)
+
+    def _send(self, item: PayoutItem, entity_secret_hex: str, wallet_id: str, token_id: Optional[str]) -> PayoutResult:
+        start = time.perf_counter()
+        # Without a key a resend could pay twice: one attempt only
+        attempts = self.attempts if item.idempotency_key else 1
+        for attempt in range(attempts):
+            try:
+                result = circle_api.transfer_usdc(
+                    entity_secret_hex=entity_secret_hex,
+                    wallet_id=wallet_id,  # Company wallet ID (sender)
+                    destination_address=item.wallet_address,  # Worker's address (receiver)
+                    amount=format_usdc(item.amount_micro),
+                    token_id=token_id,
+                    blockchain="ARC-TESTNET",
+                    idempotency_key=item.idempotency_key,
+                )
+                return PayoutResult(
+                    item,
+                    status=result.get("state", "INITIATED"),  # INITIATED, QUEUED, SENT, CONFIRMED, COMPLETE
+                    circle_transaction_id=result.get("id"),
+                    transaction_hash=(result.get("data") or {}).get("txHash"),
+                    duration=time.perf_counter() - start,
+                )
+            except Exception as e:
+                if attempt + 1 >= attempts or not is_transient(e):
+                    print(f"[PAYOUT ENGINE] ERROR paying worker {item.worker_id}: {e}")
+                    return PayoutResult(item, status="failed", error=str(e), duration=time.perf_counter() - start)
+                # Full jitter, capped at the breaker cool-down so a retry can land on the half-open probe
+                delay = random.uniform(0, min(CIRCLE_BREAKER_RESET_SECONDS, PAYOUT_RETRY_BASE_SECONDS * 2 ** attempt))
+                print(f"[PAYOUT ENGINE] Worker {item.worker_id}: {e} - retrying in {delay:.1f}s "
+                      f"({attempt + 1}/{attempts - 1})")
+                time.sleep(delay)
+
+    def run(self, items: List[PayoutItem], entity_secret_hex: str, wallet_id: str,
+            on_result: Callable[[PayoutResult], None], token_id: Optional[str] = None) -> List[PayoutResult]:
+        """
+        Send every payout with up to `concurrency` in flight. on_result is called in the
+        calling thread, in completion order. A failed transfer never stops the others.
+        """
+        if not items:
+            return []
+        print(f"[PAYOUT ENGINE] Sending {len(items)} payout(s), {min(self.concurrency, len(items))} at a time")
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items)),
+                                thread_name_prefix="payout") as executor:
+            futures = [executor.submit(self._send, item, entity_secret_hex, wallet_id, token_id) for item in items]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                on_result(result)
+        return results
+
+
+# Global engine instance
+payout_engine = PayoutEngine()
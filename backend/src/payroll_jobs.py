@@ -0,0 +1,330 @@
+"""
+Payroll runs: background execution with a pollable handle
+
+POST /api/payroll/execute creates the pending PayrollTransaction rows, submits a
+run and returns 202 with its id; GET /api/payroll/runs/{run_id} reports progress.
+Scheduled payrolls execute through the same execute_run() inline on the
+scheduler thread, so both paths share the payout engine, the events and the
+run registry.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from .database import SessionLocal
+from .models import PayrollTransaction, Worker
+from .cache import clear_cache, bump_versions
+from .events import event_broker, refresh_wallet_balance
+from .money import format_usdc
+from .payout_engine import (
+    CIRCLE_FAILED_STATES, PayoutItem, PayoutResult, payout_engine, payroll_idempotency_key, resolve_usdc_token_id
+)
+from .wallet_ledger import Reservation, wallet_ledger
+
+# Runs executing at the same time (each one sends PAYOUT_CONCURRENCY transfers at once)
+PAYROLL_JOB_WORKERS = int(os.getenv("PAYROLL_JOB_WORKERS", "2"))
+# Payout results written per commit while a run is in progress
+PAYOUT_COMMIT_EVERY = 25
+# Finished runs kept for status queries
+MAX_FINISHED_RUNS = 200
+
+
+class PayrollRun:
+    def __init__(self, user_id: int, company_id: int, wallet_id: str, period_start: date, period_end: date,
+                 transaction_ids: List[int], total_micro: int, scheduled: bool = False,
+                 reservation: Optional[Reservation] = None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.company_id = company_id
+        self.wallet_id = wallet_id
+        self.period_start = period_start
+        self.period_end = period_end
+        self.transaction_ids = transaction_ids
+        self.total_micro = total_micro
+        self.scheduled = scheduled
+        self.reservation = reservation  # Funds held in wallet_ledger until the payouts are sent
+        self.status = "queued"  # queued -> running -> completed | failed
+        self.error: Optional[str] = None
+        self.succeeded = 0
+        self.failed = 0
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started = None  # perf_counter at start
+
+    @property
+    def total(self) -> int:
+        return len(self.transaction_ids)
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def record(self, result: PayoutResult):
+        if result.failed:
+            self.failed += 1
+        else:
+            self.succeeded += 1
+
+    def progress(self) -> dict:
+        elapsed = None
+        throughput = None
+        eta = None
+        if self._started is not None:
+            elapsed = (self.finished_at - self.started_at).total_seconds() if self.finished_at \
+                else time.perf_counter() - self._started
+            if elapsed > 0 and self.completed:
+                throughput = self.completed / elapsed
+                eta = 0.0 if not self.is_active else (self.total - self.completed) / throughput
+        return {
+            "run_id": self.id,
+            "status": self.status,
+            "scheduled": self.scheduled,
+            "period_start": self.period_start,
+            "period_end": self.period_end,
+            "total": self.total,
+            "completed": self.completed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pending": self.total - self.completed,
+            "total_amount": format_usdc(self.total_micro),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "throughput_per_second": round(throughput, 3) if throughput is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": self.error,
+        }
+
+
+def period_transactions(db, company_id: int, period_start: date, period_end: date) -> Dict[int, PayrollTransaction]:
+    """Worker id -> the keyed PayrollTransaction of each payroll item already created for the period"""
+    return {
+        tx.worker_id: tx for tx in db.query(PayrollTransaction).filter(
+            PayrollTransaction.company_id == company_id,
+            PayrollTransaction.period_start == period_start,
+            PayrollTransaction.period_end == period_end,
+            PayrollTransaction.idempotency_key.isnot(None),
+        )
+    }
+
+
+def is_unsent(tx: Optional[PayrollTransaction]) -> bool:
+    """Nothing paid for this item yet: no row, or a pending or failed one (sent again on the next run)"""
+    return tx is None or tx.status == "pending" or tx.status.upper() in CIRCLE_FAILED_STATES
+
+
+def unpaid_workers(db, company_id: int, workers: List[Worker], period_start: date, period_end: date) -> List[Worker]:
+    """The workers a run of the period still has to pay (the others were sent already)"""
+    existing = period_transactions(db, company_id, period_start, period_end)
+    return [worker for worker in workers if is_unsent(existing.get(worker.id))]
+
+
+def create_pending_transactions(db, company_id: int, workers: List[Worker],
+                                period_start: date, period_end: date) -> List[PayrollTransaction]:
+    """
+    The pending PayrollTransaction rows to pay `workers` for a period, committed so the
+    run can be tracked right away. Each payroll item has one row, keyed by its
+    idempotency key: items already sent are left out, items still pending or failed
+    are sent again (under a fresh key after a transfer Circle reported failed), the
+    rest get new rows. Empty when the whole period has been paid.
+    """
+    existing = period_transactions(db, company_id, period_start, period_end)
+    transactions = []
+    resent = 0
+    for worker in workers:
+        tx = existing.get(worker.id)
+        if tx is None:
+            tx = PayrollTransaction(
+                company_id=company_id,
+                worker_id=worker.id,
+                amount_micro=worker.salary_micro,
+                period_start=period_start,
+                period_end=period_end,
+                status="pending",
+                idempotency_key=payroll_idempotency_key(company_id, worker.id, period_start, period_end),
+            )
+            db.add(tx)
+        elif is_unsent(tx):
+            if tx.circle_transaction_id:
+                # Circle created the transfer and it failed: the old key would only return it
+                tx.idempotency_key = payroll_idempotency_key(
+                    company_id, worker.id, period_start, period_end, failed_transaction_id=tx.circle_transaction_id
+                )
+                tx.circle_transaction_id = None
+                tx.transaction_hash = None
+            tx.status = "pending"
+            tx.amount_micro = worker.salary_micro
+            resent += 1
+        else:
+            continue  # Sent already (in flight or paid)
+        transactions.append(tx)
+    db.commit()
+    if len(transactions) < len(workers) or resent:
+        print(f"[PAYROLL RUN] Company {company_id} {period_start}..{period_end}: "
+              f"{len(workers) - len(transactions)} payout(s) already sent, {resent} resent")
+    return transactions
+
+
+def reserve_pending_transactions(db, company_id: int, wallet_id: str, workers: List[Worker],
+                                 period_start: date, period_end: date,
+                                 balance_micro: Optional[int]) -> Tuple[Reservation, List[PayrollTransaction]]:
+    """
+    Reserve in wallet_ledger, against balance_micro, what the period still owes (the
+    workers not paid yet, so a retry only holds the failed items), then
+    create_pending_transactions for them. The reservation is trimmed to the rows
+    actually created (another request may have taken some, nothing is held when
+    there are none). Raises InsufficientFunds before any row is created.
+    """
+    workers = unpaid_workers(db, company_id, workers, period_start, period_end)
+    reservation = wallet_ledger.reserve(
+        wallet_id, sum(w.salary_micro for w in workers), balance_micro,
+        label=f"payroll of company {company_id} ({period_start}..{period_end})",
+    )
+    try:
+        transactions = create_pending_transactions(db, company_id, workers, period_start, period_end)
+    except Exception:
+        wallet_ledger.release(reservation)
+        raise
+    wallet_ledger.release(reservation, reservation.held_micro - sum(t.amount_micro for t in transactions))
+    return reservation, transactions
+
+
+def execute_run(run: PayrollRun, db, entity_secret_hex: str):
+    """Send every payout of a run through the payout engine and record results on `db`"""
+    run.status = "running"
+    run.started_at = datetime.utcnow()
+    run._started = time.perf_counter()
+    print(f"[PAYROLL RUN] {run.id} started: {run.total} payout(s), {format_usdc(run.total_micro)} USDC")
+
+    try:
+        rows = db.query(PayrollTransaction, Worker).join(Worker, PayrollTransaction.worker_id == Worker.id).filter(
+            PayrollTransaction.id.in_(run.transaction_ids)
+        ).all()
+        transactions = {tx.id: tx for tx, _ in rows}
+        items = [
+            PayoutItem(tx.id, worker.id, f"{worker.name} {worker.surname}", worker.wallet_address, tx.amount_micro,
+                       tx.idempotency_key)
+            for tx, worker in rows
+        ]
+
+        event_broker.publish(run.user_id, "payroll.started", {
+            "run_id": run.id,
+            "period_start": run.period_start,
+            "period_end": run.period_end,
+            "total_workers": run.total,
+            "total_amount": format_usdc(run.total_micro),
+            "scheduled": run.scheduled,
+        })
+
+        uncommitted = 0
+
+        def on_result(result: PayoutResult):
+            nonlocal uncommitted
+            tx = transactions[result.item.transaction_id]
+            if run.reservation is not None:
+                if result.failed:
+                    wallet_ledger.release(run.reservation, result.item.amount_micro)
+                else:
+                    wallet_ledger.spend(run.reservation, result.item.amount_micro)
+            tx.status = result.status
+            tx.circle_transaction_id = result.circle_transaction_id
+            if result.transaction_hash:
+                tx.transaction_hash = result.transaction_hash
+            run.record(result)
+            uncommitted += 1
+            if uncommitted >= PAYOUT_COMMIT_EVERY:
+                db.commit()
+                uncommitted = 0
+                # New ETag for the transaction list, or conditional GETs keep serving the pending rows
+                bump_versions(run.user_id, "payroll_transactions")
+            event_broker.publish(run.user_id, "payroll.payout", {
+                "run_id": run.id,
+                "index": run.completed,
+                "total": run.total,
+                "transaction_id": tx.id,
+                "worker_id": result.item.worker_id,
+                "worker_name": result.item.worker_name,
+                "amount": format_usdc(result.item.amount_micro),
+                "status": result.status,
+                "circle_transaction_id": result.circle_transaction_id,
+            })
+
+        token_id = resolve_usdc_token_id(run.wallet_id)
+        payout_engine.run(items, entity_secret_hex, run.wallet_id, on_result, token_id=token_id)
+        db.commit()
+        run.status = "completed"
+    except Exception as e:
+        db.rollback()
+        run.status = "failed"
+        run.error = str(e)
+        print(f"[PAYROLL RUN] {run.id} failed: {e}")
+    finally:
+        if run.reservation is not None:
+            wallet_ledger.release(run.reservation)  # Whatever was not sent
+        run.finished_at = datetime.utcnow()
+        clear_cache(run.user_id)
+        bump_versions(run.user_id, "payroll_transactions")
+
+    print(f"[PAYROLL RUN] {run.id} {run.status}: {run.succeeded} paid, {run.failed} failed "
+          f"in {(run.finished_at - run.started_at).total_seconds():.1f}s")
+    event_broker.publish(run.user_id, "payroll.completed", {
+        "run_id": run.id,
+        "total": run.total,
+        "succeeded": run.succeeded,
+        "failed": run.failed,
+        "status": run.status,
+        "scheduled": run.scheduled,
+    })
+    refresh_wallet_balance(run.user_id, run.wallet_id)
+
+
+class PayrollJobManager:
+    def __init__(self, workers: int = PAYROLL_JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payroll-run")
+        self._lock = threading.Lock()
+        self._runs: Dict[str, PayrollRun] = {}
+
+    def register(self, run: PayrollRun):
+        with self._lock:
+            self._runs[run.id] = run
+            finished = [r for r in self._runs.values() if not r.is_active]
+            for old in sorted(finished, key=lambda r: r.created_at)[:max(0, len(finished) - MAX_FINISHED_RUNS)]:
+                del self._runs[old.id]
+
+    def active_run(self, company_id: int) -> Optional[PayrollRun]:
+        with self._lock:
+            return next((r for r in self._runs.values() if r.company_id == company_id and r.is_active), None)
+
+    def get(self, run_id: str) -> Optional[PayrollRun]:
+        return self._runs.get(run_id)
+
+    def runs_for(self, user_id: int) -> List[PayrollRun]:
+        with self._lock:
+            runs = [r for r in self._runs.values() if r.user_id == user_id]
+        return sorted(runs, key=lambda r: r.created_at, reverse=True)
+
+    def submit(self, run: PayrollRun, entity_secret_hex: str) -> PayrollRun:
+        """Queue a run on the background pool; it gets its own DB session"""
+        self.register(run)
+        self._executor.submit(self._execute, run, entity_secret_hex)
+        return run
+
+    def _execute(self, run: PayrollRun, entity_secret_hex: str):
+        db = SessionLocal()
+        try:
+            execute_run(run, db, entity_secret_hex)
+        finally:
+            db.close()
+
+
+# Global job manager instance
+payroll_jobs = PayrollJobManager()
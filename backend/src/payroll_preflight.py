@@ -0,0 +1,217 @@
+"""
+Payroll pre-flight: dry-run a payroll on the treasury simulator before real transfers
+
+The active workers (already loaded by the caller, one query) are replayed into an
+in-memory ArcTreasuryPayroll whose treasury holds the company's wallet balance,
+and its run_payroll is executed. One pass over the rows collects everything that
+would make the real run fail or pay the wrong people:
+  - insufficient_balance: the contract reverts (treasury < total)
+  - invalid_salary / invalid_department / invalid_name: rows the contract rejects.
+    Departments have no active flag in the database, so the contract's
+    invalid/inactive department check catches departments outside the company
+  - invalid_wallet: not 0x + 40 hex characters (Circle would reject the transfer)
+  - duplicate_wallet (warning): several workers paid to the same address
+  - funds_reserved (warning): payouts in progress or recently sent hold part of
+    the balance (wallet_ledger); only the rest is available to this payroll
+Workers already paid for the period (a retry of a partly paid run) are left out,
+like the run itself leaves them out. The plan lists totals and diffs the payouts
+against the company's previous pay period (workers added, removed, amount changed).
+"""
+import time
+from datetime import date
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from .models import Company, Department, PayrollTransaction
+from .money import format_usdc, to_micro
+from .payroll_jobs import unpaid_workers
+from .simulator import OWNER, TREASURY, load_company
+from .worker_import import WALLET_ADDRESS_RE
+
+# Contract error message -> issue code for rows it refuses
+_REJECTION_CODES = {
+    "Salary must be > 0": "invalid_salary",
+    "Invalid/Inactive department": "invalid_department",
+    "Zero wallet address": "invalid_wallet",
+    "Worker name cannot be empty": "invalid_name",
+}
+_ISSUE_MESSAGES = {
+    "invalid_salary": "salary is not positive",
+    "invalid_department": "department is missing or inactive",
+    "invalid_wallet": "invalid wallet address",
+    "invalid_name": "name is empty",
+    "rejected": "rejected by the payroll contract",
+}
+
+
+def fetch_wallet_balance_micro(wallet_id: str) -> Optional[int]:
+    """Circle wallet balance in micro-USDC, or None if it cannot be read right now (never a cached value)"""
+    try:
+        from .circle_api import circle_api
+        return to_micro(circle_api.get_wallet_balance(wallet_id, strict=True))
+    except Exception as e:
+        print(f"[PAYROLL PREFLIGHT] Warning: Could not check wallet balance: {e}")
+        return None
+
+
+def _issue(code: str, message: str, worker_ids: Optional[List[int]] = None) -> dict:
+    return {"code": code, "message": message, "worker_ids": worker_ids or []}
+
+
+def _ids_preview(worker_ids: List[int], limit: int = 10) -> str:
+    shown = ", ".join(str(worker_id) for worker_id in worker_ids[:limit])
+    return f"worker ids {shown}{', ...' if len(worker_ids) > limit else ''}"
+
+
+def previous_payouts(db: Session, company_id: int, period_start: date, period_end: date) -> Optional[dict]:
+    """
+    Worker id -> amount of the company's latest pay period other than the one planned,
+    with its dates; None before the first payroll
+    """
+    latest = db.query(PayrollTransaction.period_start, PayrollTransaction.period_end).filter(
+        PayrollTransaction.company_id == company_id,
+        ~((PayrollTransaction.period_start == period_start) & (PayrollTransaction.period_end == period_end)),
+    ).order_by(PayrollTransaction.id.desc()).first()
+    if latest is None:
+        return None
+    rows = db.query(PayrollTransaction.worker_id, PayrollTransaction.amount_micro).filter(
+        PayrollTransaction.company_id == company_id,
+        PayrollTransaction.period_start == latest.period_start,
+        PayrollTransaction.period_end == latest.period_end,
+    ).order_by(PayrollTransaction.id).all()
+    return {
+        "period_start": latest.period_start,
+        "period_end": latest.period_end,
+        "amounts": {worker_id: amount for worker_id, amount in rows},  # Latest row per worker wins
+    }
+
+
+def _diff(payouts: Dict[int, int], names: Dict[int, str], previous: Optional[dict]) -> Optional[dict]:
+    if previous is None:
+        return None
+    before = previous["amounts"]
+    added, changed = [], []
+    for worker_id, amount in payouts.items():
+        if worker_id not in before:
+            added.append({"worker_id": worker_id, "worker_name": names.get(worker_id),
+                          "previous_amount": None, "amount": format_usdc(amount)})
+        elif before[worker_id] != amount:
+            changed.append({"worker_id": worker_id, "worker_name": names.get(worker_id),
+                            "previous_amount": format_usdc(before[worker_id]), "amount": format_usdc(amount)})
+    removed = [
+        {"worker_id": worker_id, "worker_name": names.get(worker_id),
+         "previous_amount": format_usdc(amount), "amount": None}
+        for worker_id, amount in before.items() if worker_id not in payouts
+    ]
+    delta = sum(payouts.values()) - sum(before.values())
+    return {
+        "previous_period_start": previous["period_start"],
+        "previous_period_end": previous["period_end"],
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "unchanged": len(payouts) - len(added) - len(changed),
+        "total_delta": ("-" if delta < 0 else "") + format_usdc(abs(delta)),
+    }
+
+
+def plan_payroll(db: Session, company: Company, workers: List, period_start: date, period_end: date,
+                 wallet_balance_micro: Optional[int], reserved_micro: int = 0) -> dict:
+    """
+    Dry-run a payroll of `workers` (the active Worker rows about to be paid) and
+    return the plan: totals, blocking errors, warnings and the diff against the
+    previous pay period. Workers already paid for the period are not planned again.
+    `ok` is False when the real run should not start. reserved_micro is held by other payouts (wallet_ledger) and not available.
+    """
+    started = time.perf_counter()
+    active_workers = len(workers)
+    workers = unpaid_workers(db, company.id, workers, period_start, period_end)
+    departments = db.query(Department).filter(Department.company_id == company.id).all()
+    simulated = load_company(departments, workers)
+    contract = simulated.contract
+
+    errors, warnings = [], []
+    names: Dict[int, str] = {}
+    invalid_wallets: List[int] = []
+    by_wallet: Dict[str, List[int]] = {}
+    for worker in workers:
+        names[worker.id] = f"{worker.name} {worker.surname}"
+        wallet = (worker.wallet_address or "").strip()
+        if WALLET_ADDRESS_RE.fullmatch(wallet) is None:
+            invalid_wallets.append(worker.id)
+        else:
+            by_wallet.setdefault(wallet.lower(), []).append(worker.id)
+
+    rejected: Dict[str, List[int]] = {}
+    for worker_id, reason in simulated.rejected:
+        rejected.setdefault(_REJECTION_CODES.get(reason, "rejected"), []).append(worker_id)
+    if invalid_wallets:
+        rejected.setdefault("invalid_wallet", [])
+        rejected["invalid_wallet"] = sorted(set(rejected["invalid_wallet"]) | set(invalid_wallets))
+    for code, worker_ids in rejected.items():
+        errors.append(_issue(
+            code, f"{len(worker_ids)} worker(s): {_ISSUE_MESSAGES[code]} ({_ids_preview(worker_ids)})", worker_ids
+        ))
+
+    duplicates = [worker_ids for worker_ids in by_wallet.values() if len(worker_ids) > 1]
+    if duplicates:
+        worker_ids = [worker_id for group in duplicates for worker_id in group]
+        warnings.append(_issue(
+            "duplicate_wallet",
+            f"{len(duplicates)} wallet address(es) shared by {len(worker_ids)} workers ({_ids_preview(worker_ids)})",
+            worker_ids,
+        ))
+
+    # Dry run: the contract pays every worker it accepted from a treasury holding the available balance
+    contract_ids = list(simulated.worker_ids.values())
+    required_micro = sum(contract.workers[i].salary for i in contract_ids if contract.workers[i].active)
+    available_micro = None if wallet_balance_micro is None else max(0, wallet_balance_micro - reserved_micro)
+    if reserved_micro:
+        warnings.append(_issue(
+            "funds_reserved", f"{format_usdc(reserved_micro)} USDC held by payouts in progress or recently sent"
+        ))
+    if available_micro is None:
+        warnings.append(_issue("balance_unknown", "Wallet balance could not be read; balance not checked"))
+        contract.usdc._mint(TREASURY, required_micro)
+    else:
+        contract.usdc._mint(TREASURY, available_micro)
+        if available_micro < required_micro:
+            reserved_note = f" ({format_usdc(reserved_micro)} USDC held by other payouts)" \
+                if reserved_micro else ""
+            errors.insert(0, _issue(
+                "insufficient_balance",
+                f"Insufficient wallet balance. Available: {format_usdc(available_micro)} USDC{reserved_note}, "
+                f"Required: {format_usdc(required_micro)} USDC",
+            ))
+            contract.usdc._mint(TREASURY, required_micro - available_micro)  # Finish the dry run for the diff
+    contract.run_payroll(OWNER, TREASURY, contract_ids)
+
+    worker_ids = {contract_id: worker_id for worker_id, contract_id in simulated.worker_ids.items()}
+    payouts = {worker_ids[event["workerId"]]: event["amount"] for event in contract.events.select("SalaryPaid")}
+    total_micro = sum(payouts.values())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"[PAYROLL PREFLIGHT] Company {company.id}: {len(payouts)} payout(s) "
+          f"({active_workers - len(workers)} already paid), {format_usdc(total_micro)} USDC, "
+          f"{len(errors)} error(s), {len(warnings)} warning(s) in {elapsed_ms:.1f}ms")
+
+    return {
+        "ok": not errors,
+        "period_start": period_start,
+        "period_end": period_end,
+        "workers": active_workers,
+        "already_paid": active_workers - len(workers),
+        "payouts": len(payouts),
+        "total_amount": format_usdc(total_micro),
+        "wallet_balance": None if wallet_balance_micro is None else format_usdc(wallet_balance_micro),
+        "reserved_amount": format_usdc(reserved_micro),
+        "balance_after": None if available_micro is None else
+            ("-" if available_micro < total_micro else "") + format_usdc(abs(available_micro - total_micro)),
+        "errors": errors,
+        "warnings": warnings,
+        "diff": _diff(payouts, names, previous_payouts(db, company.id, period_start, period_end)),
+        "elapsed_ms": round(elapsed_ms, 2),
+    }
+
+
+def plan_error_detail(plan: dict) -> str:
+    """One-line HTTP error detail for a plan with errors (the balance message first, as before)"""
+    return "; ".join(error["message"] for error in plan["errors"])
@@ -4,10 +4,11 @@ Payroll Scheduler: Automatic payroll execution based on company settings
 from datetime import datetime, date, time
 from sqlalchemy.orm import Session
 from src.models import Company, Worker, Department, PayrollTransaction
+from src.money import format_usdc, from_micro
+from src.payroll_jobs import PayrollRun, execute_run, payroll_jobs, reserve_pending_transactions
+from src.payroll_preflight import fetch_wallet_balance_micro, plan_error_detail, plan_payroll
+from src.wallet_ledger import InsufficientFunds, wallet_ledger
 import os
-import subprocess
-import sys
-from pathlib import Path
 
 
 def should_run_payroll(company: Company) -> bool:
@@ -125,140 +126,74 @@ def execute_scheduled_payroll(company: Company, db: Session) -> dict:
         print(f"[PAYROLL SCHEDULER]   - Salary: {worker.salary} USDC")
         print(f"[PAYROLL SCHEDULER]   - Wallet Address (Receiver): {worker.wallet_address}")
     
-    # Execute payroll for each worker by calling send_transaction_simple.py
+    # Dry-run on the simulator first: nothing is sent for a payroll that would fail
+    wallet_balance_micro = fetch_wallet_balance_micro(company.circle_wallet_id)
+    plan = plan_payroll(
+        db, company, workers, period_start, period_end,
+        wallet_balance_micro, wallet_ledger.outstanding(company.circle_wallet_id)
+    )
+    if not plan["ok"]:
+        print(f"[PAYROLL SCHEDULER] Pre-flight failed - skipping: {plan_error_detail(plan)}")
+        return {"executed": False, "reason": f"Pre-flight failed: {plan_error_detail(plan)}", "plan": plan}
+    for warning in plan["warnings"]:
+        print(f"[PAYROLL SCHEDULER] Pre-flight warning: {warning['message']}")
+    
+    active = payroll_jobs.active_run(company.id)
+    if active:
+        print(f"[PAYROLL SCHEDULER] Run {active.id} already in progress")
+        return {"executed": False, "reason": "Payroll run already in progress"}
+    
+    # Execute inline on the scheduler thread through the shared payout engine
     print(f"\n[PAYROLL SCHEDULER] Starting payroll execution...")
-    print(f"[PAYROLL SCHEDULER] Calling send_transaction_simple.py for each worker")
-    transactions = []
-    
-    # Get script path
-    script_dir = Path(__file__).parent.parent
-    script_path = script_dir / "send_transaction_simple.py"
-    
-    if not script_path.exists():
-        print(f"[PAYROLL SCHEDULER] ERROR: Script not found at {script_path}")
-        return {"executed": False, "reason": f"Script not found: {script_path}"}
-    
-    for idx, worker in enumerate(workers, 1):
-        print(f"\n[PAYROLL SCHEDULER] Processing worker {idx}/{len(workers)}: {worker.name} {worker.surname}")
-        
-        payroll_transaction = PayrollTransaction(
-            company_id=company.id,
-            worker_id=worker.id,
-            amount=worker.salary,
-            period_start=period_start,
-            period_end=period_end,
-            status="pending"
+    try:
+        reservation, pending = reserve_pending_transactions(
+            db, company.id, company.circle_wallet_id, workers, period_start, period_end, wallet_balance_micro
         )
-        db.add(payroll_transaction)
-        db.flush()
-        
-        try:
-            print(f"[PAYROLL SCHEDULER] Calling send_transaction_simple.py...")
-            print(f"[PAYROLL SCHEDULER]   Sender (Wallet ID): {company.circle_wallet_id}")
-            print(f"[PAYROLL SCHEDULER]   Receiver (Worker Address): {worker.wallet_address}")
-            print(f"[PAYROLL SCHEDULER]   Amount: {worker.salary} USDC")
-            
-            # Call script with parameters: ENTITY_SECRET SENDER_WALLET_ID RECEIVER_ADDRESS AMOUNT
-            result = subprocess.run(
-                [
-                    sys.executable, 
-                    str(script_path), 
-                    entity_secret_hex,
-                    company.circle_wallet_id,
-                    worker.wallet_address,
-                    str(worker.salary)
-                ],
-                capture_output=True,
-                text=True,
-                cwd=str(script_dir),
-                timeout=60
-            )
-            
-            print(f"[PAYROLL SCHEDULER] Script output:")
-            print(result.stdout)
-            if result.stderr:
-                print(f"[PAYROLL SCHEDULER] Script errors:")
-                print(result.stderr)
-            
-            if result.returncode == 0:
-                # Parse output to get transaction ID if possible
-                # Look for "Transaction ID:" in output
-                transaction_id = None
-                status = "INITIATED"
-                
-                for line in result.stdout.split('\n'):
-                    if 'Transaction ID:' in line:
-                        try:
-                            transaction_id = line.split('Transaction ID:')[1].strip()
-                        except:
-                            pass
-                    if 'State:' in line:
-                        try:
-                            status = line.split('State:')[1].strip()
-                        except:
-                            pass
-                
-                print(f"[PAYROLL SCHEDULER] Transaction script executed successfully!")
-                if transaction_id:
-                    payroll_transaction.circle_transaction_id = transaction_id
-                    payroll_transaction.status = status
-                    print(f"[PAYROLL SCHEDULER]   Transaction ID: {transaction_id}")
-                    print(f"[PAYROLL SCHEDULER]   State: {status}")
-                else:
-                    payroll_transaction.status = "INITIATED"
-                
-                transactions.append({
-                    "worker_id": worker.id,
-                    "worker_name": f"{worker.name} {worker.surname}",
-                    "amount": worker.salary,
-                    "status": payroll_transaction.status,
-                    "transaction_id": transaction_id
-                })
-            else:
-                print(f"[PAYROLL SCHEDULER] Script failed with return code {result.returncode}")
-                payroll_transaction.status = "failed"
-                transactions.append({
-                    "worker_id": worker.id,
-                    "worker_name": f"{worker.name} {worker.surname}",
-                    "amount": worker.salary,
-                    "status": "failed",
-                    "error": f"Script returned {result.returncode}"
-                })
-                
-        except subprocess.TimeoutExpired:
-            print(f"[PAYROLL SCHEDULER] ERROR: Script timeout for worker {worker.id}")
-            payroll_transaction.status = "failed"
-            transactions.append({
-                "worker_id": worker.id,
-                "worker_name": f"{worker.name} {worker.surname}",
-                "amount": worker.salary,
-                "status": "failed",
-                "error": "Script timeout"
-            })
-        except Exception as e:
-            print(f"[PAYROLL SCHEDULER] ERROR processing worker {worker.id}: {e}")
-            import traceback
-            traceback.print_exc()
-            payroll_transaction.status = "failed"
-            transactions.append({
-                "worker_id": worker.id,
-                "worker_name": f"{worker.name} {worker.surname}",
-                "amount": worker.salary,
-                "status": "failed",
-                "error": str(e)
-            })
-    
-    db.commit()
-    print(f"\n[PAYROLL SCHEDULER] All transactions committed to database")
+    except InsufficientFunds as e:
+        print(f"[PAYROLL SCHEDULER] {e} - skipping")
+        return {"executed": False, "reason": str(e)}
+    if not pending:
+        print("[PAYROLL SCHEDULER] Every payout of this period was already sent - skipping")
+        return {"executed": False, "reason": "Already paid for this period"}
+    total_micro = sum(t.amount_micro for t in pending)
+    run = PayrollRun(
+        user_id=company.user_id,
+        company_id=company.id,
+        wallet_id=company.circle_wallet_id,
+        period_start=period_start,
+        period_end=period_end,
+        transaction_ids=[t.id for t in pending],
+        total_micro=total_micro,
+        scheduled=True,
+        reservation=reservation,
+    )
+    payroll_jobs.register(run)
+    execute_run(run, db, entity_secret_hex)
+    
+    workers_by_id = {w.id: w for w in workers}
+    transactions = []
+    for tx in pending:
+        db.refresh(tx)
+        worker = workers_by_id[tx.worker_id]
+        transactions.append({
+            "worker_id": worker.id,
+            "worker_name": f"{worker.name} {worker.surname}",
+            "amount": worker.salary,
+            "status": tx.status,
+            "transaction_id": tx.circle_transaction_id
+        })
+    
+    print(f"\n[PAYROLL SCHEDULER] Run {run.id} {run.status}")
     print(f"[PAYROLL SCHEDULER] Total processed: {len(transactions)} worker(s)")
-    print(f"[PAYROLL SCHEDULER] Total amount: {sum(w.salary for w in workers)} USDC")
+    print(f"[PAYROLL SCHEDULER] Total amount: {format_usdc(total_micro)} USDC")
     print("=" * 80 + "\n")
     
     return {
         "executed": True,
+        "run_id": run.id,
         "transactions": transactions,
         "total_workers": len(workers),
-        "total_amount": sum(w.salary for w in workers)
+        "total_amount": from_micro(total_micro)
     }
 
 
@@ -0,0 +1,171 @@
+"""
+Page bundle routes: everything a frontend page needs in one response
+
+One authentication, one tenant (company) lookup and one DB session per page load,
+instead of one request per section that each re-authenticate and re-resolve the
+company. Sections can be narrowed with ?fields=stats,workers.
+
+Every bundle carries "versions": a short content hash per section, which the
+frontend uses as the cache key for that section's rendered HTML.
+"""
+import asyncio
+import hashlib
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Optional, Tuple
+from ..database import get_db
+from ..models import Worker, Company, Department, AdditionalSpending, Revenue, PayrollTransaction
+from ..schemas import (
+    CompanyResponse, DepartmentResponse, WorkerResponse, SpendingResponse,
+    RevenueResponse, PayrollTransactionResponse
+)
+from ..auth import get_current_user
+from ..cache import get_cached, set_cache
+from .dashboard import build_dashboard_stats, load_circle_transactions
+
+router = APIRouter(prefix="/api/bundle", tags=["bundle"])
+
+
+def _company(db: Session, company: Company, user_id: int):
+    return CompanyResponse.model_validate(company)
+
+
+def _stats(db: Session, company: Company, user_id: int):
+    # Shares the dashboard stats cache with GET /api/dashboard/stats
+    stats = get_cached(user_id)
+    if not stats:
+        stats = build_dashboard_stats(db, company)
+        set_cache(user_id, stats)
+    return stats
+
+
+def _departments(db: Session, company: Company, user_id: int):
+    departments = db.query(Department).filter(Department.company_id == company.id).all()
+    return [DepartmentResponse.model_validate(d) for d in departments]
+
+
+def _workers(db: Session, company: Company, user_id: int):
+    workers = db.query(Worker).join(Department).filter(Department.company_id == company.id).all()
+    return [WorkerResponse.model_validate(w) for w in workers]
+
+
+def _spendings(db: Session, company: Company, user_id: int):
+    # Same rows as GET /api/spendings/ without department_id: CEO-level spendings
+    spendings = db.query(AdditionalSpending).filter(
+        AdditionalSpending.company_id == company.id,
+        AdditionalSpending.department_id.is_(None)
+    ).all()
+    return [SpendingResponse.model_validate(s) for s in spendings]
+
+
+def _revenues(db: Session, company: Company, user_id: int):
+    revenues = db.query(Revenue).filter(
+        Revenue.company_id == company.id
+    ).order_by(Revenue.year.desc(), Revenue.month.desc()).all()
+    return [RevenueResponse.model_validate(r) for r in revenues]
+
+
+def _payroll_transactions(db: Session, company: Company, user_id: int):
+    transactions = db.query(PayrollTransaction).filter(
+        PayrollTransaction.company_id == company.id
+    ).order_by(PayrollTransaction.id.desc()).all()
+    return [PayrollTransactionResponse.model_validate(t) for t in transactions]
+
+
+# Section name -> loader(db, company, user_id). circle_transactions is handled
+# separately: it only talks to Circle, so it runs in a thread alongside the DB reads.
+SECTION_LOADERS: Dict[str, Callable] = {
+    "company": _company,
+    "stats": _stats,
+    "departments": _departments,
+    "workers": _workers,
+    "spendings": _spendings,
+    "revenues": _revenues,
+    "payroll_transactions": _payroll_transactions,
+}
+
+PAGE_SECTIONS = {
+    "dashboard": ("company", "stats", "departments", "workers", "spendings", "revenues",
+                  "payroll_transactions", "circle_transactions"),
+    "constructor": ("company", "departments", "workers", "spendings", "revenues",
+                    "payroll_transactions"),
+}
+
+
+def select_sections(page: str, fields: Optional[str]) -> Tuple[str, ...]:
+    """Resolve ?fields= against the sections a page offers (all of them by default)"""
+    available = PAGE_SECTIONS[page]
+    if not fields:
+        return available
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields for {page}: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return tuple(f for f in available if f in requested)
+
+
+def section_version(data) -> str:
+    """Content hash of one section: changes exactly when its JSON changes"""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode(), digest_size=8).hexdigest()
+
+
+def _load_company(db: Session, user_id: int) -> Company:
+    company = db.query(Company).filter(Company.user_id == user_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return company
+
+
+def _load_sections(db: Session, company: Company, user_id: int, sections: Tuple[str, ...]) -> dict:
+    return {section: SECTION_LOADERS[section](db, company, user_id)
+            for section in sections if section in SECTION_LOADERS}
+
+
+async def build_bundle(page: str, fields: Optional[str], current_user, db: Session) -> dict:
+    sections = select_sections(page, fields)
+
+    # The loaders block (SQLAlchemy, and stats may call Circle for the balance), so
+    # they run in the thread pool and the event loop keeps serving other requests
+    loop = asyncio.get_running_loop()
+    company = await loop.run_in_executor(None, _load_company, db, current_user.id)
+
+    # Circle is the slowest dependency - submit it to the thread pool right away
+    # (run_in_executor starts immediately) and read the DB meanwhile
+    circle_task = None
+    if "circle_transactions" in sections:
+        circle_task = loop.run_in_executor(None, load_circle_transactions, company)
+
+    bundle = await loop.run_in_executor(None, _load_sections, db, company, current_user.id, sections)
+
+    if circle_task is not None:
+        bundle["circle_transactions"] = await circle_task
+
+    bundle = jsonable_encoder(bundle)
+    bundle["versions"] = {section: section_version(data) for section, data in bundle.items()}
+    return bundle
+
+
+@router.get("/dashboard")
+async def get_dashboard_bundle(
+    fields: Optional[str] = Query(None, description="Comma-separated sections (default: all)"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Everything /dashboard renders: stats, org data, payroll and Circle transactions"""
+    return await build_bundle("dashboard", fields, current_user, db)
+
+
+@router.get("/constructor")
+async def get_constructor_bundle(
+    fields: Optional[str] = Query(None, description="Comma-separated sections (default: all)"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Everything /constructor renders: company settings, org structure and history"""
+    return await build_bundle("constructor", fields, current_user, db)
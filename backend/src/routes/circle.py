@@ -5,9 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, List
 from ..database import get_db
-from ..models import Company
+from ..models import Company, PayrollTransaction
 from ..auth import get_current_user
 from ..circle_api import circle_api
+from ..circle_resilience import CircleUnavailable, circle_guard
+from ..cache import bump_versions
+from ..events import event_broker
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/circle", tags=["circle"])
@@ -67,6 +70,7 @@ async def get_wallet_balance(
     
     try:
         balance = circle_api.get_wallet_balance(company.circle_wallet_id)
+        event_broker.publish_balance(current_user.id, company.circle_wallet_id, balance)
         return WalletBalanceResponse(
             wallet_id=company.circle_wallet_id,
             balance=balance,
@@ -102,11 +106,9 @@ async def get_wallet_info(
         
         # Try to get more wallet info if possible
         url = f"{circle_api.base_url}/v1/w3s/developer/wallets/{company.circle_wallet_id}"
-        headers = circle_api._get_headers()
         
-        import requests
         try:
-            response = requests.get(url, headers=headers)
+            response = circle_api._request("GET", url)
             response.raise_for_status()
             result = response.json()
             wallet_data = result.get("data", {}).get("wallet", {})
@@ -152,10 +154,7 @@ async def get_wallet_all_balances(
     
     try:
         url = f"{circle_api.base_url}/v1/w3s/developer/wallets/{company.circle_wallet_id}/balances"
-        headers = circle_api._get_headers()
-        
-        import requests
-        response = requests.get(url, headers=headers)
+        response = circle_api._request("GET", url)
         response.raise_for_status()
         result = response.json()
         
@@ -176,6 +175,8 @@ async def get_wallet_all_balances(
             wallet_id=company.circle_wallet_id,
             balances=balances
         )
+    except CircleUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -205,6 +206,28 @@ async def get_transaction_status(
                 detail="Transaction not found or failed to retrieve"
             )
         
+        # Reconcile: a status change on one of our payouts is stored and pushed to streams
+        state = tx_data.get("state", "UNKNOWN")
+        payout = db.query(PayrollTransaction).filter(
+            PayrollTransaction.company_id == company.id,
+            PayrollTransaction.circle_transaction_id == transaction_id
+        ).first()
+        if payout and payout.status != state:
+            previous = payout.status
+            payout.status = state
+            if tx_data.get("txHash"):
+                payout.transaction_hash = tx_data.get("txHash")
+            db.commit()
+            bump_versions(current_user.id, "payroll_transactions")
+            event_broker.publish(current_user.id, "payroll.status", {
+                "transaction_id": payout.id,
+                "worker_id": payout.worker_id,
+                "circle_transaction_id": transaction_id,
+                "previous_status": previous,
+                "status": state,
+                "tx_hash": payout.transaction_hash,
+            })
+        
         return TransactionStatusResponse(
             transaction_id=tx_data.get("id", transaction_id),
             state=tx_data.get("state", "UNKNOWN"),
@@ -239,3 +262,12 @@ async def get_circle_public_key(
             detail=f"Failed to get Circle public key: {str(e)}"
         )
 
+
+@router.get("/metrics")
+async def get_circle_metrics(
+    current_user=Depends(get_current_user)
+):
+    """
+    Circle client health: circuit breaker state, adaptive rate limit, retry and fallback counters
+    """
+    return circle_guard.metrics()
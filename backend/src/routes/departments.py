@@ -1,24 +1,31 @@
 """
 Department routes: CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import Department, Company
 from ..schemas import DepartmentCreate, DepartmentUpdate, DepartmentResponse
 from ..auth import get_current_user
-from ..cache import clear_cache
+from ..cache import clear_cache, bump_versions
+from ..conditional import conditional_get
 
 router = APIRouter(prefix="/api/departments", tags=["departments"])
 
 
 @router.get("/", response_model=List[DepartmentResponse])
 async def get_departments(
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all departments for user's company"""
+    """Get all departments for user's company (conditional: ETag / If-None-Match)"""
+    not_modified = conditional_get(request, response, current_user.id, "departments")
+    if not_modified:
+        return not_modified
+    
     company = db.query(Company).filter(Company.user_id == current_user.id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -48,6 +55,7 @@ async def create_department(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "departments")
     
     return department
 
@@ -83,6 +91,7 @@ async def update_department(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "departments")
     
     return department
 
@@ -111,6 +120,7 @@ async def delete_department(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "departments", "workers", "spendings", "payroll_transactions")
     
     return {"message": "Department deleted"}
 
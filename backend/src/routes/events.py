@@ -0,0 +1,61 @@
+"""
+Event stream routes: live payroll progress and wallet balance (Server-Sent Events)
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from ..database import SessionLocal
+from ..auth import user_from_token
+from ..events import event_broker
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Comment line sent on idle streams so proxies (ngrok, Render) keep them open
+KEEPALIVE_SECONDS = 15
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT for EventSource clients, which cannot set headers"),
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    text/event-stream of this user's events:
+    payroll.started, payroll.payout, payroll.completed, payroll.status, balance.
+    Authenticate with ?token= or a Bearer header; reconnects resume from Last-Event-ID.
+    """
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+
+    # Short-lived session: a stream must not hold a pooled DB connection while it is open
+    db = SessionLocal()
+    try:
+        user_id = user_from_token(token, db).id
+    finally:
+        db.close()
+
+    subscription = event_broker.subscribe(user_id, last_event_id)
+    print(f"[EVENTS] Stream opened for user {user_id} ({event_broker.subscriber_count(user_id)} open)")
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield event.to_sse()
+        finally:
+            event_broker.unsubscribe(subscription)
+            print(f"[EVENTS] Stream closed for user {user_id}")
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,116 @@
+"""
+Forecast routes: Monte Carlo cash-flow forecast
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import extract, func
+from sqlalchemy.orm import Session
+from datetime import date
+from ..database import get_db
+from ..models import AdditionalSpending, Company, Department, Revenue, Worker
+from ..schemas import ForecastRequest, ForecastResponse
+from ..auth import get_current_user
+from ..money import to_micro, micro_to_float
+from ..forecast import PERCENTILES, ForecastInputs, contract_salaries, forecast_engine, require_numpy
+
+router = APIRouter(prefix="/api/forecast", tags=["forecast"])
+
+
+def load_forecast_inputs(db: Session, company: Company, starting_balance_micro: int) -> ForecastInputs:
+    """Active workers, recorded monthly revenues and monthly spending totals of a company"""
+    departments = db.query(Department).filter(Department.company_id == company.id).all()
+    workers = db.query(
+        Worker.id, Worker.department_id, Worker.name, Worker.surname,
+        Worker.wallet_address, Worker.salary_micro, Worker.is_active,
+    ).join(Department).filter(
+        Department.company_id == company.id,
+        Worker.is_active == True
+    ).order_by(Worker.id).all()
+
+    revenues = db.query(Revenue.amount_micro).filter(Revenue.company_id == company.id).all()
+    spendings = db.query(
+        func.coalesce(func.sum(AdditionalSpending.amount_micro), 0)
+    ).filter(
+        AdditionalSpending.company_id == company.id
+    ).group_by(
+        extract("year", AdditionalSpending.created_at), extract("month", AdditionalSpending.created_at)
+    ).all()
+
+    # PostgreSQL returns SUM(bigint) as numeric - normalize to int
+    return ForecastInputs(
+        starting_balance_micro,
+        contract_salaries(departments, workers),
+        [int(amount) for amount, in revenues],
+        [int(amount) for amount, in spendings],
+    )
+
+
+def month_label(start: date, offset: int) -> str:
+    """YYYY-MM of the month `offset` months after `start`"""
+    index = start.year * 12 + start.month - 1 + offset
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+# Plain def: CPU-bound (and may call Circle for the balance), so FastAPI runs it in its threadpool
+@router.post("/", response_model=ForecastResponse)
+def forecast_cash_flow(
+    request: ForecastRequest,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Simulate the next `months` months under `scenarios` randomized revenue/spending
+    scenarios, starting from the company's current payroll, and report the probability
+    of being insolvent by each month.
+    """
+    try:
+        require_numpy()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    company = db.query(Company).filter(Company.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    if request.starting_balance is not None:
+        starting_balance_micro = to_micro(request.starting_balance)
+    elif company.circle_wallet_id:
+        from ..circle_api import circle_api
+        starting_balance_micro = to_micro(circle_api.get_usdc_balance(company.circle_wallet_id))
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="No Circle wallet configured. Provide starting_balance to forecast from a given balance."
+        )
+
+    inputs = load_forecast_inputs(db, company, starting_balance_micro)
+    db.close()  # Release the connection before the simulation; it only needs the loaded inputs
+    result = forecast_engine.run(
+        inputs,
+        months=request.months,
+        scenarios=request.scenarios,
+        revenue_volatility=request.revenue_volatility,
+        spending_volatility=request.spending_volatility,
+        attrition_rate=request.attrition_rate,
+        seed=request.seed,
+    )
+
+    today = date.today()
+    return ForecastResponse(
+        scenarios=result["scenarios"],
+        months=result["months"],
+        seed=result["seed"],
+        workers=result["workers"],
+        starting_balance=micro_to_float(result["starting_balance_micro"]),
+        monthly_payroll=micro_to_float(result["monthly_payroll_micro"]),
+        insolvency_probability=result["insolvency_probability"],
+        forecast=[
+            {
+                "month": month_label(today, month["month_index"]),
+                "insolvency_probability": month["insolvency_probability"],
+                **{f"balance_p{p}": micro_to_float(month[f"balance_p{p}_micro"]) for p in PERCENTILES},
+            }
+            for month in result["per_month"]
+        ],
+        processes=result["processes"],
+        elapsed_seconds=result["elapsed_seconds"],
+    )
@@ -1,27 +1,41 @@
 """
 Payroll routes: execute payroll payments
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 from ..database import get_db
 from ..models import Worker, Company, Department, PayrollTransaction
-from ..schemas import PayrollCreate, PayrollTransactionResponse
+from ..schemas import PayrollCreate, PayrollTransactionResponse, PayrollRunResponse, PayrollPlanResponse
 from ..auth import get_current_user
-from ..circle_api import circle_api
+from ..cache import bump_versions
+from ..conditional import conditional_get
+from ..responses import json_list, ndjson_response, row_encoder, stream_query, wants_ndjson
+from ..pagination import MAX_PAGE_SIZE, is_paginated, keyset_page, set_next_cursor
+from ..payroll_jobs import PayrollRun, payroll_jobs, reserve_pending_transactions
+from ..payroll_preflight import fetch_wallet_balance_micro, plan_error_detail, plan_payroll
+from ..wallet_ledger import InsufficientFunds, wallet_ledger
 
 router = APIRouter(prefix="/api/payroll", tags=["payroll"])
 
+encode_transaction = row_encoder(PayrollTransactionResponse)
 
-@router.post("/execute", response_model=List[PayrollTransactionResponse])
-async def execute_payroll(
+
+# Plain def: the balance check calls Circle synchronously, so FastAPI runs this in its threadpool
+@router.post("/execute", response_model=PayrollRunResponse, status_code=202)
+def execute_payroll(
     payroll_data: PayrollCreate,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Execute payroll for all active workers in the specified period using Circle API.
+    Start payroll for all active workers in the specified period using Circle API.
+    
+    Validates, creates one pending transaction per worker and returns 202 with a run
+    handle right away; payouts are sent in the background by the payout engine.
+    Poll GET /api/payroll/runs/{run_id} or listen on /api/events/stream for progress.
     
     Uses company wallet ID (company.circle_wallet_id) as sender
     Uses worker's wallet address (worker.wallet_address) as receiver
@@ -82,123 +96,154 @@ async def execute_payroll(
         print(f"[PAYROLL API]   - Salary: {worker.salary} USDC")
         print(f"[PAYROLL API]   - Wallet Address (Receiver): {worker.wallet_address}")
     
-    # Check wallet balance before processing
-    print(f"\n[PAYROLL API] Checking wallet ID balance...")
+    # Dry-run the payroll on the simulator: balance, wallets, salaries and departments in one pass
+    print(f"\n[PAYROLL API] Running payroll pre-flight...")
+    wallet_balance_micro = fetch_wallet_balance_micro(company.circle_wallet_id)
+    plan = plan_payroll(
+        db, company, workers, payroll_data.period_start, payroll_data.period_end,
+        wallet_balance_micro, wallet_ledger.outstanding(company.circle_wallet_id)
+    )
+    print(f"[PAYROLL API] Wallet Balance: {plan['wallet_balance']} USDC")
+    print(f"[PAYROLL API] Total Payroll Required: {plan['total_amount']} USDC")
+    if not plan["ok"]:
+        print(f"[PAYROLL API] Pre-flight failed: {plan_error_detail(plan)}")
+        raise HTTPException(status_code=400, detail=plan_error_detail(plan))
+    print(f"[PAYROLL API] Pre-flight passed ✓")
+    
+    active = payroll_jobs.active_run(company.id)
+    if active:
+        raise HTTPException(
+            status_code=409,
+            detail=f"A payroll run is already in progress (run_id {active.id})"
+        )
+    
+    # Hold the funds first: concurrent runs of the same wallet cannot both pass the balance check
     try:
-        wallet_balance = circle_api.get_wallet_balance(company.circle_wallet_id)
-        total_payroll = sum(w.salary for w in workers)
-        print(f"[PAYROLL API] Wallet Balance: {wallet_balance} USDC")
-        print(f"[PAYROLL API] Total Payroll Required: {total_payroll} USDC")
-        
-        if wallet_balance < total_payroll:
-            print(f"[PAYROLL API] Insufficient balance!")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient wallet balance. Available: {wallet_balance} USDC, Required: {total_payroll} USDC"
-            )
-        print(f"[PAYROLL API] Balance sufficient ✓")
-    except HTTPException:
-        raise
-    except Exception as e:
-        # Log but don't fail if balance check fails
-        print(f"[PAYROLL API] Warning: Could not check wallet balance: {e}")
-    
-    transactions = []
-    
-    # USDC Token ID - can be configured or will be auto-detected
-    usdc_token_id = os.getenv("USDC_TOKEN_ID", None)
-    if usdc_token_id and len(usdc_token_id) == 36:  # Valid UUID length
-        print(f"[PAYROLL API] USDC Token ID: {usdc_token_id}")
-    else:
-        print(f"[PAYROLL API] USDC Token ID: Not provided (will auto-detect from wallet)")
-        usdc_token_id = None  # Let circle_api auto-detect
-    
-    # Create payroll transactions and execute payments
-    print(f"\n[PAYROLL API] Starting payroll execution...")
-    for idx, worker in enumerate(workers, 1):
-        print(f"\n[PAYROLL API] Processing worker {idx}/{len(workers)}: {worker.name} {worker.surname}")
-        
-        # Create transaction record
-        payroll_transaction = PayrollTransaction(
-            company_id=company.id,
-            worker_id=worker.id,
-            amount=worker.salary,
-            period_start=payroll_data.period_start,
-            period_end=payroll_data.period_end,
-            status="pending"
+        reservation, transactions = reserve_pending_transactions(
+            db, company.id, company.circle_wallet_id, workers,
+            payroll_data.period_start, payroll_data.period_end, wallet_balance_micro
         )
-        db.add(payroll_transaction)
-        db.flush()  # Get the ID
-        
-        try:
-            print(f"[PAYROLL API] Calling CircleAPI.transfer_usdc()...")
-            print(f"[PAYROLL API]   Sender (Wallet ID): {company.circle_wallet_id}")
-            print(f"[PAYROLL API]   Receiver (Worker Address): {worker.wallet_address}")
-            print(f"[PAYROLL API]   Amount: {worker.salary} USDC")
-            
-            # Execute payment via Circle API
-            result = circle_api.transfer_usdc(
-                entity_secret_hex=entity_secret_hex,
-                wallet_id=company.circle_wallet_id,  # Company wallet ID (sender)
-                destination_address=worker.wallet_address,  # Worker's address (receiver)
-                amount=str(worker.salary),
-                token_id=usdc_token_id,
-                blockchain="ARC-TESTNET"
-            )
-            
-            # Update transaction with Circle response
-            circle_tx_id = result.get("id")
-            circle_state = result.get("state", "INITIATED")
-            
-            print(f"[PAYROLL API] Transaction created successfully!")
-            print(f"[PAYROLL API]   Transaction ID: {circle_tx_id}")
-            print(f"[PAYROLL API]   State: {circle_state}")
-            
-            payroll_transaction.circle_transaction_id = circle_tx_id
-            payroll_transaction.status = circle_state  # INITIATED, QUEUED, SENT, CONFIRMED, COMPLETE
-            
-            # Get transaction hash if available (may be None initially)
-            tx_data = result.get("data", {})
-            if tx_data.get("txHash"):
-                payroll_transaction.transaction_hash = tx_data.get("txHash")
-                print(f"[PAYROLL API]   Transaction Hash: {tx_data.get('txHash')}")
-            
-        except Exception as e:
-            payroll_transaction.status = "failed"
-            print(f"[PAYROLL API] ERROR processing worker {worker.id}: {e}")
-            # Log error but continue with other workers
-        
-        transactions.append(payroll_transaction)
-    
-    db.commit()
-    print(f"\n[PAYROLL API] All transactions committed to database")
-    print(f"[PAYROLL API] Total processed: {len(transactions)} worker(s)")
+    except InsufficientFunds as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Payroll for this period is being started by another request")
+    if not transactions:
+        raise HTTPException(status_code=409, detail="Payroll for this period has already been paid")
+    bump_versions(current_user.id, "payroll_transactions")
+    
+    run = PayrollRun(
+        user_id=current_user.id,
+        company_id=company.id,
+        wallet_id=company.circle_wallet_id,
+        period_start=payroll_data.period_start,
+        period_end=payroll_data.period_end,
+        transaction_ids=[t.id for t in transactions],
+        total_micro=sum(t.amount_micro for t in transactions),
+        reservation=reservation,
+    )
+    payroll_jobs.submit(run, entity_secret_hex)
+    print(f"[PAYROLL API] Run {run.id} queued: {run.total} payout(s)")
     print("=" * 80 + "\n")
     
-    # Clear dashboard cache since transactions changed
-    from ..cache import clear_cache
-    clear_cache(current_user.id)
+    return run.progress()
+
+
+# Plain def: reads the Circle wallet balance synchronously, so FastAPI runs this in its threadpool
+@router.post("/preflight", response_model=PayrollPlanResponse)
+def preflight_payroll(
+    payroll_data: PayrollCreate,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Dry-run the payroll for the period without sending anything.
+    
+    Replays the active workers on the treasury simulator and returns the plan:
+    totals, blocking errors (insufficient balance, invalid wallets, salaries or
+    departments), warnings (duplicate wallets) and the diff against the previous
+    pay period. POST /api/payroll/execute refuses to start when `ok` is False.
+    """
+    company = db.query(Company).filter(Company.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
     
-    # Refresh all transactions
-    for txn in transactions:
-        db.refresh(txn)
+    workers = db.query(Worker).join(Department).filter(
+        Department.company_id == company.id,
+        Worker.is_active == True
+    ).all()
     
-    return transactions
+    wallet_balance_micro = None
+    reserved_micro = 0
+    if company.circle_wallet_id:
+        wallet_balance_micro = fetch_wallet_balance_micro(company.circle_wallet_id)
+        reserved_micro = wallet_ledger.outstanding(company.circle_wallet_id)
+    return plan_payroll(
+        db, company, workers, payroll_data.period_start, payroll_data.period_end, wallet_balance_micro, reserved_micro
+    )
+
+
+@router.get("/runs", response_model=List[PayrollRunResponse])
+async def get_payroll_runs(current_user=Depends(get_current_user)):
+    """Recent payroll runs (manual and scheduled) of this process, newest first"""
+    return [run.progress() for run in payroll_jobs.runs_for(current_user.id)]
+
+
+@router.get("/runs/{run_id}", response_model=PayrollRunResponse)
+async def get_payroll_run(run_id: str, current_user=Depends(get_current_user)):
+    """Progress of a payroll run: counts, throughput (payouts/s) and ETA"""
+    run = payroll_jobs.get(run_id)
+    if not run or run.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    return run.progress()
 
 
 @router.get("/transactions", response_model=List[PayrollTransactionResponse])
 async def get_payroll_transactions(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    worker_id: Optional[int] = None,
+    period_start: Optional[date] = Query(None, description="Only pay periods starting on or after this date"),
+    period_end: Optional[date] = Query(None, description="Only pay periods ending on or before this date"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (capped at {MAX_PAGE_SIZE})"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all payroll transactions"""
+    """
+    Get payroll transactions, newest first, optionally filtered by status, worker and period
+    (conditional: ETag / If-None-Match).
+    With limit/cursor: one keyset page, the next page's cursor in X-Next-Cursor.
+    Accept: application/x-ndjson (or ?format=ndjson) streams one transaction per line.
+    """
+    not_modified = conditional_get(request, response, current_user.id, "payroll_transactions")
+    if not_modified:
+        return not_modified
+    
     company = db.query(Company).filter(Company.user_id == current_user.id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    transactions = db.query(PayrollTransaction).filter(
-        PayrollTransaction.company_id == company.id
-    ).order_by(PayrollTransaction.created_at.desc()).all()
-    
-    return transactions
+    query = db.query(PayrollTransaction).filter(PayrollTransaction.company_id == company.id)
+    if status:
+        query = query.filter(PayrollTransaction.status == status)
+    if worker_id:
+        query = query.filter(PayrollTransaction.worker_id == worker_id)
+    if period_start:
+        query = query.filter(PayrollTransaction.period_start >= period_start)
+    if period_end:
+        query = query.filter(PayrollTransaction.period_end <= period_end)
+    
+    if is_paginated(cursor, limit):
+        transactions, next_cursor = keyset_page(query, PayrollTransaction.id, cursor, limit, descending=True)
+        set_next_cursor(response, next_cursor)
+        rows = [encode_transaction(t) for t in transactions]
+        return ndjson_response(rows, response) if wants_ndjson(request) else json_list(rows, response)
+    
+    # Ids are assigned at insert, so id order is creation order (and matches the pages)
+    query = query.order_by(PayrollTransaction.id.desc())
+    if wants_ndjson(request):
+        return ndjson_response(stream_query(query, encode_transaction), response)
+    return json_list([encode_transaction(t) for t in query.all()], response)
 
@@ -1,24 +1,32 @@
 """
 Revenue routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import Revenue, Company
 from ..schemas import RevenueCreate, RevenueResponse
 from ..auth import get_current_user
-from ..cache import clear_cache
+from ..cache import clear_cache, bump_versions
+from ..conditional import conditional_get
+from ..money import to_micro
 
 router = APIRouter(prefix="/api/revenue", tags=["revenue"])
 
 
 @router.get("/", response_model=List[RevenueResponse])
 async def get_revenues(
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all revenues for company"""
+    """Get all revenues for company (conditional: ETag / If-None-Match)"""
+    not_modified = conditional_get(request, response, current_user.id, "revenues")
+    if not_modified:
+        return not_modified
+    
     company = db.query(Company).filter(Company.user_id == current_user.id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -51,18 +59,19 @@ async def create_revenue(
     
     if existing:
         # Update existing revenue
-        existing.amount = revenue_data.amount
+        existing.amount_micro = to_micro(revenue_data.amount)
         db.commit()
         db.refresh(existing)
         
         # Clear dashboard cache since stats changed
         clear_cache(current_user.id)
+        bump_versions(current_user.id, "revenues")
         
         return existing
     
     revenue = Revenue(
         company_id=company.id,
-        amount=revenue_data.amount,
+        amount_micro=to_micro(revenue_data.amount),
         month=revenue_data.month,
         year=revenue_data.year
     )
@@ -72,6 +81,7 @@ async def create_revenue(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "revenues")
     
     return revenue
 
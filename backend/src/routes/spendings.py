@@ -1,26 +1,40 @@
 """
 Additional spending routes
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models import AdditionalSpending, Company, Department
 from ..schemas import SpendingCreate, SpendingResponse
 from pydantic import BaseModel
 from ..auth import get_current_user
-from ..cache import clear_cache
+from ..cache import clear_cache, bump_versions
+from ..conditional import conditional_get
+from ..money import to_micro
+from ..pagination import MAX_PAGE_SIZE, is_paginated, keyset_page, set_next_cursor
 
 router = APIRouter(prefix="/api/spendings", tags=["spendings"])
 
 
 @router.get("/", response_model=List[SpendingResponse])
 async def get_spendings(
+    request: Request,
+    response: Response,
     department_id: int = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (capped at {MAX_PAGE_SIZE})"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all spendings, optionally filtered by department"""
+    """
+    Get spendings ordered by id, optionally filtered by department (conditional: ETag / If-None-Match).
+    With limit/cursor: one keyset page, the next page's cursor in X-Next-Cursor.
+    """
+    not_modified = conditional_get(request, response, current_user.id, "spendings")
+    if not_modified:
+        return not_modified
+    
     company = db.query(Company).filter(Company.user_id == current_user.id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -33,8 +47,12 @@ async def get_spendings(
         # If no department_id, show CEO-level spendings (department_id is None)
         query = query.filter(AdditionalSpending.department_id.is_(None))
     
-    spendings = query.all()
-    return spendings
+    if is_paginated(cursor, limit):
+        spendings, next_cursor = keyset_page(query, AdditionalSpending.id, cursor, limit)
+        set_next_cursor(response, next_cursor)
+        return spendings
+    
+    return query.order_by(AdditionalSpending.id).all()
 
 
 @router.post("/", response_model=SpendingResponse)
@@ -65,7 +83,7 @@ async def create_spending(
         company_id=company.id,
         department_id=spending_data.department_id,
         name=spending_data.name,
-        amount=spending_data.amount,
+        amount_micro=to_micro(spending_data.amount),
         wallet_address=spending_data.wallet_address
     )
     db.add(spending)
@@ -74,6 +92,7 @@ async def create_spending(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "spendings")
     
     return spending
 
@@ -102,6 +121,7 @@ async def delete_spending(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "spendings")
     
     return {"message": "Spending deleted"}
 
@@ -150,6 +170,7 @@ async def update_spending_date(
         spending.created_at = new_date
         db.commit()
         db.refresh(spending)
+        bump_versions(current_user.id, "spendings")
         return spending
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
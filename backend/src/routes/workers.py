@@ -1,25 +1,52 @@
 """
 Worker routes: CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..models import Worker, Department, Company
-from ..schemas import WorkerCreate, WorkerUpdate, WorkerResponse
+from ..schemas import WorkerCreate, WorkerUpdate, WorkerResponse, WorkerImportResult
 from ..auth import get_current_user
-from ..cache import clear_cache
+from ..cache import clear_cache, bump_versions
+from ..conditional import conditional_get
+from ..money import to_micro
+from ..responses import json_list, ndjson_response, row_encoder, stream_query, wants_ndjson
+from ..pagination import MAX_PAGE_SIZE, is_paginated, keyset_page, set_next_cursor
+from ..worker_import import (
+    DepartmentLookup, ImportFormatError, detect_format, iter_record_batches, validate_batch
+)
+
+# Cap on listed errors so a fully broken upload doesn't produce a giant response
+MAX_REPORTED_IMPORT_ERRORS = 1000
 
 router = APIRouter(prefix="/api/workers", tags=["workers"])
 
+encode_worker = row_encoder(WorkerResponse)
+
 
 @router.get("/", response_model=List[WorkerResponse])
 async def get_workers(
+    request: Request,
+    response: Response,
     department_id: int = None,
+    active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (capped at {MAX_PAGE_SIZE})"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all workers, optionally filtered by department"""
+    """
+    Get workers ordered by id, optionally filtered by department and active flag
+    (conditional: ETag / If-None-Match).
+    With limit/cursor: one keyset page, the next page's cursor in X-Next-Cursor.
+    Accept: application/x-ndjson (or ?format=ndjson) streams one worker per line.
+    """
+    not_modified = conditional_get(request, response, current_user.id, "workers")
+    if not_modified:
+        return not_modified
+    
     company = db.query(Company).filter(Company.user_id == current_user.id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -28,9 +55,19 @@ async def get_workers(
     
     if department_id:
         query = query.filter(Worker.department_id == department_id)
+    if active is not None:
+        query = query.filter(Worker.is_active == active)
     
-    workers = query.all()
-    return workers
+    if is_paginated(cursor, limit):
+        workers, next_cursor = keyset_page(query, Worker.id, cursor, limit)
+        set_next_cursor(response, next_cursor)
+        rows = [encode_worker(w) for w in workers]
+        return ndjson_response(rows, response) if wants_ndjson(request) else json_list(rows, response)
+    
+    query = query.order_by(Worker.id)
+    if wants_ndjson(request):
+        return ndjson_response(stream_query(query, encode_worker), response)
+    return json_list([encode_worker(w) for w in query.all()], response)
 
 
 @router.post("/", response_model=WorkerResponse)
@@ -61,7 +98,7 @@ async def create_worker(
         department_id=worker_data.department_id,
         name=worker_data.name,
         surname=worker_data.surname,
-        salary=worker_data.salary,
+        salary_micro=to_micro(worker_data.salary),
         wallet_address=worker_data.wallet_address
     )
     db.add(worker)
@@ -70,10 +107,81 @@ async def create_worker(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "workers")
     
     return worker
 
 
+@router.post("/import", response_model=WorkerImportResult)
+async def import_workers(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from Content-Type, else csv)"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-create workers from a streamed CSV (with header) or NDJSON body.
+
+    Columns / keys: name, surname, salary, wallet_address, department_id or
+    department (name), optional is_active. Valid rows are inserted in batched
+    executemany chunks within one transaction; invalid rows are skipped and
+    reported per row.
+    """
+    company = db.query(Company).filter(Company.user_id == current_user.id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Single prefetch: every row's department resolves against this lookup
+    departments = DepartmentLookup(
+        db.query(Department).filter(Department.company_id == company.id).all()
+    )
+    
+    received = imported = error_count = 0
+    failed_rows = set()
+    errors = []
+    try:
+        async for batch in iter_record_batches(request.stream(), fmt, batch_size):
+            received += len(batch)
+            rows, batch_errors = validate_batch(batch, departments)
+            if rows:
+                db.execute(insert(Worker), rows)
+                imported += len(rows)
+            error_count += len(batch_errors)
+            for error in batch_errors:
+                failed_rows.add(error["row"])
+                if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                    errors.append(error)
+        db.commit()
+    except ImportFormatError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        db.rollback()
+        raise
+    
+    print(f"[WORKERS] Imported {imported}/{received} worker(s) for company {company.id} "
+          f"({len(failed_rows)} rejected)")
+    
+    if imported:
+        # Clear dashboard cache since stats changed
+        clear_cache(current_user.id)
+        bump_versions(current_user.id, "workers")
+    
+    return WorkerImportResult(
+        received=received,
+        imported=imported,
+        failed=len(failed_rows),
+        errors=errors,
+        errors_truncated=error_count > len(errors),
+    )
+
+
 @router.put("/{worker_id}", response_model=WorkerResponse)
 async def update_worker(
     worker_id: int,
@@ -100,7 +208,7 @@ async def update_worker(
     if worker_data.surname is not None:
         worker.surname = worker_data.surname
     if worker_data.salary is not None:
-        worker.salary = worker_data.salary
+        worker.salary_micro = to_micro(worker_data.salary)
     if worker_data.wallet_address is not None:
         if not worker_data.wallet_address.startswith("0x") or len(worker_data.wallet_address) != 42:
             raise HTTPException(status_code=400, detail="Invalid wallet address format")
@@ -122,6 +230,7 @@ async def update_worker(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "workers")
     
     return worker
 
@@ -150,6 +259,7 @@ async def delete_worker(
     
     # Clear dashboard cache since stats changed
     clear_cache(current_user.id)
+    bump_versions(current_user.id, "workers", "payroll_transactions")
     
     return {"message": "Worker deleted"}
 
@@ -1,9 +1,13 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Annotated
 from datetime import date, datetime
+from decimal import Decimal
+
+# Incoming USDC amounts: parsed as exact decimals, at most 6 places (one micro-USDC)
+USDCAmount = Annotated[Decimal, Field(ge=0, decimal_places=6)]
 
 
 # Auth schemas
@@ -69,7 +73,7 @@ class DepartmentResponse(BaseModel):
 class WorkerCreate(BaseModel):
     name: str
     surname: str
-    salary: float
+    salary: USDCAmount
     wallet_address: str
     department_id: int
 
@@ -77,7 +81,7 @@ class WorkerCreate(BaseModel):
 class WorkerUpdate(BaseModel):
     name: Optional[str] = None
     surname: Optional[str] = None
-    salary: Optional[float] = None
+    salary: Optional[USDCAmount] = None
     wallet_address: Optional[str] = None
     is_active: Optional[bool] = None
     department_id: Optional[int] = None
@@ -88,6 +92,7 @@ class WorkerResponse(BaseModel):
     name: str
     surname: str
     salary: float
+    salary_micro: int  # Exact salary in micro-USDC
     wallet_address: str
     is_active: bool
     department_id: int
@@ -97,10 +102,24 @@ class WorkerResponse(BaseModel):
         from_attributes = True
 
 
+class WorkerImportError(BaseModel):
+    row: int  # 1-based data row (CSV header not counted)
+    field: Optional[str] = None
+    error: str
+
+
+class WorkerImportResult(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    errors: List[WorkerImportError]
+    errors_truncated: bool = False  # True when more errors occurred than are listed
+
+
 # Spending schemas
 class SpendingCreate(BaseModel):
     name: str
-    amount: float
+    amount: USDCAmount
     wallet_address: str
     department_id: Optional[int] = None  # None means assigned to CEO
 
@@ -109,6 +128,7 @@ class SpendingResponse(BaseModel):
     id: int
     name: str
     amount: float
+    amount_micro: int  # Exact amount in micro-USDC
     wallet_address: str
     company_id: int
     department_id: Optional[int]
@@ -120,7 +140,7 @@ class SpendingResponse(BaseModel):
 
 # Revenue schemas
 class RevenueCreate(BaseModel):
-    amount: float
+    amount: USDCAmount
     month: int  # 1-12
     year: int
 
@@ -128,6 +148,7 @@ class RevenueCreate(BaseModel):
 class RevenueResponse(BaseModel):
     id: int
     amount: float
+    amount_micro: int  # Exact amount in micro-USDC
     month: int
     year: int
     company_id: int
@@ -147,17 +168,112 @@ class PayrollTransactionResponse(BaseModel):
     id: int
     worker_id: int
     amount: float
+    amount_micro: int  # Exact amount in micro-USDC
     period_start: date
     period_end: date
     status: str  # pending, INITIATED, QUEUED, SENT, CONFIRMED, COMPLETE, failed
     transaction_hash: Optional[str]  # Blockchain transaction hash
     circle_transaction_id: Optional[str] = None  # Circle transaction ID (UUID)
+    idempotency_key: Optional[str] = None  # Circle idempotency key of the transfer
     created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class PayrollRunResponse(BaseModel):
+    run_id: str
+    status: str  # queued, running, completed, failed
+    scheduled: bool
+    period_start: date
+    period_end: date
+    total: int
+    completed: int
+    succeeded: int
+    failed: int
+    pending: int
+    total_amount: str  # USDC
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    throughput_per_second: Optional[float] = None  # Payouts per second
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class PayrollPlanIssue(BaseModel):
+    code: str  # insufficient_balance, invalid_wallet, invalid_salary, invalid_department, duplicate_wallet, ...
+    message: str
+    worker_ids: List[int] = []
+
+
+class PayrollPlanChange(BaseModel):
+    worker_id: int
+    worker_name: Optional[str] = None
+    previous_amount: Optional[str] = None  # USDC; None for workers added since the previous period
+    amount: Optional[str] = None  # USDC; None for workers no longer paid
+
+
+class PayrollPlanDiff(BaseModel):
+    previous_period_start: date
+    previous_period_end: date
+    added: List[PayrollPlanChange]
+    removed: List[PayrollPlanChange]
+    changed: List[PayrollPlanChange]
+    unchanged: int
+    total_delta: str  # USDC, signed
+
+
+class PayrollPlanResponse(BaseModel):
+    ok: bool  # False: the payroll would fail or is invalid (see errors)
+    period_start: date
+    period_end: date
+    workers: int  # Active workers
+    already_paid: int = 0  # Sent already for this period, not planned again
+    payouts: int
+    total_amount: str  # USDC
+    wallet_balance: Optional[str] = None  # USDC; None if it could not be read
+    reserved_amount: str = "0.00"  # USDC held by other payouts (not available to this payroll)
+    balance_after: Optional[str] = None
+    errors: List[PayrollPlanIssue]
+    warnings: List[PayrollPlanIssue]
+    diff: Optional[PayrollPlanDiff] = None  # None before the company's first payroll
+    elapsed_ms: float
+
+
+# Forecast schemas
+class ForecastRequest(BaseModel):
+    months: int = Field(12, ge=1, le=120)
+    scenarios: int = Field(10_000, ge=100, le=200_000)
+    starting_balance: Optional[USDCAmount] = None  # Default: Circle wallet balance
+    revenue_volatility: float = Field(0.2, ge=0, le=2)  # Lognormal sigma on sampled monthly revenue
+    spending_volatility: float = Field(0.1, ge=0, le=2)
+    attrition_rate: float = Field(0.0, ge=0, le=1)  # Monthly probability that a worker leaves
+    seed: Optional[int] = Field(None, ge=0)  # Same seed and data -> same forecast
+
+
+class ForecastMonth(BaseModel):
+    month: str  # YYYY-MM
+    insolvency_probability: float  # Share of scenarios insolvent by the end of this month
+    balance_p5: float
+    balance_p50: float
+    balance_p95: float
+
+
+class ForecastResponse(BaseModel):
+    scenarios: int
+    months: int
+    seed: int
+    workers: int
+    starting_balance: float
+    monthly_payroll: float
+    insolvency_probability: float  # By the end of the horizon
+    forecast: List[ForecastMonth]
+    processes: int
+    elapsed_seconds: float
+
+
 # Dashboard schemas
 class DashboardStats(BaseModel):
     total_workers: int
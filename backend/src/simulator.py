@@ -0,0 +1,97 @@
+"""
+Bridge to the treasury simulator (ArcTreasuryPayroll in the repository root main.py)
+
+The simulator is a standalone module next to the backend rather than a package,
+and its file name clashes with backend/main.py, so it is loaded by path under
+its own module name. TREASURY_SIMULATOR_PATH overrides the location (e.g. when
+the backend is deployed without the rest of the repository).
+
+load_company() replays a company's departments and workers into a contract,
+mapping database ids to contract ids; rows the contract would reject are
+collected instead of aborting the load.
+"""
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+SIMULATOR_PATH = Path(os.getenv(
+    "TREASURY_SIMULATOR_PATH", Path(__file__).resolve().parents[2] / "main.py"
+))
+SIMULATOR_MODULE = "treasury_simulator"
+
+# Contract roles inside a simulated company
+OWNER = "0xowner"
+TREASURY = "0xtreasury"
+
+_load_lock = threading.Lock()
+
+
+def load_simulator():
+    """The simulator module, imported once per process"""
+    module = sys.modules.get(SIMULATOR_MODULE)
+    if module is not None:
+        return module
+    with _load_lock:
+        module = sys.modules.get(SIMULATOR_MODULE)
+        if module is not None:
+            return module
+        if not SIMULATOR_PATH.is_file():
+            raise RuntimeError(f"Treasury simulator not found at {SIMULATOR_PATH} (set TREASURY_SIMULATOR_PATH)")
+        spec = importlib.util.spec_from_file_location(SIMULATOR_MODULE, SIMULATOR_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[SIMULATOR_MODULE] = module  # dataclasses resolve their module while the file executes
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[SIMULATOR_MODULE]
+            raise
+        return module
+
+
+class SimulatedCompany:
+    """A company's departments and workers loaded into an ArcTreasuryPayroll"""
+
+    def __init__(self):
+        sim = load_simulator()
+        self.contract = sim.ArcTreasuryPayroll(sim.MockERC20(), OWNER)
+        self.department_ids: Dict[int, int] = {}  # Department.id -> contract department id
+        self.worker_ids: Dict[int, int] = {}  # Worker.id -> contract worker id
+        self.rejected: List[Tuple[int, str]] = []  # (Worker.id, contract error) for rows it refused
+
+    def add_department(self, department) -> int:
+        contract_id = self.contract.create_department(OWNER, department.name or f"Department {department.id}")
+        self.department_ids[department.id] = contract_id
+        return contract_id
+
+    def add_worker(self, worker) -> int:
+        """Contract id of the worker, or 0 if the contract rejected the row (see `rejected`)"""
+        department_id = self.department_ids.get(worker.department_id, 0)
+        name = f"{worker.name} {worker.surname}".strip()
+        try:
+            contract_id = self.contract.add_worker(
+                OWNER, name, department_id, worker.wallet_address, worker.salary_micro
+            )
+            if not worker.is_active:
+                self.contract.deactivate_worker(OWNER, contract_id)
+        except ValueError as e:
+            self.rejected.append((worker.id, str(e)))
+            return 0
+        self.worker_ids[worker.id] = contract_id
+        return contract_id
+
+
+def load_company(departments: Iterable, workers: Iterable) -> SimulatedCompany:
+    """
+    Contract holding the given Department and Worker rows (ORM objects or rows with
+    the same attributes: id, department_id, name, surname, wallet_address, salary_micro, is_active)
+    """
+    company = SimulatedCompany()
+    for department in departments:
+        company.add_department(department)
+    for worker in workers:
+        company.add_worker(worker)
+    company.contract.events.clear()  # Setup events are not part of any simulation
+    return company
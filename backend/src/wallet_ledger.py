@@ -0,0 +1,115 @@
+"""
+Wallet reservation ledger: funds held per company wallet by payouts in progress
+
+A payout batch reserves its total before the first transfer, atomically against
+the wallet balance read for the batch minus what other batches hold, so
+concurrent manual and scheduled runs cannot all pass the balance check against
+the same funds. As transfers complete, the reservation shrinks:
+  - spend(): Circle accepted the transfer. The amount stays counted as "settling"
+    for LEDGER_SETTLE_SECONDS, because a balance read right after may not show the
+    debit yet (counting it twice only errs on the safe side)
+  - release(): the transfer failed, or the batch ended with funds unused
+One balance read per batch, none per transfer. Like the run registry, the ledger
+lives in the process (run one API process per deployment, as the scheduler does).
+"""
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+from .money import format_usdc
+
+# How long accepted transfers stay counted against the balance after they were sent
+LEDGER_SETTLE_SECONDS = float(os.getenv("LEDGER_SETTLE_SECONDS", "300"))
+
+
+class InsufficientFunds(Exception):
+    """A reservation does not fit in the wallet balance minus what other payouts hold"""
+
+    def __init__(self, required_micro: int, balance_micro: int, held_micro: int):
+        self.required_micro = required_micro
+        self.balance_micro = balance_micro
+        self.held_micro = held_micro
+        super().__init__(
+            f"Insufficient available balance. Balance: {format_usdc(balance_micro)} USDC, "
+            f"held by payouts in progress or recently sent: {format_usdc(held_micro)} USDC, "
+            f"Required: {format_usdc(required_micro)} USDC"
+        )
+
+
+class Reservation:
+    __slots__ = ("id", "wallet_id", "label", "amount_micro", "held_micro", "created_at")
+
+    def __init__(self, wallet_id: str, label: str, amount_micro: int):
+        self.id = uuid.uuid4().hex
+        self.wallet_id = wallet_id
+        self.label = label
+        self.amount_micro = amount_micro  # Reserved at first
+        self.held_micro = amount_micro  # Not yet spent or released
+        self.created_at = datetime.utcnow()
+
+
+class WalletLedger:
+    def __init__(self, settle_seconds: float = LEDGER_SETTLE_SECONDS):
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._reservations: Dict[str, Dict[str, Reservation]] = {}  # wallet id -> reservation id -> reservation
+        self._settling: Dict[str, Deque[Tuple[float, int]]] = {}  # wallet id -> (spent at, amount), oldest first
+
+    def _outstanding(self, wallet_id: str) -> int:
+        settling = self._settling.get(wallet_id)
+        if settling:
+            cutoff = time.monotonic() - self.settle_seconds
+            while settling and settling[0][0] < cutoff:
+                settling.popleft()
+        held = sum(r.held_micro for r in self._reservations.get(wallet_id, {}).values())
+        return held + sum(amount for _, amount in settling or ())
+
+    def outstanding(self, wallet_id: str) -> int:
+        """Micro-USDC held by reservations or spent too recently to trust a balance read"""
+        with self._lock:
+            return self._outstanding(wallet_id)
+
+    def reserve(self, wallet_id: str, amount_micro: int, balance_micro: Optional[int], label: str) -> Reservation:
+        """
+        Hold amount_micro of the wallet. balance_micro is the balance read for this batch;
+        None (unreadable) records the hold without checking it. Raises InsufficientFunds.
+        """
+        with self._lock:
+            held = self._outstanding(wallet_id)
+            if balance_micro is not None and amount_micro > balance_micro - held:
+                raise InsufficientFunds(amount_micro, balance_micro, held)
+            reservation = Reservation(wallet_id, label, amount_micro)
+            self._reservations.setdefault(wallet_id, {})[reservation.id] = reservation
+        print(f"[WALLET LEDGER] Reserved {format_usdc(amount_micro)} USDC for {label} "
+              f"({format_usdc(held)} USDC already held)")
+        return reservation
+
+    def _drop_if_done(self, reservation: Reservation):
+        if reservation.held_micro <= 0:
+            wallet = self._reservations.get(reservation.wallet_id, {})
+            wallet.pop(reservation.id, None)
+            if not wallet:
+                self._reservations.pop(reservation.wallet_id, None)
+
+    def spend(self, reservation: Reservation, amount_micro: int):
+        """A transfer of the reservation was accepted by Circle"""
+        with self._lock:
+            amount_micro = min(amount_micro, reservation.held_micro)
+            reservation.held_micro -= amount_micro
+            self._settling.setdefault(reservation.wallet_id, deque()).append((time.monotonic(), amount_micro))
+            self._drop_if_done(reservation)
+
+    def release(self, reservation: Reservation, amount_micro: Optional[int] = None):
+        """Give back amount_micro (a failed transfer), or everything still held"""
+        with self._lock:
+            if amount_micro is None or amount_micro > reservation.held_micro:
+                amount_micro = reservation.held_micro
+            reservation.held_micro -= amount_micro
+            self._drop_if_done(reservation)
+
+
+# Global ledger instance
+wallet_ledger = WalletLedger()
@@ -0,0 +1,242 @@
+"""
+Bulk worker import: streaming CSV / NDJSON parsing and batch validation
+
+The request body is decoded incrementally and cut into batches of records, so
+memory stays bounded by the batch size rather than the upload size. Each batch
+is validated column by column (one compiled-regex pass over all wallet
+addresses, one pass over all salaries, ...) against departments prefetched once
+per import.
+"""
+import codecs
+import csv
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .money import USDC_DECIMALS, to_micro
+
+WALLET_ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+
+REQUIRED_FIELDS = ("name", "surname", "salary", "wallet_address")
+DEPARTMENT_FIELDS = ("department_id", "department")
+
+_TRUE_VALUES = {"1", "true", "yes", "y"}
+_FALSE_VALUES = {"0", "false", "no", "n"}
+
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl",
+                        "application/x-jsonlines", "application/json"}
+
+# Records are (row number, parsed dict or None, parse error or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be parsed at all (bad header, unknown format)"""
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    """Resolve "csv" / "ndjson" from ?format= or the Content-Type header (default csv)"""
+    if explicit:
+        fmt = explicit.lower()
+        if fmt in ("jsonl", "json"):
+            fmt = "ndjson"
+        if fmt not in ("csv", "ndjson"):
+            raise ImportFormatError(f"Unsupported format '{explicit}' (expected csv or ndjson)")
+        return fmt
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        return "ndjson"
+    return "csv"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield complete lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_record_batches(chunks: AsyncIterator[bytes], fmt: str,
+                              batch_size: int) -> AsyncIterator[List[Record]]:
+    """
+    Yield batches of parsed records from a CSV (with header) or NDJSON stream.
+    Row numbers count data records from 1; blank lines are skipped.
+    Quoted CSV fields spanning several lines are not supported.
+    """
+    header: Optional[List[str]] = None
+    batch: List[Record] = []
+    row = 0
+
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+
+        if fmt == "csv" and header is None:
+            header = [h.strip().lower() for h in next(csv.reader([line]))]
+            missing = [f for f in REQUIRED_FIELDS if f not in header]
+            if not any(f in header for f in DEPARTMENT_FIELDS):
+                missing.append("department_id or department")
+            if missing:
+                raise ImportFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+            continue
+
+        row += 1
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if len(values) != len(header):
+                batch.append((row, None, f"Expected {len(header)} columns, got {len(values)}"))
+            else:
+                batch.append((row, dict(zip(header, values)), None))
+        else:
+            try:
+                # Decimal keeps salaries exact ("1234.56" never becomes 1234.5599999)
+                record = json.loads(line, parse_float=Decimal)
+            except ValueError as e:
+                batch.append((row, None, f"Invalid JSON: {e}"))
+            else:
+                if isinstance(record, dict):
+                    batch.append((row, record, None))
+                else:
+                    batch.append((row, None, "Each line must be a JSON object"))
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if fmt == "csv" and header is None:
+        raise ImportFormatError("CSV body is empty (no header row)")
+    if batch:
+        yield batch
+
+
+class DepartmentLookup:
+    """Company departments prefetched once, resolvable by id or (unique) name"""
+
+    def __init__(self, departments):
+        self.ids = {d.id for d in departments}
+        self.by_name: Dict[str, int] = {}
+        self.ambiguous = set()
+        for d in departments:
+            key = d.name.strip().lower()
+            if key in self.by_name:
+                self.ambiguous.add(key)
+            self.by_name[key] = d.id
+
+    def resolve(self, record: dict) -> Tuple[Optional[int], Optional[str]]:
+        raw_id = record.get("department_id")
+        if raw_id not in (None, ""):
+            try:
+                dept_id = int(raw_id)
+            except (TypeError, ValueError):
+                return None, "department_id must be an integer"
+            if dept_id not in self.ids:
+                return None, "Department not found"
+            return dept_id, None
+
+        name = record.get("department")
+        if not isinstance(name, str) or not name.strip():
+            return None, "department_id or department is required"
+        key = name.strip().lower()
+        if key in self.ambiguous:
+            return None, f"Department name '{name}' is ambiguous, use department_id"
+        if key not in self.by_name:
+            return None, "Department not found"
+        return self.by_name[key], None
+
+
+def _parse_salary(value) -> Tuple[Optional[int], Optional[str]]:
+    if value is None or value == "":
+        return None, "salary is required"
+    if isinstance(value, bool):
+        return None, "salary must be a number"
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None, "salary must be a number"
+    if not amount.is_finite() or amount < 0:
+        return None, "salary must be a non-negative number"
+    if amount.as_tuple().exponent < -USDC_DECIMALS:
+        return None, f"salary has more than {USDC_DECIMALS} decimal places"
+    return to_micro(amount), None
+
+
+def _parse_active(value) -> Tuple[Optional[bool], Optional[str]]:
+    if value is None or value == "":
+        return True, None
+    if isinstance(value, bool):
+        return value, None
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True, None
+    if text in _FALSE_VALUES:
+        return False, None
+    return None, "is_active must be true or false"
+
+
+def validate_batch(batch: List[Record], departments: DepartmentLookup) -> Tuple[List[dict], List[dict]]:
+    """
+    Validate a batch column by column.
+
+    Returns:
+        (rows ready for insert(Worker), errors as {"row", "field", "error"})
+    """
+    errors: List[dict] = []
+    records = []
+    for row, record, parse_error in batch:
+        if parse_error:
+            errors.append({"row": row, "field": None, "error": parse_error})
+        else:
+            records.append((row, record))
+
+    # Wallet addresses: one compiled-regex pass over the whole column
+    wallets = [record.get("wallet_address") for _, record in records]
+    wallet_ok = [isinstance(w, str) and WALLET_ADDRESS_RE.fullmatch(w.strip()) is not None for w in wallets]
+    salaries = [_parse_salary(record.get("salary")) for _, record in records]
+    active = [_parse_active(record.get("is_active")) for _, record in records]
+    dept_ids = [departments.resolve(record) for _, record in records]
+
+    rows = []
+    for i, (row, record) in enumerate(records):
+        row_errors = []
+        name = record.get("name")
+        surname = record.get("surname")
+        if not isinstance(name, str) or not name.strip():
+            row_errors.append(("name", "name is required"))
+        if not isinstance(surname, str) or not surname.strip():
+            row_errors.append(("surname", "surname is required"))
+        if not wallet_ok[i]:
+            row_errors.append(("wallet_address", "Invalid wallet address format"))
+        salary_micro, salary_error = salaries[i]
+        if salary_error:
+            row_errors.append(("salary", salary_error))
+        is_active, active_error = active[i]
+        if active_error:
+            row_errors.append(("is_active", active_error))
+        department_id, dept_error = dept_ids[i]
+        if dept_error:
+            row_errors.append(("department", dept_error))
+
+        if row_errors:
+            errors.extend({"row": row, "field": field, "error": message} for field, message in row_errors)
+            continue
+
+        rows.append({
+            "department_id": department_id,
+            "name": name.strip(),
+            "surname": surname.strip(),
+            "salary_micro": salary_micro,
+            "wallet_address": wallets[i].strip(),
+            "is_active": is_active,
+        })
+
+    return rows, errors
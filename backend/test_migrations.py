@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Regression test for the migration chain: the listing indexes survive an upgrade
+
+Runs the migrations on throwaway SQLite databases:
+  - a fresh database migrated to the latest version
+  - a database left by the original 0003 (non-keyset listing indexes, before the
+    models declared the keyset ones) and then migrated to the latest version
+
+Usage:
+    python test_migrations.py        (or: python -m pytest test_migrations.py)
+"""
+import os
+import tempfile
+
+# Never touch the configured database: src.database binds its engine on import
+_scratch_dir = tempfile.mkdtemp(prefix="bossboard-migrations-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch_dir, 'default.db')}"
+
+from sqlalchemy import create_engine, inspect, text
+from src.migrations import run_migrations
+
+LISTING_INDEXES = {
+    "additional_spendings": {"idx_spendings_company_department_keyset"},
+    "payroll_transactions": {"idx_payroll_company_keyset", "idx_payroll_company_period_created"},
+}
+SUPERSEDED_INDEXES = {
+    "additional_spendings": ("idx_spendings_company_department", "company_id, department_id"),
+    "payroll_transactions": ("idx_payroll_company_created", "company_id, created_at"),
+}
+KEYSET_INDEXES = {
+    "additional_spendings": "idx_spendings_company_department_keyset",
+    "payroll_transactions": "idx_payroll_company_keyset",
+}
+
+
+def _scratch_engine(name: str):
+    return create_engine(f"sqlite:///{os.path.join(_scratch_dir, name)}")
+
+
+def _indexes(engine, table: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def _check_listing_indexes(engine):
+    for table, expected in LISTING_INDEXES.items():
+        names = _indexes(engine, table)
+        missing = expected - names
+        assert not missing, f"{table} lost {sorted(missing)} (has {sorted(names)})"
+        superseded, _ = SUPERSEDED_INDEXES[table]
+        assert superseded not in names, f"{table} still has {superseded}"
+
+
+def test_fresh_database_has_listing_indexes():
+    engine = _scratch_engine("fresh.db")
+    run_migrations(engine, log=lambda message: None)
+    _check_listing_indexes(engine)
+
+
+def test_upgrade_from_original_0003_keeps_listing_indexes():
+    engine = _scratch_engine("upgrade.db")
+    run_migrations(engine, target="0004", log=lambda message: None)
+
+    # Schema as the original 0003 left it: the listings only had the non-keyset indexes
+    with engine.begin() as conn:
+        for table, (name, columns) in SUPERSEDED_INDEXES.items():
+            conn.execute(text(f"DROP INDEX IF EXISTS {KEYSET_INDEXES[table]}"))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version >= '0005'"))
+    for table, (name, _) in SUPERSEDED_INDEXES.items():
+        assert name in _indexes(engine, table)
+
+    applied = run_migrations(engine, log=lambda message: None)
+    assert "0005" in applied, applied
+    _check_listing_indexes(engine)
+
+
+if __name__ == "__main__":
+    for test in (test_fresh_database_has_listing_indexes, test_upgrade_from_original_0003_keeps_listing_indexes):
+        test()
+        print(f"[PASS] {test.__name__}")
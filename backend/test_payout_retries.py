@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Regression test: a transfer is sent once per call, and only the payout engine retries it
+
+Circle rejects a reused entitySecretCiphertext, so circle_guard must not resend a
+transfer request as is. The payout engine retries by calling transfer_usdc again,
+which encrypts the entity secret afresh and keeps the payroll idempotency key.
+Circle is replaced by a scripted requests.request (no network).
+
+Usage:
+    python test_payout_retries.py        (or: python -m pytest test_payout_retries.py)
+"""
+import json
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from itertools import count
+
+# Never touch the configured database: src.database binds its engine on import
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bossboard-payouts-'), 'test.db')}"
+
+import requests
+from src import payout_engine as payout_engine_module
+from src.circle_api import circle_api
+from src.circle_resilience import circle_guard
+from src.payout_engine import PayoutEngine, PayoutItem, payroll_idempotency_key
+
+TOKEN_ID = str(uuid.uuid4())
+WALLET_ID = str(uuid.uuid4())
+
+
+def _response(status_code: int, body: dict) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+@contextmanager
+def scripted_circle(statuses):
+    """Answer transfer POSTs with the given status codes in turn; yields the request bodies sent"""
+    sent = []
+    statuses = iter(statuses)
+    ciphertexts = count(1)
+
+    def request(method, url, **kwargs):
+        assert method == "POST" and url.endswith("/transactions/transfer"), (method, url)
+        sent.append(kwargs["json"])
+        status_code = next(statuses)
+        if status_code == 201:
+            return _response(201, {"data": {"id": str(uuid.uuid4()), "state": "INITIATED"}})
+        return _response(status_code, {"message": "Service unavailable"})
+
+    saved = (requests.request, circle_api.encrypt_entity_secret, circle_api.api_key,
+             payout_engine_module.PAYOUT_RETRY_BASE_SECONDS)
+    requests.request = request
+    circle_api.encrypt_entity_secret = lambda entity_secret_hex: f"ciphertext-{next(ciphertexts)}"
+    circle_api.api_key = "TEST_API_KEY:fake:fake"
+    payout_engine_module.PAYOUT_RETRY_BASE_SECONDS = 0
+    circle_guard.breaker.__init__()  # Closed, whatever earlier calls did
+    try:
+        yield sent
+    finally:
+        (requests.request, circle_api.encrypt_entity_secret, circle_api.api_key,
+         payout_engine_module.PAYOUT_RETRY_BASE_SECONDS) = saved
+
+
+def test_transfer_is_sent_once():
+    key = str(uuid.uuid4())
+    with scripted_circle([503, 201]) as sent:
+        try:
+            circle_api.transfer_usdc(entity_secret_hex="ab" * 32, wallet_id=WALLET_ID,
+                                     destination_address="0x" + "2" * 40, amount="100.00",
+                                     token_id=TOKEN_ID, idempotency_key=key)
+        except Exception as e:
+            assert getattr(e, "status_code", None) == 503, e
+        else:
+            raise AssertionError("a 503 transfer must raise, not be resent by circle_guard")
+    assert len(sent) == 1, sent
+
+
+def test_engine_retries_with_fresh_ciphertext_and_same_key():
+    key = payroll_idempotency_key(1, 7, date(2026, 10, 1), date(2026, 10, 31))
+    item = PayoutItem(1, 7, "Ada Lovelace", "0x" + "3" * 40, 100_000_000, key)
+    results = []
+    with scripted_circle([503, 502, 201]) as sent:
+        PayoutEngine(concurrency=1, attempts=4).run([item], "ab" * 32, WALLET_ID, results.append, token_id=TOKEN_ID)
+
+    assert [r.status for r in results] == ["INITIATED"], [(r.status, r.error) for r in results]
+    assert len(sent) == 3, sent  # One request per engine attempt, none added by circle_guard
+    assert {body["idempotencyKey"] for body in sent} == {key}
+    assert len({body["entitySecretCiphertext"] for body in sent}) == 3
+
+
+def test_engine_gives_up_after_its_attempts():
+    key = str(uuid.uuid4())
+    item = PayoutItem(2, 8, "Grace Hopper", "0x" + "4" * 40, 50_000_000, key)
+    results = []
+    with scripted_circle([503] * 3) as sent:
+        PayoutEngine(concurrency=1, attempts=3).run([item], "ab" * 32, WALLET_ID, results.append, token_id=TOKEN_ID)
+
+    assert [r.status for r in results] == ["failed"]
+    assert len(sent) == 3, sent
+
+
+if __name__ == "__main__":
+    for test in (test_transfer_is_sent_once, test_engine_retries_with_fresh_ciphertext_and_same_key,
+                 test_engine_gives_up_after_its_attempts):
+        test()
+        print(f"[PASS] {test.__name__}")
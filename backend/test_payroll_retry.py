@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Regression test: a payroll retry plans, reserves and sends only the unpaid payouts
+
+Runs the API in-process (TestClient) on a throwaway SQLite database against the
+local Circle stand-in (benchmarks/fake_circle.py):
+  10 workers x 100 USDC, 1000 USDC wallet. The first run pays everyone, then 3
+  of those transfers are undone on both sides (rows failed, the stand-in forgets
+  them and refunds 300 USDC), which is what a run whose 3 transfers never reached
+  Circle leaves. The retry must plan, reserve and send those 3 payouts only
+  (300 USDC, not 1000), and a fully paid period answers 409.
+
+Usage:
+    python test_payroll_retry.py        (or: python -m pytest test_payroll_retry.py)
+"""
+import json
+import os
+import tempfile
+import time
+import uuid
+
+# Never touch the configured database or Circle account
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bossboard-payroll-'), 'test.db')}"
+os.environ["MIGRATE_ON_START"] = "true"
+os.environ.setdefault("ENTITY_SECRET", "ab" * 32)
+os.environ.setdefault("USDC_TOKEN_ID", str(uuid.uuid4()))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from benchmarks.fake_circle import FakeCircleConfig, FakeCircleServer
+from src.circle_api import circle_api
+from src.database import SessionLocal
+from src.models import PayrollTransaction
+from src.money import MICRO_PER_USDC
+from src.wallet_ledger import wallet_ledger
+import main
+
+WORKERS = 10
+SALARY = "100.00"
+FAILED = 3
+PERIOD = {"period_start": "2026-10-01", "period_end": "2026-10-31"}
+
+
+def _company(client: TestClient, wallet_id: str) -> dict:
+    """Register a user with a company, its Circle wallet and WORKERS workers; returns auth headers"""
+    token = client.post("/api/auth/register", json={
+        "email": f"retry-{uuid.uuid4().hex[:8]}@example.com", "password": "secret123", "company_name": "Retry",
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.put("/api/company/master-wallet", headers=headers, json={
+        "master_wallet_address": "0x" + "1" * 40, "circle_wallet_id": wallet_id,
+    }).raise_for_status()
+    department_id = client.post("/api/departments/", headers=headers, json={"name": "Eng"}).json()["id"]
+    rows = "".join(json.dumps({
+        "name": f"W{i}", "surname": "S", "salary": SALARY,
+        "wallet_address": "0x%040x" % (i + 1), "department_id": department_id,
+    }) + "\n" for i in range(WORKERS))
+    imported = client.post("/api/workers/import", params={"format": "ndjson"}, content=rows.encode(),
+                           headers={**headers, "Content-Type": "application/x-ndjson"}).json()
+    assert not imported["failed"], imported
+    return headers
+
+
+def _execute(client: TestClient, headers: dict):
+    response = client.post("/api/payroll/execute", headers=headers, json=PERIOD)
+    if response.status_code == 202:
+        run_id = response.json()["run_id"]
+        deadline = time.monotonic() + 60
+        while client.get(f"/api/payroll/runs/{run_id}", headers=headers).json()["status"] in ("queued", "running"):
+            assert time.monotonic() < deadline, "payroll run did not finish"
+            time.sleep(0.1)
+    return response
+
+
+def test_retry_sends_only_unpaid_payouts():
+    server = FakeCircleServer(FakeCircleConfig(balance=WORKERS * 100, seed=1))
+    server.start()
+    circle_api.base_url, circle_api.api_key = server.url, "TEST_API_KEY:fake:fake"
+    # Accepted transfers normally stay held for LEDGER_SETTLE_SECONDS; the stand-in debits at once
+    settle_seconds, wallet_ledger.settle_seconds = wallet_ledger.settle_seconds, 0
+    try:
+        with TestClient(main.app) as client:
+            wallet_id = str(uuid.uuid4())
+            headers = _company(client, wallet_id)
+
+            assert _execute(client, headers).json()["total"] == WORKERS
+            assert server.fake.counters["transfers"] == WORKERS
+
+            # 3 transfers never reached Circle: their rows are failed, their funds still there
+            db = SessionLocal()
+            try:
+                failed = db.query(PayrollTransaction).order_by(PayrollTransaction.id.desc()).limit(FAILED).all()
+                db.execute(update(PayrollTransaction).where(PayrollTransaction.id.in_([tx.id for tx in failed]))
+                           .values(status="failed", circle_transaction_id=None))
+                db.commit()
+                for tx in failed:
+                    server.fake.idempotency.pop(tx.idempotency_key)
+            finally:
+                db.close()
+            server.fake.balances[wallet_id] += FAILED * 100 * MICRO_PER_USDC
+
+            plan = client.post("/api/payroll/preflight", headers=headers, json=PERIOD).json()
+            assert plan["ok"], plan["errors"]
+            assert (plan["workers"], plan["already_paid"], plan["payouts"]) == (WORKERS, WORKERS - FAILED, FAILED)
+            assert plan["total_amount"] == "300.00" and plan["balance_after"] == "0.00", plan
+            assert plan["diff"] is None  # No other period to compare with
+
+            retry = _execute(client, headers)
+            assert retry.status_code == 202, retry.json()
+            assert retry.json()["total"] == FAILED
+            assert server.fake.counters["transfers"] == WORKERS + FAILED
+            assert server.fake.balances[wallet_id] == 0
+            assert wallet_ledger.outstanding(wallet_id) == 0
+
+            plan = client.post("/api/payroll/preflight", headers=headers, json=PERIOD).json()
+            assert plan["ok"] and plan["payouts"] == 0 and plan["already_paid"] == WORKERS, plan
+            paid = _execute(client, headers)
+            assert paid.status_code == 409 and "already been paid" in paid.json()["detail"], paid.json()
+            assert server.fake.counters["transfers"] == WORKERS + FAILED
+    finally:
+        wallet_ledger.settle_seconds = settle_seconds
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_retry_sends_only_unpaid_payouts()
+    print("[PASS] test_retry_sends_only_unpaid_payouts")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Regression test: a payroll run bumps the transaction list version after each commit
+
+Conditional GETs of /api/payroll/transactions are keyed on the
+"payroll_transactions" collection version. A run commits results every
+PAYOUT_COMMIT_EVERY payouts; each of those commits must bump the version, or
+clients keep being served the pending rows until the run ends.
+
+Runs the API in-process (TestClient) on a throwaway SQLite database against the
+local Circle stand-in (benchmarks/fake_circle.py).
+
+Usage:
+    python test_payroll_versions.py        (or: python -m pytest test_payroll_versions.py)
+"""
+import json
+import os
+import tempfile
+import time
+import uuid
+
+# Never touch the configured database or Circle account
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bossboard-versions-'), 'test.db')}"
+os.environ["MIGRATE_ON_START"] = "true"
+os.environ.setdefault("ENTITY_SECRET", "ab" * 32)
+os.environ.setdefault("USDC_TOKEN_ID", str(uuid.uuid4()))
+
+from fastapi.testclient import TestClient
+from benchmarks.fake_circle import FakeCircleConfig, FakeCircleServer
+from src import payroll_jobs
+from src.cache import get_version
+from src.circle_api import circle_api
+from src.database import SessionLocal
+from src.models import PayrollTransaction, User
+import main
+
+WORKERS = 60
+PERIOD = {"period_start": "2026-09-01", "period_end": "2026-09-30"}
+
+
+def test_intermediate_commits_bump_the_version():
+    server = FakeCircleServer(FakeCircleConfig(seed=1))
+    server.start()
+    circle_api.base_url, circle_api.api_key = server.url, "TEST_API_KEY:fake:fake"
+
+    bumps = []  # (collections, rows committed as sent when bumped)
+    original_bump = payroll_jobs.bump_versions
+
+    def recording_bump(user_id, *collections):
+        db = SessionLocal()
+        try:
+            committed = db.query(PayrollTransaction).filter(
+                PayrollTransaction.period_start == PERIOD["period_start"],
+                PayrollTransaction.status != "pending",
+            ).count()
+        finally:
+            db.close()
+        bumps.append((collections, committed))
+        original_bump(user_id, *collections)
+
+    payroll_jobs.bump_versions = recording_bump
+    try:
+        with TestClient(main.app) as client:
+            email = f"versions-{uuid.uuid4().hex[:8]}@example.com"
+            token = client.post("/api/auth/register", json={
+                "email": email, "password": "secret123",
+                "company_name": "Versions",
+            }).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            client.put("/api/company/master-wallet", headers=headers, json={
+                "master_wallet_address": "0x" + "1" * 40, "circle_wallet_id": str(uuid.uuid4()),
+            }).raise_for_status()
+            department_id = client.post("/api/departments/", headers=headers, json={"name": "Eng"}).json()["id"]
+            rows = "".join(json.dumps({
+                "name": f"W{i}", "surname": "S", "salary": "10.00",
+                "wallet_address": "0x%040x" % (i + 1), "department_id": department_id,
+            }) + "\n" for i in range(WORKERS))
+            client.post("/api/workers/import", params={"format": "ndjson"}, content=rows.encode(),
+                        headers={**headers, "Content-Type": "application/x-ndjson"}).raise_for_status()
+            db = SessionLocal()
+            try:
+                user_id = db.query(User.id).filter(User.email == email).scalar()
+            finally:
+                db.close()
+
+            version_before = get_version(user_id, "payroll_transactions")
+            response = client.post("/api/payroll/execute", headers=headers, json=PERIOD)
+            assert response.status_code == 202, response.json()
+            run_id = response.json()["run_id"]
+            deadline = time.monotonic() + 60
+            while client.get(f"/api/payroll/runs/{run_id}", headers=headers).json()["status"] in ("queued", "running"):
+                assert time.monotonic() < deadline, "payroll run did not finish"
+                time.sleep(0.1)
+    finally:
+        payroll_jobs.bump_versions = original_bump
+        server.stop()
+
+    # One bump per intermediate commit, each after its rows are committed, then one when the run ends
+    intermediate = list(range(payroll_jobs.PAYOUT_COMMIT_EVERY, WORKERS + 1, payroll_jobs.PAYOUT_COMMIT_EVERY))
+    assert bumps == [(("payroll_transactions",), n) for n in intermediate + [WORKERS]], bumps
+    # Plus the route's own bump for the pending rows it created
+    assert get_version(user_id, "payroll_transactions") == version_before + 1 + len(bumps)
+
+
+if __name__ == "__main__":
+    test_intermediate_commits_bump_the_version()
+    print("[PASS] test_intermediate_commits_bump_the_version")
@@ -73,7 +73,7 @@ try:
     # 4. Workers
     print("\n[4] WORKERS:")
     cursor.execute("""
-        SELECT w.id, d.name as dept_name, w.name, w.surname, w.salary, w.wallet_address, w.is_active
+        SELECT w.id, d.name as dept_name, w.name, w.surname, w.salary_micro / 1000000.0 AS salary, w.wallet_address, w.is_active
         FROM workers w
         JOIN departments d ON w.department_id = d.id
         ORDER BY w.created_at DESC
@@ -90,7 +90,7 @@ try:
     # 5. Spendings
     print("\n[5] SPENDINGS:")
     cursor.execute("""
-        SELECT s.id, u.company_name, COALESCE(d.name, 'CEO') as dept, s.name, s.amount, s.created_at
+        SELECT s.id, u.company_name, COALESCE(d.name, 'CEO') as dept, s.name, s.amount_micro / 1000000.0 AS amount, s.created_at
         FROM additional_spendings s
         JOIN companies c ON s.company_id = c.id
         JOIN users u ON c.user_id = u.id
@@ -109,7 +109,7 @@ try:
     # 6. Revenues
     print("\n[6] REVENUES:")
     cursor.execute("""
-        SELECT r.id, u.company_name, r.amount, r.month, r.year, r.created_at
+        SELECT r.id, u.company_name, r.amount_micro / 1000000.0 AS amount, r.month, r.year, r.created_at
         FROM revenues r
         JOIN companies c ON r.company_id = c.id
         JOIN users u ON c.user_id = u.id
@@ -1,5 +1,15 @@
+import json
+import os
+from array import array
+from collections import defaultdict, deque
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: only ColumnarPayroll needs it
+    np = None
 
 
 # ---------- Mock ERC20 Interface (for simulation) ----------
@@ -8,23 +18,46 @@ class MockERC20:
     """
     Very simple in-memory ERC20-like token.
     Only for tests/simulation – not real blockchain code.
+
+    Addresses are interned to integer indexes on first use and balances are
+    kept in a typed int64 array, so a multi-million-holder ledger costs a few
+    bytes per balance instead of a boxed int per dict entry. `balances` is a
+    mapping view over that storage (address -> balance).
     """
     def __init__(self, name="MockUSDC", symbol="USDC", decimals=6):
         self.name = name
         self.symbol = symbol
         self._decimals = decimals
-        self.balances: Dict[str, int] = {}
+        self._index: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        self._balances = array("q")  # int64; out-of-range balances raise OverflowError
+        self.balances = BalanceView(self)
 
     def decimals(self) -> int:
         return self._decimals
 
+    def address_index(self, account: str) -> int:
+        """Integer index of an address, interned with a zero balance on first use"""
+        index = self._index.get(account)
+        if index is None:
+            index = len(self._addresses)
+            self._index[account] = index
+            self._addresses.append(account)
+            self._balances.append(0)
+        return index
+
+    def ledger(self) -> Tuple[List[str], array]:
+        """Copies of the interned addresses and their balances, index-aligned"""
+        return list(self._addresses), array("q", self._balances)
+
     def balanceOf(self, account: str) -> int:
-        return self.balances.get(account, 0)
+        index = self._index.get(account)
+        return 0 if index is None else self._balances[index]
 
     def _mint(self, to: str, amount: int):
         if amount < 0:
             raise ValueError("amount must be non-negative")
-        self.balances[to] = self.balanceOf(to) + amount
+        self._balances[self.address_index(to)] += amount
 
     def transfer(self, sender: str, to: str, amount: int) -> bool:
         if amount < 0:
@@ -34,20 +67,51 @@ class MockERC20:
         if to is None:
             raise ValueError("zero address")
 
-        self.balances[sender] -= amount
-        self.balances[to] = self.balanceOf(to) + amount
+        self._balances[self.address_index(sender)] -= amount
+        self._balances[self.address_index(to)] += amount
         return True
 
 
+class BalanceView(MutableMapping):
+    """
+    dict-like view of a MockERC20 ledger. Holds every address the token has
+    seen; an address cannot be removed, only set to zero.
+    """
+    __slots__ = ("_token",)
+
+    def __init__(self, token: MockERC20):
+        self._token = token
+
+    def __getitem__(self, account: str) -> int:
+        return self._token._balances[self._token._index[account]]
+
+    def __setitem__(self, account: str, balance: int):
+        if balance < 0:
+            raise ValueError("balance must be non-negative")
+        self._token._balances[self._token.address_index(account)] = balance
+
+    def __delitem__(self, account: str):
+        raise TypeError("ledger addresses cannot be removed; set the balance to 0")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._token._addresses)
+
+    def __len__(self) -> int:
+        return len(self._token._addresses)
+
+    def __contains__(self, account) -> bool:
+        return account in self._token._index
+
+
 # ---------- Data Structures ----------
 
-@dataclass
+@dataclass(slots=True)
 class Department:
     name: str
     active: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class Worker:
     name: str
     department_id: int
@@ -56,6 +120,260 @@ class Worker:
     active: bool = True
 
 
+# ---------- Event stores ----------
+# ArcTreasuryPayroll appends every event dict to its `events` store. All stores
+# support append/extend/clear, len(), streaming iteration in emission order and
+# select(event, worker_id), which answers from per-type and per-worker indexes.
+
+WORKER_KEY = "workerId"  # Events carrying a worker id (WorkerAdded, WorkerUpdated, SalaryPaid)
+
+
+# json.dumps builds a new encoder per call when given separators; one shared instance is ~2x faster
+_encode_event = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _offsets() -> array:
+    return array("q")
+
+
+def _pick_index(by_type: dict, by_worker: dict, event: Optional[str], worker_id: Optional[int]):
+    """
+    Smallest index covering a select() and whether its entries still need the other
+    filter applied; None when neither filter is given (every event matches)
+    """
+    if event is None and worker_id is None:
+        return None, False
+    if worker_id is None:
+        return by_type.get(event, ()), False
+    if event is None:
+        return by_worker.get(worker_id, ()), False
+    type_index, worker_index = by_type.get(event, ()), by_worker.get(worker_id, ())
+    return (worker_index if len(worker_index) <= len(type_index) else type_index), True
+
+
+def _matches(record: dict, event: Optional[str], worker_id: Optional[int]) -> bool:
+    return (event is None or record.get("event") == event) and \
+        (worker_id is None or record.get(WORKER_KEY) == worker_id)
+
+
+class MemoryEventStore(list):
+    """
+    Unbounded in-memory event log, the default. It is a plain list of event dicts
+    (append stays a C list append on the payroll hot path); the indexes hold
+    positions in int64 arrays and are built on the first select(), then caught up
+    with whatever was appended since on later ones. Any other mutation (clear,
+    del, insert, ...) drops them to be rebuilt.
+    """
+
+    def __init__(self, events: Iterable[dict] = ()):
+        super().__init__(events)
+        self._reset_index()
+
+    def _reset_index(self):
+        self._indexed = 0
+        self._by_type: Dict[str, array] = defaultdict(_offsets)
+        self._by_worker: Dict[int, array] = defaultdict(_offsets)
+
+    def _catch_up(self):
+        by_type, by_worker = self._by_type, self._by_worker
+        for position in range(self._indexed, len(self)):
+            record = list.__getitem__(self, position)
+            by_type[record.get("event")].append(position)
+            worker_id = record.get(WORKER_KEY)
+            if worker_id is not None:
+                by_worker[worker_id].append(position)
+        self._indexed = len(self)
+
+    def select(self, event: Optional[str] = None, worker_id: Optional[int] = None) -> Iterator[dict]:
+        """Events of a type and/or worker, in emission order"""
+        self._catch_up()
+        positions, check = _pick_index(self._by_type, self._by_worker, event, worker_id)
+        if positions is None:
+            yield from list.__iter__(self)
+            return
+        for position in positions:
+            record = list.__getitem__(self, position)
+            if not check or _matches(record, event, worker_id):
+                yield record
+
+
+def _invalidates_index(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args):
+        result = method(self, *args)
+        self._reset_index()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+# Mutations that can move or replace existing events (append/extend only add at the end)
+for _name in ("clear", "insert", "pop", "remove", "sort", "reverse", "__setitem__", "__delitem__", "__imul__"):
+    setattr(MemoryEventStore, _name, _invalidates_index(_name))
+
+
+class RingBufferEventStore:
+    """
+    Keeps only the last `capacity` events, in constant memory. Events live in a
+    fixed circular list addressed by sequence number; the indexes hold sequence
+    numbers, and the evicted event is always the oldest entry of its own
+    indexes, so eviction pops their heads. `dropped` counts evicted events.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._slots: List[Optional[dict]] = [None] * self.capacity
+        self._next = 0  # Sequence number of the next event
+        self._by_type: Dict[str, deque] = defaultdict(deque)
+        # Per-worker indexes are short lists: a deque allocates a 64-slot block per worker
+        self._by_worker: Dict[int, List[int]] = defaultdict(list)
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self._next - self.capacity)
+
+    def append(self, record: dict):
+        seq = self._next
+        slot = seq % self.capacity
+        evicted = self._slots[slot]
+        if evicted is not None:
+            # The evicted event is the oldest entry of each of its indexes
+            name = evicted.get("event")
+            seqs = self._by_type[name]
+            seqs.popleft()
+            if not seqs:
+                del self._by_type[name]
+            worker_id = evicted.get(WORKER_KEY)
+            if worker_id is not None:
+                seqs = self._by_worker[worker_id]
+                del seqs[0]
+                if not seqs:
+                    del self._by_worker[worker_id]
+        self._slots[slot] = record
+        self._by_type[record.get("event")].append(seq)
+        worker_id = record.get(WORKER_KEY)
+        if worker_id is not None:
+            self._by_worker[worker_id].append(seq)
+        self._next = seq + 1
+
+    def extend(self, records: Iterable[dict]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    def __iter__(self) -> Iterator[dict]:
+        """Live events oldest first; events evicted while iterating are skipped"""
+        seq = self.dropped
+        while seq < self._next:
+            seq = max(seq, self.dropped)
+            yield self._slots[seq % self.capacity]
+            seq += 1
+
+    def select(self, event: Optional[str] = None, worker_id: Optional[int] = None) -> Iterator[dict]:
+        """Live events of a type and/or worker, in emission order"""
+        seqs, check = _pick_index(self._by_type, self._by_worker, event, worker_id)
+        if seqs is None:
+            yield from self
+            return
+        for seq in list(seqs):  # Snapshot: appends may evict from the deque
+            if seq < self.dropped:
+                continue
+            record = self._slots[seq % self.capacity]
+            if not check or _matches(record, event, worker_id):
+                yield record
+
+
+class DiskEventStore:
+    """
+    Append-only event log on disk, one JSON object per line. Memory holds only
+    the per-type and per-worker indexes as int64 byte offsets (16 bytes per
+    worker event), so a long simulation keeps its full history without keeping
+    the dicts. select() seeks straight to the matching lines; iteration streams
+    the file. Opening an existing log rebuilds the indexes from it.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        self._by_type: Dict[str, array] = defaultdict(_offsets)
+        self._by_worker: Dict[int, array] = defaultdict(_offsets)
+        self._count = 0
+        self._size = 0
+        if os.path.exists(path):
+            with open(path, "rb") as log:
+                for line in log:
+                    self._index(json.loads(line), self._size)
+                    self._size += len(line)
+        self._writer = open(path, "ab", buffering=buffer_size)
+        self._reader = open(path, "rb")
+
+    def _index(self, record: dict, offset: int):
+        self._by_type[record.get("event")].append(offset)
+        worker_id = record.get(WORKER_KEY)
+        if worker_id is not None:
+            self._by_worker[worker_id].append(offset)
+        self._count += 1
+
+    def append(self, record: dict):
+        line = _encode_event(record).encode() + b"\n"
+        self._writer.write(line)
+        self._index(record, self._size)
+        self._size += len(line)
+
+    def extend(self, records: Iterable[dict]):
+        for record in records:
+            self.append(record)
+
+    def clear(self):
+        self._writer.flush()
+        self._writer.truncate(0)
+        self._by_type.clear()
+        self._by_worker.clear()
+        self._count = self._size = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[dict]:
+        """Events in emission order, streamed from the file (appends made meanwhile are not included)"""
+        self._writer.flush()
+        end = self._size
+        with open(self.path, "rb") as log:
+            while log.tell() < end:
+                yield json.loads(log.readline())
+
+    def select(self, event: Optional[str] = None, worker_id: Optional[int] = None) -> Iterator[dict]:
+        """Events of a type and/or worker, in emission order"""
+        offsets, check = _pick_index(self._by_type, self._by_worker, event, worker_id)
+        if offsets is None:
+            yield from self
+            return
+        self._writer.flush()
+        for offset in offsets[:]:  # Snapshot: appends while iterating are not included
+            self._reader.seek(offset)
+            record = json.loads(self._reader.readline())
+            if not check or _matches(record, event, worker_id):
+                yield record
+
+    def close(self):
+        self._writer.close()
+        self._reader.close()
+
+    def __enter__(self) -> "DiskEventStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 # ---------- Main Treasury & Payroll Logic ----------
 
 class ArcTreasuryPayroll:
@@ -68,9 +386,12 @@ class ArcTreasuryPayroll:
       - payroll
       - pause/owner checks
       - event emission (as logs)
+
+    `events` picks the event store (see MemoryEventStore, RingBufferEventStore,
+    DiskEventStore); query it with payroll.events.select(event, worker_id).
     """
 
-    def __init__(self, usdc: MockERC20, owner: str):
+    def __init__(self, usdc: MockERC20, owner: str, events=None):
         if usdc is None:
             raise ValueError("USDC cannot be None")
         self.usdc = usdc
@@ -86,10 +407,11 @@ class ArcTreasuryPayroll:
         # Storage
         self.departments: Dict[int, Department] = {}
         self.workers: Dict[int, Worker] = {}
-        self.department_workers: Dict[int, List[int]] = {}
+        # department id -> worker ids as an insertion-ordered set (dict keys): O(1) add/remove
+        self.department_workers: Dict[int, Dict[int, None]] = {}
 
-        # Event log (list of tuples or dicts)
-        self.events: List[dict] = []
+        # Event log: MemoryEventStore (default), RingBufferEventStore or DiskEventStore
+        self.events = events if events is not None else MemoryEventStore()
 
     # ---------- Internal helpers ----------
 
@@ -184,7 +506,7 @@ class ArcTreasuryPayroll:
         self.next_department_id += 1
 
         self.departments[department_id] = Department(name=name, active=True)
-        self.department_workers[department_id] = []
+        self.department_workers[department_id] = {}
 
         self._emit("DepartmentCreated", departmentId=department_id, name=name)
         return department_id
@@ -242,7 +564,7 @@ class ArcTreasuryPayroll:
             active=True,
         )
         self.workers[worker_id] = worker
-        self.department_workers.setdefault(department_id, []).append(worker_id)
+        self.department_workers.setdefault(department_id, {})[worker_id] = None
 
         self._emit(
             "WorkerAdded",
@@ -278,14 +600,12 @@ class ArcTreasuryPayroll:
 
         w = self.workers[worker_id]
 
-        # if department changed, move worker between department lists
+        # if department changed, move worker between department sets
         if w.department_id != department_id:
             # remove from old
-            old_list = self.department_workers.get(w.department_id, [])
-            if worker_id in old_list:
-                old_list.remove(worker_id)
+            self.department_workers.get(w.department_id, {}).pop(worker_id, None)
             # add to new
-            self.department_workers.setdefault(department_id, []).append(worker_id)
+            self.department_workers.setdefault(department_id, {})[worker_id] = None
 
         w.name = name
         w.department_id = department_id
@@ -370,10 +690,191 @@ class ArcTreasuryPayroll:
     # ---------- View helpers ----------
 
     def get_department_workers(self, department_id: int) -> List[int]:
-        return list(self.department_workers.get(department_id, []))
+        return list(self.department_workers.get(department_id, {}))
 
     def get_worker(self, worker_id: int) -> Optional[Worker]:
         return self.workers.get(worker_id)
 
     def get_department(self, department_id: int) -> Optional[Department]:
         return self.departments.get(department_id)
+
+
+# ---------- Columnar simulation mode ----------
+
+INT64_MAX = 2 ** 63 - 1
+
+# One row per SalaryPaid event; wallet is an index into ColumnarPayroll.wallets
+SALARY_PAID_DTYPE = [("workerId", "<i8"), ("wallet", "<i8"), ("amount", "<i8"), ("departmentId", "<i8")]
+
+
+class ColumnarPayroll:
+    """
+    NumPy-backed simulation mode of ArcTreasuryPayroll for large dry runs.
+
+    Workers are parallel arrays indexed by worker id - 1 (salary, department,
+    active, wallet index); wallet addresses are interned to integer indexes and
+    balances live in one int64 array. run_payroll is a masked vectorized debit
+    and credit with the same checks, balances and SalaryPaid events as the
+    scalar path; events are kept as structured arrays (SALARY_PAID_DTYPE), one
+    per run. Build it from a contract with from_payroll() and copy the results
+    back with write_back().
+    """
+
+    def __init__(
+        self,
+        owner: str,
+        salary: "np.ndarray",
+        department: "np.ndarray",
+        active: "np.ndarray",
+        wallet_index: "np.ndarray",
+        wallets: List[str],
+        balances: Optional[Sequence[int]] = None,
+        paused: bool = False,
+    ):
+        if np is None:
+            raise RuntimeError("ColumnarPayroll requires numpy (pip install numpy)")
+        self.owner = owner
+        self.paused = paused
+
+        # Worker columns; row i is worker id i + 1, wallet index -1 means no wallet
+        self.salary = np.asarray(salary, dtype=np.int64)
+        self.department = np.asarray(department, dtype=np.int64)
+        self.active = np.asarray(active, dtype=bool)
+        self.wallet_index = np.asarray(wallet_index, dtype=np.int64)
+        if not (len(self.salary) == len(self.department) == len(self.active) == len(self.wallet_index)):
+            raise ValueError("Worker columns must have the same length")
+
+        # Interned addresses and their balances
+        self.wallets: List[str] = list(wallets)
+        self._wallet_ids: Dict[str, int] = {address: i for i, address in enumerate(self.wallets)}
+        self.balances = np.zeros(len(self.wallets), dtype=np.int64)
+        if balances is not None:
+            self.balances[:len(balances)] = balances
+
+        # One SALARY_PAID_DTYPE array per run_payroll call
+        self.salary_paid: List["np.ndarray"] = []
+
+    @classmethod
+    def from_payroll(cls, payroll: ArcTreasuryPayroll) -> "ColumnarPayroll":
+        """Snapshot of a contract's workers and its token balances"""
+        count = payroll.next_worker_id - 1
+        wallets, ledger_balances = payroll.usdc.ledger()
+        wallet_ids = dict(payroll.usdc._index)
+        salary = np.zeros(count, dtype=np.int64)
+        department = np.zeros(count, dtype=np.int64)
+        active = np.zeros(count, dtype=bool)
+        wallet_index = np.full(count, -1, dtype=np.int64)
+        for worker_id, worker in payroll.workers.items():
+            row = worker_id - 1
+            if worker.salary > INT64_MAX:
+                raise OverflowError(f"Salary of worker {worker_id} does not fit in int64")
+            salary[row] = worker.salary
+            department[row] = worker.department_id
+            active[row] = worker.active
+            if worker.wallet is not None:
+                if worker.wallet not in wallet_ids:
+                    wallet_ids[worker.wallet] = len(wallets)
+                    wallets.append(worker.wallet)
+                wallet_index[row] = wallet_ids[worker.wallet]
+        # The token ledger is already int64 and index-aligned with `wallets`; worker-only wallets start at 0
+        balances = np.frombuffer(ledger_balances, dtype=np.int64) if len(ledger_balances) else None
+        return cls(payroll.owner, salary, department, active, wallet_index, wallets, balances, payroll.paused)
+
+    # ---------- Wallets ----------
+
+    def wallet_id(self, address: str) -> int:
+        """Integer index of an address, interned (with a zero balance) on first use"""
+        index = self._wallet_ids.get(address)
+        if index is None:
+            index = len(self.wallets)
+            self._wallet_ids[address] = index
+            self.wallets.append(address)
+            self.balances = np.append(self.balances, np.int64(0))
+        return index
+
+    def balance_of(self, address: str) -> int:
+        index = self._wallet_ids.get(address)
+        return 0 if index is None else int(self.balances[index])
+
+    def mint(self, to: str, amount: int):
+        if amount < 0:
+            raise ValueError("amount must be non-negative")
+        index = self.wallet_id(to)
+        if int(self.balances[index]) + amount > INT64_MAX:
+            raise OverflowError("Balance does not fit in int64")
+        self.balances[index] += amount
+
+    # ---------- Payroll ----------
+
+    def run_payroll(self, caller: str, self_address: str, worker_ids: Optional[Sequence[int]] = None):
+        """
+        Vectorized ArcTreasuryPayroll.run_payroll. worker_ids may repeat (paid
+        again, as in the scalar path); None pays every worker in id order.
+        """
+        if caller != self.owner:
+            raise PermissionError("Not owner")
+        if self.paused:
+            raise RuntimeError("Contract is paused")
+
+        count = len(self.salary)
+        if worker_ids is None:
+            ids = np.arange(1, count + 1, dtype=np.int64)
+        else:
+            ids = np.asarray(worker_ids, dtype=np.int64)
+            ids = ids[(ids >= 1) & (ids <= count)]  # Unknown ids are skipped
+        rows = ids - 1
+        paid = self.active[rows] & (self.wallet_index[rows] >= 0) & (self.salary[rows] > 0)
+        rows = rows[paid]
+        amounts = self.salary[rows]
+
+        # Summed in int64 only when it cannot overflow, otherwise as Python ints
+        if not len(amounts) or int(amounts.max()) * len(amounts) <= INT64_MAX:
+            total_required = int(amounts.sum())
+        else:
+            total_required = sum(amounts.tolist())
+        treasury = self.wallet_id(self_address)
+        if int(self.balances[treasury]) < total_required:
+            raise ValueError("Insufficient USDC in treasury")
+
+        wallet_rows = self.wallet_index[rows]
+        if len(rows):
+            # np.add.at sums repeated wallets exactly in int64 (bincount weights would be float64)
+            received = np.zeros(len(self.balances), dtype=np.int64)
+            np.add.at(received, wallet_rows, amounts)
+            if int(received.max()) > INT64_MAX - int(self.balances.max()):
+                raise OverflowError("Balance does not fit in int64")
+            self.balances[treasury] -= total_required
+            self.balances += received
+
+        events = np.empty(len(rows), dtype=SALARY_PAID_DTYPE)
+        events["workerId"] = rows + 1
+        events["wallet"] = wallet_rows
+        events["amount"] = amounts
+        events["departmentId"] = self.department[rows]
+        self.salary_paid.append(events)
+        return events
+
+    # ---------- Results ----------
+
+    def iter_salary_events(self) -> Iterator[dict]:
+        """SalaryPaid events as the dicts the scalar path emits, in payment order"""
+        wallets = self.wallets
+        for events in self.salary_paid:
+            for worker_id, wallet, amount, department_id in events.tolist():
+                yield {
+                    "event": "SalaryPaid",
+                    "workerId": worker_id,
+                    "wallet": wallets[wallet],
+                    "amount": amount,
+                    "departmentId": department_id,
+                }
+
+    def total_paid(self) -> int:
+        return sum(int(events["amount"].sum()) for events in self.salary_paid)
+
+    def write_back(self, payroll: ArcTreasuryPayroll):
+        """Copy balances into the contract's token and append the SalaryPaid events to its log"""
+        for address, balance in zip(self.wallets, self.balances.tolist()):
+            if balance or address in payroll.usdc.balances:
+                payroll.usdc.balances[address] = balance
+        payroll.events.extend(self.iter_salary_events())
@@ -1,21 +1,52 @@
 """
 API Client for connecting frontend to backend API
 """
+import json
 import requests
 import os
-from typing import Optional, Dict, List
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Iterator, List
 from dotenv import load_dotenv
 
 # Load .env file if it exists
 load_dotenv()
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+# Keep-alive connections per backend host; must cover the parallel page fan-out
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+# Cached list responses kept for If-None-Match revalidation
+ETAG_CACHE_MAX_ENTRIES = 256
+
+
+def create_session(pool_size: int = API_POOL_SIZE) -> requests.Session:
+    """
+    Keep-alive session with a connection pool.
+    Connections (and their TLS handshakes, e.g. through ngrok) are reused across
+    requests and threads instead of being opened per call.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class APIClient:
-    def __init__(self, base_url: str = API_BASE_URL):
+    def __init__(self, base_url: str = API_BASE_URL, token: Optional[str] = None,
+                 session: Optional[requests.Session] = None, etags: Optional[Dict] = None):
         self.base_url = base_url
-        self.token: Optional[str] = None
+        self.token: Optional[str] = token
+        self.session = session or create_session()
+        # (token, path, params) -> (ETag, body) of list responses, shared with with_token() clients
+        self.etags = etags if etags is not None else {}
+    
+    def with_token(self, token: Optional[str]) -> "APIClient":
+        """
+        Per-request client: its own auth token, the shared connection pool.
+        Use this instead of set_token() on a shared client, so concurrent
+        requests never see each other's tokens.
+        """
+        return APIClient(self.base_url, token=token, session=self.session, etags=self.etags)
     
     def set_token(self, token: str):
         """Set JWT token for authenticated requests"""
@@ -28,10 +59,46 @@ class APIClient:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
     
+    def _get_conditional(self, path: str, params: Optional[Dict] = None):
+        """
+        GET a list endpoint, revalidating the last copy with If-None-Match.
+        A 304 answers from the cached body without the backend re-serializing the list.
+        """
+        key = (self.token, path, tuple(sorted((params or {}).items())))
+        headers = self._get_headers()
+        cached = self.etags.get(key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = self.session.get(f"{self.base_url}{path}", params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return json.loads(cached[1])
+        response.raise_for_status()
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etags[key] = (etag, response.text)
+            for stale in list(self.etags)[:len(self.etags) - ETAG_CACHE_MAX_ENTRIES]:
+                self.etags.pop(stale, None)
+        return response.json()
+    
+    def iter_pages(self, path: str, params: Optional[Dict] = None, page_size: int = 500) -> Iterator[Dict]:
+        """
+        Yield every item of a keyset-paginated list endpoint, following X-Next-Cursor.
+        Pages are fetched unconditionally: the cursor is a response header, not part of the cached body.
+        """
+        params = dict(params or {}, limit=page_size)
+        while True:
+            response = self.session.get(f"{self.base_url}{path}", params=params, headers=self._get_headers())
+            response.raise_for_status()
+            yield from response.json()
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
+    
     # Auth methods
     def register(self, email: str, password: str, company_name: str) -> Dict:
         """Register new user"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/auth/register",
             json={"email": email, "password": password, "company_name": company_name}
         )
@@ -43,7 +110,7 @@ class APIClient:
     
     def login(self, email: str, password: str) -> Dict:
         """Login user"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/auth/login",
             json={"email": email, "password": password}
         )
@@ -56,7 +123,7 @@ class APIClient:
     # Company methods
     def get_company(self) -> Dict:
         """Get company info"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/company/",
             headers=self._get_headers()
         )
@@ -65,7 +132,7 @@ class APIClient:
     
     def set_master_wallet(self, wallet_address: str, payroll_date: Optional[str] = None, payroll_time: Optional[str] = None) -> Dict:
         """Set master wallet address with optional payroll date and time"""
-        response = requests.put(
+        response = self.session.put(
             f"{self.base_url}/company/master-wallet",
             json={
                 "master_wallet_address": wallet_address,
@@ -80,16 +147,11 @@ class APIClient:
     # Department methods
     def get_departments(self) -> List[Dict]:
         """Get all departments"""
-        response = requests.get(
-            f"{self.base_url}/departments/",
-            headers=self._get_headers()
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_conditional("/departments/")
     
     def create_department(self, name: str) -> Dict:
         """Create department"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/departments/",
             json={"name": name},
             headers=self._get_headers()
@@ -103,17 +165,11 @@ class APIClient:
         params = {}
         if department_id:
             params["department_id"] = department_id
-        response = requests.get(
-            f"{self.base_url}/workers/",
-            params=params,
-            headers=self._get_headers()
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_conditional("/workers/", params)
     
     def create_worker(self, name: str, surname: str, salary: float, wallet: str, department_id: int) -> Dict:
         """Create worker"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/workers/",
             json={
                 "name": name,
@@ -127,23 +183,54 @@ class APIClient:
         response.raise_for_status()
         return response.json()
     
+    def import_workers(self, source, format: str = "csv", chunk_size: int = 64 * 1024) -> Dict:
+        """
+        Bulk-import workers in one streamed request.
+
+        Args:
+            source: Path to a CSV/NDJSON file, raw bytes, an open binary file, or a
+                list of worker dicts (sent as NDJSON)
+            format: "csv" or "ndjson" for file/bytes sources
+
+        Returns:
+            Import report: {"received", "imported", "failed", "errors": [{"row", "field", "error"}]}
+        """
+        if isinstance(source, (list, tuple)):
+            format = "ndjson"
+            body = (json.dumps(worker, default=str).encode() + b"\n" for worker in source)
+        elif isinstance(source, (bytes, bytearray)):
+            body = bytes(source)
+        elif isinstance(source, (str, os.PathLike)):
+            def read_file():
+                with open(source, "rb") as f:
+                    while chunk := f.read(chunk_size):
+                        yield chunk
+            body = read_file()
+        else:
+            body = source  # file-like object, streamed by requests
+
+        headers = self._get_headers()
+        headers["Content-Type"] = "text/csv" if format == "csv" else "application/x-ndjson"
+        response = self.session.post(
+            f"{self.base_url}/workers/import",
+            params={"format": format},
+            data=body,
+            headers=headers
+        )
+        response.raise_for_status()
+        return response.json()
+    
     # Spending methods
     def get_spendings(self, department_id: Optional[int] = None) -> List[Dict]:
         """Get all spendings"""
         params = {}
         if department_id:
             params["department_id"] = department_id
-        response = requests.get(
-            f"{self.base_url}/spendings/",
-            params=params,
-            headers=self._get_headers()
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_conditional("/spendings/", params)
     
     def create_spending(self, name: str, amount: float, wallet: str, department_id: Optional[int] = None) -> Dict:
         """Create spending"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/spendings/",
             json={
                 "name": name,
@@ -158,7 +245,7 @@ class APIClient:
     
     def update_spending_date(self, spending_id: int, date: str) -> Dict:
         """Update spending date (created_at)"""
-        response = requests.patch(
+        response = self.session.patch(
             f"{self.base_url}/spendings/{spending_id}/date",
             json={"date": date},
             headers=self._get_headers()
@@ -169,16 +256,11 @@ class APIClient:
     # Revenue methods
     def get_revenues(self) -> List[Dict]:
         """Get all revenues"""
-        response = requests.get(
-            f"{self.base_url}/revenue/",
-            headers=self._get_headers()
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_conditional("/revenue/")
     
     def create_revenue(self, amount: float, month: int, year: int) -> Dict:
         """Create revenue"""
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/revenue/",
             json={"amount": amount, "month": month, "year": year},
             headers=self._get_headers()
@@ -189,17 +271,32 @@ class APIClient:
     # Dashboard methods
     def get_dashboard_stats(self) -> Dict:
         """Get dashboard statistics"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.base_url}/dashboard/stats",
             headers=self._get_headers()
         )
         response.raise_for_status()
         return response.json()
     
+    # Page bundles
+    def get_page_bundle(self, page: str, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Get everything a page needs in one request ("dashboard" or "constructor").
+        `fields` narrows the sections, e.g. ["stats", "workers"].
+        """
+        params = {"fields": ",".join(fields)} if fields else {}
+        response = self.session.get(
+            f"{self.base_url}/bundle/{page}",
+            params=params,
+            headers=self._get_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    
     # Payroll methods
-    def execute_payroll(self, period_start: str, period_end: str) -> List[Dict]:
-        """Execute payroll"""
-        response = requests.post(
+    def execute_payroll(self, period_start: str, period_end: str) -> Dict:
+        """Start payroll; returns the queued run (poll get_payroll_run(run["run_id"]))"""
+        response = self.session.post(
             f"{self.base_url}/payroll/execute",
             json={"period_start": period_start, "period_end": period_end},
             headers=self._get_headers()
@@ -207,10 +304,48 @@ class APIClient:
         response.raise_for_status()
         return response.json()
     
+    def preflight_payroll(self, period_start: str, period_end: str) -> Dict:
+        """Dry-run payroll: totals, errors, warnings and the diff against the previous period; sends nothing"""
+        response = self.session.post(
+            f"{self.base_url}/payroll/preflight",
+            json={"period_start": period_start, "period_end": period_end},
+            headers=self._get_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def get_payroll_run(self, run_id: str) -> Dict:
+        """Get payroll run progress"""
+        response = self.session.get(
+            f"{self.base_url}/payroll/runs/{run_id}",
+            headers=self._get_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    
     def get_payroll_transactions(self) -> List[Dict]:
         """Get all payroll transactions"""
-        response = requests.get(
-            f"{self.base_url}/payroll/transactions",
+        return self._get_conditional("/payroll/transactions")
+    
+    def iter_payroll_transactions(self, status: Optional[str] = None, worker_id: Optional[int] = None,
+                                  period_start: Optional[str] = None, period_end: Optional[str] = None,
+                                  page_size: int = 500) -> Iterator[Dict]:
+        """Payroll transactions newest first, filtered server-side, fetched page by page"""
+        params = {"status": status, "worker_id": worker_id, "period_start": period_start, "period_end": period_end}
+        return self.iter_pages(
+            "/payroll/transactions", {k: v for k, v in params.items() if v is not None}, page_size
+        )
+    
+    # Forecast methods
+    def forecast_cash_flow(self, months: int = 12, scenarios: int = 10000,
+                           starting_balance: Optional[float] = None, **options) -> Dict:
+        """Monte Carlo cash-flow forecast; options: revenue_volatility, spending_volatility, attrition_rate, seed"""
+        payload = {"months": months, "scenarios": scenarios, **options}
+        if starting_balance is not None:
+            payload["starting_balance"] = starting_balance
+        response = self.session.post(
+            f"{self.base_url}/forecast/",
+            json=payload,
             headers=self._get_headers()
         )
         response.raise_for_status()
@@ -219,7 +354,7 @@ class APIClient:
     def get_circle_transactions(self) -> List[Dict]:
         """Get Circle API transactions"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/dashboard/transactions",
                 headers=self._get_headers()
             )
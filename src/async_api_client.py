@@ -0,0 +1,238 @@
+"""
+Async API client for the frontend server
+
+One long-lived httpx.AsyncClient (keep-alive pool) shared by every request.
+GET requests are coalesced - concurrent page loads asking for the same backend
+resource with the same token share one in-flight request - and answered from a
+small per-user TTL cache. Mutations through the client invalidate that user's
+cache, so the page rendered after a redirect always sees the change.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "16"))
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+# Seconds a GET response is reused for the same user (matches the backend stats cache)
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "5"))
+API_CACHE_MAX_ENTRIES = 512
+
+
+class _SharedState:
+    """Connection pool, in-flight requests and response cache shared by all per-token clients"""
+
+    def __init__(self, base_url: str, cache_ttl: float):
+        self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        self.http: Optional[httpx.AsyncClient] = None
+        # Separate unbounded pool for long-lived event streams, so open streams can
+        # never starve page requests of connections
+        self.stream_http: Optional[httpx.AsyncClient] = None
+        # (token, generation, path, params) -> task resolving to the response body text
+        self.inflight: Dict[Tuple, asyncio.Task] = {}
+        # same key -> (body text, stored_at)
+        self.cache: Dict[Tuple, Tuple[str, float]] = {}
+        # token -> generation; bumped on every mutation so older cache entries and
+        # in-flight reads are never reused after a write
+        self.generations: Dict[Optional[str], int] = {}
+
+    def get_http(self) -> httpx.AsyncClient:
+        if self.http is None or self.http.is_closed:
+            self.http = httpx.AsyncClient(
+                timeout=API_TIMEOUT,
+                limits=httpx.Limits(max_connections=API_POOL_SIZE,
+                                    max_keepalive_connections=API_POOL_SIZE),
+            )
+        return self.http
+
+    def get_stream_http(self) -> httpx.AsyncClient:
+        if self.stream_http is None or self.stream_http.is_closed:
+            self.stream_http = httpx.AsyncClient(
+                timeout=httpx.Timeout(API_TIMEOUT, read=None),
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=0),
+            )
+        return self.stream_http
+
+    def prune(self):
+        now = time.monotonic()
+        expired = [k for k, (_, stored_at) in self.cache.items() if now - stored_at >= self.cache_ttl]
+        for key in expired:
+            del self.cache[key]
+        while len(self.cache) > API_CACHE_MAX_ENTRIES:
+            del self.cache[min(self.cache, key=lambda k: self.cache[k][1])]
+
+
+class AsyncAPIClient:
+    def __init__(self, base_url: str = API_BASE_URL, token: Optional[str] = None,
+                 shared: Optional[_SharedState] = None, cache_ttl: float = API_CACHE_TTL):
+        self.base_url = base_url
+        self.token = token
+        self._shared = shared or _SharedState(base_url, cache_ttl)
+
+    def with_token(self, token: Optional[str]) -> "AsyncAPIClient":
+        """Per-request client: own token, shared pool / coalescing / cache"""
+        return AsyncAPIClient(self.base_url, token=token, shared=self._shared)
+
+    async def aclose(self):
+        for http in (self._shared.http, self._shared.stream_http):
+            if http is not None:
+                await http.aclose()
+
+    def _get_headers(self) -> Dict:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def invalidate(self):
+        """Drop this user's cached responses (called after every mutation)"""
+        shared = self._shared
+        shared.generations[self.token] = shared.generations.get(self.token, 0) + 1
+        for key in [k for k in shared.cache if k[0] == self.token]:
+            del shared.cache[key]
+
+    # ---------- Transport ----------
+
+    async def _fetch_text(self, url: str, params: Optional[dict]) -> str:
+        response = await self._shared.get_http().get(url, params=params, headers=self._get_headers())
+        response.raise_for_status()
+        return response.text
+
+    async def _get(self, path: str, params: Optional[dict] = None, url: Optional[str] = None):
+        """Coalesced, cached GET. Each caller gets its own parsed copy of the body."""
+        shared = self._shared
+        generation = shared.generations.get(self.token, 0)
+        key = (self.token, generation, path, tuple(sorted((params or {}).items())))
+
+        cached = shared.cache.get(key)
+        if cached and time.monotonic() - cached[1] < shared.cache_ttl:
+            return json.loads(cached[0])
+
+        task = shared.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_text(url or f"{self.base_url}{path}", params))
+            shared.inflight[key] = task
+            task.add_done_callback(lambda _, k=key: shared.inflight.pop(k, None))
+
+        # shield: one cancelled page load must not cancel the request for the others
+        text = await asyncio.shield(task)
+        if shared.generations.get(self.token, 0) == generation:
+            shared.cache[key] = (text, time.monotonic())
+            shared.prune()
+        return json.loads(text)
+
+    async def _send(self, method: str, path: str, **kwargs):
+        """Uncached request; a successful mutation invalidates this user's cache"""
+        response = await self._shared.get_http().request(
+            method, f"{self.base_url}{path}", headers=self._get_headers(), **kwargs
+        )
+        response.raise_for_status()
+        if method != "GET":
+            self.invalidate()
+        return response.json() if response.content else None
+
+    # ---------- Health ----------
+
+    async def is_available(self) -> bool:
+        """Backend health check (coalesced and cached like any GET)"""
+        try:
+            await asyncio.wait_for(
+                self.with_token(None)._get("/health", url=f"{self.base_url.replace('/api', '')}/health"),
+                timeout=2,
+            )
+            return True
+        except Exception:
+            return False
+
+    # ---------- Events ----------
+
+    async def open_event_stream(self, last_event_id: Optional[str] = None) -> httpx.Response:
+        """
+        Open this user's backend event stream (text/event-stream). Raises on 4xx/5xx;
+        the caller iterates response.aiter_raw() and must aclose() the response.
+        """
+        headers = self._get_headers()
+        if last_event_id:
+            headers["Last-Event-ID"] = last_event_id
+        http = self._shared.get_stream_http()
+        response = await http.send(http.build_request("GET", f"{self.base_url}/events/stream", headers=headers),
+                                   stream=True)
+        if response.is_error:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+    # ---------- Auth ----------
+
+    async def register(self, email: str, password: str, company_name: str) -> Dict:
+        data = await self._send("POST", "/auth/register",
+                                json={"email": email, "password": password, "company_name": company_name})
+        if "access_token" in data:
+            self.token = data["access_token"]
+        return data
+
+    async def login(self, email: str, password: str) -> Dict:
+        data = await self._send("POST", "/auth/login", json={"email": email, "password": password})
+        if "access_token" in data:
+            self.token = data["access_token"]
+        return data
+
+    # ---------- Reads ----------
+
+    async def get_page_bundle(self, page: str, fields: Optional[List[str]] = None) -> Dict:
+        """Everything a page needs in one request ("dashboard" or "constructor")"""
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self._get(f"/bundle/{page}", params)
+
+    async def get_company(self) -> Dict:
+        return await self._get("/company/")
+
+    async def get_dashboard_stats(self) -> Dict:
+        return await self._get("/dashboard/stats")
+
+    # ---------- Mutations ----------
+
+    async def update_company_settings(self, payload: Dict) -> Dict:
+        """Master wallet, Circle wallet id and payroll schedule"""
+        return await self._send("PUT", "/company/master-wallet", json=payload)
+
+    async def create_department(self, name: str) -> Dict:
+        return await self._send("POST", "/departments/", json={"name": name})
+
+    async def delete_department(self, department_id: int) -> Dict:
+        return await self._send("DELETE", f"/departments/{department_id}")
+
+    async def create_worker(self, name: str, surname: str, salary: float, wallet: str, department_id: int) -> Dict:
+        return await self._send("POST", "/workers/", json={
+            "name": name,
+            "surname": surname,
+            "salary": salary,
+            "wallet_address": wallet,
+            "department_id": department_id
+        })
+
+    async def delete_worker(self, worker_id: int) -> Dict:
+        return await self._send("DELETE", f"/workers/{worker_id}")
+
+    async def create_spending(self, name: str, amount: float, wallet: str,
+                              department_id: Optional[int] = None) -> Dict:
+        return await self._send("POST", "/spendings/", json={
+            "name": name,
+            "amount": amount,
+            "wallet_address": wallet,
+            "department_id": department_id
+        })
+
+    async def update_spending_date(self, spending_id: int, date: str) -> Dict:
+        return await self._send("PATCH", f"/spendings/{spending_id}/date", json={"date": date})
+
+    async def create_revenue(self, amount: float, month: int, year: int) -> Dict:
+        return await self._send("POST", "/revenue/", json={"amount": amount, "month": month, "year": year})
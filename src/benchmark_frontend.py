@@ -0,0 +1,90 @@
+"""
+Concurrent page-load benchmark: coalesced + cached AsyncAPIClient vs uncached
+
+Fires --concurrency simultaneous renders of each page for one user through the
+frontend app in-process (ASGI transport, no frontend server needed), against a
+running backend, and counts how many requests actually reach the backend.
+
+Usage (from src/, backend running):
+    python benchmark_frontend.py --email bench@example.com --password benchpass123
+    API_BASE_URL=https://<ngrok-host>/api python benchmark_frontend.py --rounds 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+import frontend
+from async_api_client import AsyncAPIClient
+
+
+async def get_token(client: AsyncAPIClient, email: str, password: str) -> str:
+    try:
+        return (await client.login(email, password))["access_token"]
+    except httpx.HTTPStatusError:
+        return (await client.register(email, password, "Benchmark Co"))["access_token"]
+
+
+async def measure(pages: httpx.AsyncClient, path: str, concurrency: int, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(pages.get(path) for _ in range(concurrency)))
+        samples.append((time.perf_counter() - start) * 1000)
+        for response in responses:
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+async def run(args):
+    modes = {
+        "uncached": AsyncAPIClient(cache_ttl=0),
+        "coalesced + cached": AsyncAPIClient(),
+    }
+    print(f"[BENCH] Backend: {frontend.api_client.base_url}")
+
+    for label, client in modes.items():
+        backend_calls = 0
+
+        async def count(request):
+            nonlocal backend_calls
+            backend_calls += 1
+
+        client._shared.get_http().event_hooks["request"].append(count)
+        frontend.api_client = client
+        if not await frontend.check_backend_available():
+            raise SystemExit("[BENCH] Backend is not reachable - start it first")
+        token = await get_token(client.with_token(None), args.email, args.password)
+
+        transport = httpx.ASGITransport(app=frontend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://frontend",
+                                     cookies={"access_token": token}) as pages:
+            for path in args.pages:
+                await measure(pages, path, args.concurrency, 1)  # warm-up
+                backend_calls = 0
+                result = await measure(pages, path, args.concurrency, args.rounds)
+                print(f"  {path:<12} {label:<20} p50={result['p50_ms']:7.1f}ms  "
+                      f"p95={result['p95_ms']:7.1f}ms  backend requests={backend_calls}")
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent frontend page loads")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="benchpass123")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--pages", nargs="+", default=["/dashboard"])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
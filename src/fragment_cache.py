@@ -0,0 +1,70 @@
+"""
+Rendered-HTML cache for page fragments
+
+A fragment is a partial template rendered from a few bundle sections. Its cache
+key is the fragment name plus the backend's version (content hash) of every
+section it depends on, so an entry is valid exactly as long as that data is
+unchanged - there is no TTL. Rendering is a pure function of the data, which
+makes entries safe to share between users with identical data.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from markupsafe import Markup
+
+FRAGMENT_CACHE_MAX_ENTRIES = 2048
+
+
+class FragmentSpec:
+    def __init__(self, name: str, template: str, sections: Tuple[str, ...], context: Callable):
+        self.name = name
+        self.template = template
+        # Bundle sections whose versions key this fragment
+        self.sections = sections
+        # view -> template context; only called on a cache miss
+        self.context = context
+
+
+class FragmentCache:
+    def __init__(self, templates, max_entries: int = FRAGMENT_CACHE_MAX_ENTRIES):
+        self.templates = templates
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Markup]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def version_key(spec: FragmentSpec, versions: Optional[Dict[str, str]], extra: str = "") -> Optional[str]:
+        """Combined version of a fragment's sections; None (uncacheable) if any is unknown"""
+        if not versions:
+            return None
+        parts = []
+        for section in spec.sections:
+            version = versions.get(section)
+            if version is None:
+                return None
+            parts.append(version)
+        if extra:
+            parts.append(extra)
+        return "|".join(parts)
+
+    def render(self, spec: FragmentSpec, view, versions: Optional[Dict[str, str]] = None,
+               extra: str = "") -> Markup:
+        version = self.version_key(spec, versions, extra)
+        key = (spec.name, version)
+        if version is not None and key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        html = Markup(self.templates.get_template(spec.template).render(**spec.context(view)))
+        if version is not None:
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def render_all(self, specs: Iterable[FragmentSpec], view, versions: Optional[Dict[str, str]] = None,
+                   extra: str = "") -> Dict[str, Markup]:
+        return {spec.name: self.render(spec, view, versions, extra) for spec in specs}
@@ -3,15 +3,27 @@ ARC budget Frontend with FastAPI
 Integrated with Backend API for persistent data storage
 """
 from fastapi import FastAPI, Request, Form, HTTPException, Cookie
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from api_client import APIClient
+from contextlib import asynccontextmanager
+from async_api_client import AsyncAPIClient
+from fragment_cache import FragmentCache, FragmentSpec
+from datetime import datetime
+from functools import cached_property
+from types import SimpleNamespace
 import os
 import json
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await api_client.aclose()
+
+
 # Create application
-app = FastAPI(title="ARC budget Frontend")
+app = FastAPI(title="ARC budget Frontend", lifespan=lifespan)
 
 # Setup for static files (CSS, JS, images)
 static_dir = os.path.join(os.path.dirname(__file__), "static")
@@ -27,9 +39,13 @@ if os.path.exists(static_dir):
 
 # Setup templates
 templates = Jinja2Templates(directory=templates_dir)
+# Rendered dashboard fragments keyed by the backend's per-section versions
+fragment_cache = FragmentCache(templates)
 
-# API Client
-api_client = APIClient()
+# API Client: one long-lived async connection pool, no token. Routes use
+# api_client.with_token(token) for a per-request client; identical concurrent GETs
+# are coalesced and briefly cached per user, mutations invalidate that user's cache.
+api_client = AsyncAPIClient()
 
 # Fallback in-memory storage (if backend is not available)
 fallback_data = {
@@ -52,20 +68,9 @@ def get_token_from_request(request: Request) -> str | None:
     return request.cookies.get("access_token")
 
 
-def set_api_token(token: str):
-    """Set token for API client"""
-    api_client.set_token(token)
-
-
-def check_backend_available() -> bool:
+async def check_backend_available() -> bool:
     """Check if backend is available"""
-    try:
-        import requests
-        base_url = api_client.base_url.replace('/api', '')
-        resp = requests.get(f"{base_url}/health", timeout=2)
-        return resp.status_code == 200
-    except:
-        return False
+    return await api_client.is_available()
 
 
 # Root page - redirect to login
@@ -91,11 +96,11 @@ async def login(request: Request, email: str = Form(...), password: str = Form(.
         )
     
     # Try backend API first
-    use_backend = check_backend_available()
+    use_backend = await check_backend_available()
     
     if use_backend:
         try:
-            result = api_client.login(email, password)
+            result = await api_client.with_token(None).login(email, password)
             token = result.get("access_token")
             if token:
                 response = RedirectResponse(url="/constructor", status_code=303)
@@ -161,11 +166,11 @@ async def signup(
         )
     
     # Try backend API first
-    use_backend = check_backend_available()
+    use_backend = await check_backend_available()
     
     if use_backend:
         try:
-            result = api_client.register(email, password, company_name)
+            result = await api_client.with_token(None).register(email, password, company_name)
             token = result.get("access_token")
             if token:
                 response = RedirectResponse(url="/login?registered=true", status_code=303)
@@ -203,39 +208,22 @@ async def signup(
 @app.get("/constructor", response_class=HTMLResponse)
 async def constructor_page(request: Request):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     try:
         if use_backend:
-            set_api_token(token)
+            client = api_client.with_token(token)
             # Initialize payroll_transactions
             payroll_transactions = []
-            # Get data from API - optimized with parallel requests
+            # Get data from API - one bundle request (one auth + one tenant lookup on the backend)
             try:
-                import concurrent.futures
-                
-                # Use ThreadPoolExecutor for parallel requests
-                with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-                    future_company = executor.submit(api_client.get_company)
-                    future_departments = executor.submit(api_client.get_departments)
-                    future_workers = executor.submit(api_client.get_workers)
-                    future_spendings = executor.submit(api_client.get_spendings)
-                    future_revenues = executor.submit(api_client.get_revenues)
-                    
-                    def get_payroll_safe():
-                        try:
-                            return api_client.get_payroll_transactions()
-                        except:
-                            return []
-                    future_payroll = executor.submit(get_payroll_safe)
-                    
-                    # Wait for all requests to complete
-                    company = future_company.result()
-                    departments = future_departments.result()
-                    workers = future_workers.result()
-                    spendings = future_spendings.result()
-                    revenues = future_revenues.result()
-                    payroll_transactions = future_payroll.result()
+                bundle = await client.get_page_bundle("constructor")
+                company = bundle.get("company")
+                departments = bundle.get("departments", [])
+                workers = bundle.get("workers", [])
+                spendings = bundle.get("spendings", [])
+                revenues = bundle.get("revenues", [])
+                payroll_transactions = bundle.get("payroll_transactions", [])
                 
                 # Transform API data to template format
                 import random
@@ -369,7 +357,7 @@ async def save_ceo(request: Request,
                    payroll_date: str = Form(None),
                    payroll_time: str = Form(None)):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     # Validate master_wallet if provided
     if master_wallet and master_wallet.strip():
@@ -400,9 +388,8 @@ async def save_ceo(request: Request,
     
     if use_backend:
         try:
-            set_api_token(token)
+            client = api_client.with_token(token)
             # Update master wallet with payroll date and time
-            import requests
             # Build request payload
             payload = {
                 "payroll_date": payroll_date_obj.isoformat() if payroll_date_obj else None,
@@ -415,12 +402,7 @@ async def save_ceo(request: Request,
             if circle_wallet_id and circle_wallet_id.strip():
                 payload["circle_wallet_id"] = circle_wallet_id.strip()
             
-            response = requests.put(
-                f"{api_client.base_url}/company/master-wallet",
-                json=payload,
-                headers=api_client._get_headers()
-            )
-            response.raise_for_status()
+            await client.update_company_settings(payload)
         except Exception as e:
             print(f"Error saving CEO settings: {e}")
             import traceback
@@ -443,15 +425,15 @@ async def save_ceo(request: Request,
 @app.post("/constructor/department")
 async def create_department(request: Request, name: str = Form(...)):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     if not name.strip():
         return RedirectResponse(url="/constructor?error=Department name required", status_code=303)
     
     if use_backend:
         try:
-            set_api_token(token)
-            api_client.create_department(name.strip())
+            client = api_client.with_token(token)
+            await client.create_department(name.strip())
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to create department", status_code=303)
     else:
@@ -478,7 +460,7 @@ async def create_worker(
     department_id: str = Form(...)
 ):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     try:
         salary_float = float(salary)
@@ -491,8 +473,8 @@ async def create_worker(
     
     if use_backend:
         try:
-            set_api_token(token)
-            api_client.create_worker(name.strip(), surname.strip(), salary_float, wallet.strip(), dept_id)
+            client = api_client.with_token(token)
+            await client.create_worker(name.strip(), surname.strip(), salary_float, wallet.strip(), dept_id)
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to create worker", status_code=303)
     else:
@@ -517,22 +499,12 @@ async def create_worker(
 @app.post("/constructor/department/{dept_id}/delete")
 async def delete_department(request: Request, dept_id: int):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     if use_backend:
         try:
-            set_api_token(token)
-            # Try to delete via API if method exists
-            try:
-                api_client.delete_department(dept_id)
-            except AttributeError:
-                # If method doesn't exist, try direct API call
-                import requests
-                response = requests.delete(
-                    f"{api_client.base_url}/departments/{dept_id}",
-                    headers=api_client._get_headers()
-                )
-                response.raise_for_status()
+            client = api_client.with_token(token)
+            await client.delete_department(dept_id)
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to delete department", status_code=303)
     else:
@@ -555,22 +527,12 @@ async def delete_department(request: Request, dept_id: int):
 @app.post("/constructor/worker/{worker_id}/delete")
 async def delete_worker(request: Request, worker_id: int):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     if use_backend:
         try:
-            set_api_token(token)
-            # Try to delete via API if method exists
-            try:
-                api_client.delete_worker(worker_id)
-            except AttributeError:
-                # If method doesn't exist, try direct API call
-                import requests
-                response = requests.delete(
-                    f"{api_client.base_url}/workers/{worker_id}",
-                    headers=api_client._get_headers()
-                )
-                response.raise_for_status()
+            client = api_client.with_token(token)
+            await client.delete_worker(worker_id)
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to delete worker", status_code=303)
     else:
@@ -591,7 +553,7 @@ async def create_spending(
     target_type: str = Form(...)
 ):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     try:
         amount_float = float(amount)
@@ -603,11 +565,11 @@ async def create_spending(
     
     if use_backend:
         try:
-            set_api_token(token)
+            client = api_client.with_token(token)
             dept_id = None
             if target_type.startswith("dept_"):
                 dept_id = int(target_type.split("_")[1])
-            api_client.create_spending(name.strip(), amount_float, wallet.strip(), dept_id)
+            await client.create_spending(name.strip(), amount_float, wallet.strip(), dept_id)
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to create spending", status_code=303)
     else:
@@ -630,7 +592,7 @@ async def create_spending(
 async def update_expense_date(request: Request):
     """Update expense date (for spending or payroll)"""
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     if not use_backend:
         return JSONResponse({"success": False, "message": "Backend not available"})
@@ -644,12 +606,12 @@ async def update_expense_date(request: Request):
         if not expense_id or not expense_type or not date:
             return JSONResponse({"success": False, "message": "Missing required fields"}, status_code=400)
         
-        set_api_token(token)
+        client = api_client.with_token(token)
         
         if expense_type == "spending":
             # Update spending date via API
             try:
-                api_client.update_spending_date(expense_id, date)
+                await client.update_spending_date(expense_id, date)
                 return JSONResponse({"success": True, "message": "Date updated"})
             except Exception as e:
                 return JSONResponse({"success": False, "message": str(e)}, status_code=500)
@@ -667,7 +629,7 @@ async def update_expense_date(request: Request):
 @app.post("/constructor/revenue")
 async def add_revenue(request: Request, month: str = Form(...), amount: str = Form(...)):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     try:
         amount_float = float(amount)
@@ -687,8 +649,8 @@ async def add_revenue(request: Request, month: str = Form(...), amount: str = Fo
     
     if use_backend:
         try:
-            set_api_token(token)
-            api_client.create_revenue(amount_float, month_num, year)
+            client = api_client.with_token(token)
+            await client.create_revenue(amount_float, month_num, year)
         except Exception as e:
             return RedirectResponse(url="/constructor?error=Failed to add revenue", status_code=303)
     else:
@@ -701,259 +663,205 @@ async def add_revenue(request: Request, month: str = Form(...), amount: str = Fo
     return RedirectResponse(url="/constructor", status_code=303)
 
 
+class DashboardView:
+    """Dashboard template data derived from a page bundle, each piece computed on first use"""
+
+    def __init__(self, bundle: dict):
+        self.stats = bundle.get("stats") or {}
+        self.company = bundle.get("company") or {}
+        self.departments = [d for d in bundle.get("departments") or [] if d and isinstance(d, dict)]
+        self.workers = [w for w in bundle.get("workers") or [] if w and isinstance(w, dict)]
+        self.spendings = [s for s in bundle.get("spendings") or [] if s and isinstance(s, dict)]
+        self.payroll_transactions = [t for t in bundle.get("payroll_transactions") or [] if t and isinstance(t, dict)]
+        self.circle_transactions = [tx for tx in bundle.get("circle_transactions") or [] if tx and isinstance(tx, dict)]
+
+    @property
+    def stat_values(self) -> dict:
+        stats = self.stats
+        return {
+            "total_workers": stats.get("total_workers", 0),
+            "total_departments": stats.get("total_departments", 0),
+            "total_revenue": stats.get("total_revenue", 0),
+            "total_expenses": stats.get("total_expenses", 0),
+            "profit": stats.get("profit", 0),
+            "wallet_balance": stats.get("wallet_balance"),
+        }
+
+    @cached_property
+    def ceo_data(self):
+        if self.company.get("master_wallet_address"):
+            return {"master_wallet": self.company.get("master_wallet_address", "")}
+        return None
+
+    @cached_property
+    def active_workers(self) -> list:
+        return [w for w in self.workers if w.get("is_active", True)]
+
+    @cached_property
+    def dept_names(self) -> dict:
+        return {d["id"]: d.get("name", "Unknown") for d in self.departments if d.get("id")}
+
+    @cached_property
+    def dept_stats(self) -> list:
+        # Lookup dictionaries for O(1) access instead of O(n) loops
+        workers_by_dept = {}
+        for worker in self.active_workers:
+            workers_by_dept.setdefault(worker.get("department_id"), []).append(worker)
+        spendings_by_dept = {}
+        for spending in self.spendings:
+            spendings_by_dept.setdefault(spending.get("department_id"), []).append(spending)
+
+        dept_stats = []
+        for dept in self.departments:
+            dept_workers = workers_by_dept.get(dept.get("id"), [])
+            dept_payroll = sum(w.get("salary", 0) for w in dept_workers)
+            dept_spendings_amount = sum(s.get("amount", 0) for s in spendings_by_dept.get(dept.get("id"), []))
+            dept_stats.append({
+                "name": dept.get("name", ""),
+                "worker_count": len(dept_workers),
+                "payroll": dept_payroll,
+                "spendings": dept_spendings_amount,
+                "total": dept_payroll + dept_spendings_amount,
+                "workers": dept_workers
+            })
+        return dept_stats
+
+    @cached_property
+    def expenses_list(self) -> list:
+        today = datetime.now().date().isoformat()
+
+        # Most recent payroll transaction date per worker
+        worker_payroll_dates = {}
+        for transaction in self.payroll_transactions:
+            worker_id = transaction.get("worker_id")
+            transaction_date = transaction.get("created_at") or transaction.get("period_end")
+            if worker_id and transaction_date:
+                if isinstance(transaction_date, str):
+                    transaction_date = transaction_date.split("T")[0]
+                if worker_id not in worker_payroll_dates or transaction_date > worker_payroll_dates[worker_id]:
+                    worker_payroll_dates[worker_id] = transaction_date
+
+        expenses_list = []
+        for worker in self.active_workers:
+            dept_name = self.dept_names.get(worker.get("department_id"), "Unknown")
+            worker_id = worker.get("id")
+            # Payroll date from transactions, else worker creation date, else today
+            payroll_date = worker_payroll_dates.get(worker_id)
+            if payroll_date is None:
+                created_at = worker.get("created_at")
+                payroll_date = created_at.split("T")[0] if isinstance(created_at, str) else today
+
+            expenses_list.append({
+                "type": "Payroll",
+                "name": f"{worker.get('name', '')} {worker.get('surname', '')} ({dept_name})",
+                "amount": worker.get("salary", 0),
+                "date": payroll_date,
+                "worker_id": worker_id,
+                "expense_id": worker_id,
+                "expense_type": "payroll"
+            })
+
+        for spending in self.spendings:
+            expense_date = spending.get("created_at")
+            expense_date = expense_date.split("T")[0] if isinstance(expense_date, str) else today
+            expenses_list.append({
+                "type": "Spending",
+                "name": spending.get("name", ""),
+                "amount": spending.get("amount", 0),
+                "date": expense_date,
+                "spending_id": spending.get("id"),
+                "expense_id": spending.get("id"),
+                "expense_type": "spending"
+            })
+        return expenses_list
+
+    @property
+    def table_expenses(self) -> list:
+        # The transaction table and chart fall back to expenses only without Circle transactions
+        return [] if self.circle_transactions else self.expenses_list
+
+
+# Sections behind the expenses list (payroll rows, spending rows, department names)
+EXPENSE_SECTIONS = ("departments", "workers", "spendings", "payroll_transactions")
+
+# dashboard.html fragments: each is re-rendered only when one of its sections changes
+DASHBOARD_FRAGMENTS = (
+    FragmentSpec("stats", "dashboard/_stats.html", ("stats", "company"),
+                 lambda view: {**view.stat_values, "ceo_data": view.ceo_data}),
+    FragmentSpec("transactions", "dashboard/_transactions.html", ("circle_transactions",) + EXPENSE_SECTIONS,
+                 lambda view: {"circle_transactions": view.circle_transactions,
+                               "expenses_list": view.table_expenses}),
+    FragmentSpec("dept_data", "dashboard/_dept_data.html", ("departments", "workers", "spendings"),
+                 lambda view: {"dept_stats": view.dept_stats}),
+    FragmentSpec("chart_expenses", "dashboard/_chart_expenses.html", ("circle_transactions",) + EXPENSE_SECTIONS,
+                 lambda view: {"circle_transactions": view.circle_transactions,
+                               "expenses_list": view.table_expenses}),
+    FragmentSpec("expenses_data", "dashboard/_expenses_data.html", EXPENSE_SECTIONS,
+                 lambda view: {"expenses_list": view.expenses_list}),
+)
+
+EMPTY_DASHBOARD = DashboardView({})
+
+
+def render_dashboard(request: Request, view, versions: dict | None = None):
+    """Assemble dashboard.html from fragments, reusing cached HTML for unchanged sections"""
+    # Expense dates fall back to today, so cached fragments also turn over daily
+    fragments = fragment_cache.render_all(DASHBOARD_FRAGMENTS, view, versions,
+                                          extra=datetime.now().date().isoformat())
+    return templates.TemplateResponse("dashboard.html", {"request": request, "fragments": fragments})
+
+
+# Live events: relays the backend's SSE stream so the JWT stays in the httponly cookie
+@app.get("/events")
+async def events(request: Request):
+    token = get_token_from_request(request)
+    if not token:
+        return Response(status_code=204)
+    client = api_client.with_token(token)
+    try:
+        upstream = await client.open_event_stream(request.headers.get("last-event-id"))
+    except Exception as e:
+        print(f"[EVENTS] Could not open backend stream: {e}")
+        # 204 tells EventSource to stop reconnecting
+        return Response(status_code=204)
+
+    async def relay():
+        try:
+            async for chunk in upstream.aiter_raw():
+                # Data changed outside this frontend (payroll run, status update):
+                # drop the cached bundle so the next page load is fresh
+                if b"event:" in chunk:
+                    client.invalidate()
+                yield chunk
+        finally:
+            await upstream.aclose()
+
+    return StreamingResponse(relay(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # Dashboard page with statistics
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
     token = get_token_from_request(request)
-    use_backend = check_backend_available() and token
+    use_backend = await check_backend_available() and token
     
     try:
         if use_backend:
-            set_api_token(token)
-            # Get stats from API - optimized: make requests in parallel where possible
+            client = api_client.with_token(token)
+            # One bundle request; "versions" holds a content hash per section
             try:
-                import concurrent.futures
-                
-                # Use ThreadPoolExecutor for parallel requests (much faster than sequential)
-                with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-                    # Submit all requests in parallel
-                    future_stats = executor.submit(api_client.get_dashboard_stats)
-                    future_departments = executor.submit(api_client.get_departments)
-                    future_workers = executor.submit(api_client.get_workers)
-                    future_spendings = executor.submit(api_client.get_spendings)
-                    future_revenues = executor.submit(api_client.get_revenues)
-                    future_company = executor.submit(api_client.get_company)
-                    
-                    # Payroll transactions - optional, don't fail if endpoint doesn't exist
-                    def get_payroll_safe():
-                        try:
-                            return api_client.get_payroll_transactions()
-                        except:
-                            return []
-                    future_payroll = executor.submit(get_payroll_safe)
-                    
-                    # Circle transactions - optional, don't fail if endpoint doesn't exist
-                    def get_circle_transactions_safe():
-                        try:
-                            return api_client.get_circle_transactions()
-                        except:
-                            return []
-                    future_circle_transactions = executor.submit(get_circle_transactions_safe)
-                    
-                    # Wait for all requests to complete (they run in parallel)
-                    stats = future_stats.result()
-                    departments = future_departments.result()
-                    workers = future_workers.result()
-                    spendings = future_spendings.result()
-                    revenues = future_revenues.result()
-                    company = future_company.result()
-                    payroll_transactions = future_payroll.result()
-                    circle_transactions = future_circle_transactions.result()
-                
-                # Ensure all variables are safe (not None)
-                if stats is None:
-                    stats = {}
-                if departments is None:
-                    departments = []
-                if workers is None:
-                    workers = []
-                if spendings is None:
-                    spendings = []
-                if revenues is None:
-                    revenues = []
-                if company is None:
-                    company = {}
-                if payroll_transactions is None:
-                    payroll_transactions = []
-                if circle_transactions is None:
-                    circle_transactions = []
-                
-                # Transform for template - optimized with dictionaries
-                # Create lookup dictionaries for O(1) access instead of O(n) loops
-                workers_by_dept = {}
-                for worker in workers:
-                    if worker and isinstance(worker, dict) and worker.get("is_active", True):
-                        dept_id = worker.get("department_id")
-                        if dept_id not in workers_by_dept:
-                            workers_by_dept[dept_id] = []
-                        workers_by_dept[dept_id].append(worker)
-                
-                spendings_by_dept = {}
-                for spending in spendings:
-                    if spending and isinstance(spending, dict):
-                        dept_id = spending.get("department_id")
-                        if dept_id not in spendings_by_dept:
-                            spendings_by_dept[dept_id] = []
-                        spendings_by_dept[dept_id].append(spending)
-                
-                # Create department lookup for fast access
-                dept_lookup = {}
-                for dept in departments:
-                    if dept and isinstance(dept, dict):
-                        dept_id = dept.get("id")
-                        if dept_id:
-                            dept_lookup[dept_id] = dept
-                
-                dept_stats = []
-                for dept in departments:
-                    if dept and isinstance(dept, dict):
-                        dept_id = dept.get("id")
-                        dept_workers = workers_by_dept.get(dept_id, [])
-                        dept_payroll = sum(w.get("salary", 0) for w in dept_workers if w and isinstance(w, dict))
-                        dept_spendings_list = spendings_by_dept.get(dept_id, [])
-                        dept_spendings_amount = sum(s.get("amount", 0) for s in dept_spendings_list if s and isinstance(s, dict))
-                        
-                        dept_stats.append({
-                            "name": dept.get("name", ""),
-                            "worker_count": len(dept_workers),
-                            "payroll": dept_payroll,
-                            "spendings": dept_spendings_amount,
-                            "total": dept_payroll + dept_spendings_amount,
-                            "workers": dept_workers
-                        })
-                
-                # Company data already loaded above
-                ceo_data = None
-                if company and isinstance(company, dict) and company.get("master_wallet_address"):
-                    ceo_data = {
-                        "master_wallet": company.get("master_wallet_address", "")
-                    }
-                
-                revenues_list = []
-                for r in revenues:
-                    if r and isinstance(r, dict):
-                        revenues_list.append({
-                            "month": f"{r.get('year', '')}-{r.get('month', ''):02d}",
-                            "amount": r.get("amount", 0)
-                        })
-                
-                expenses_list = []
-                # Create a map of worker_id to latest payroll transaction date
-                worker_payroll_dates = {}
-                for transaction in payroll_transactions:
-                    if transaction and isinstance(transaction, dict):
-                        worker_id = transaction.get("worker_id")
-                        if worker_id:
-                            # Get the most recent transaction date for each worker
-                            transaction_date = transaction.get("created_at") or transaction.get("period_end")
-                            if transaction_date:
-                                # Extract date part if it's a datetime string
-                                if isinstance(transaction_date, str):
-                                    transaction_date = transaction_date.split("T")[0] if "T" in transaction_date else transaction_date
-                                # Keep the most recent date for each worker
-                                if worker_id not in worker_payroll_dates or transaction_date > worker_payroll_dates[worker_id]:
-                                    worker_payroll_dates[worker_id] = transaction_date
-                
-                # Create department lookup for O(1) access
-                dept_lookup_names = {}
-                for dept in departments:
-                    if dept and isinstance(dept, dict):
-                        dept_id = dept.get("id")
-                        if dept_id:
-                            dept_lookup_names[dept_id] = dept.get("name", "Unknown")
-                
-                for worker in workers:
-                    if worker and isinstance(worker, dict) and worker.get("is_active", True):
-                        dept_id = worker.get("department_id")
-                        dept_name = dept_lookup_names.get(dept_id, "Unknown")
-                        
-                        # Get payroll date from transaction, or use worker created_at, or current date
-                        from datetime import datetime
-                        worker_id = worker.get("id")
-                        payroll_date = None
-                        
-                        if worker_id in worker_payroll_dates:
-                            payroll_date = worker_payroll_dates[worker_id]
-                        elif worker.get("created_at"):
-                            # Use worker creation date as fallback
-                            created_at = worker.get("created_at")
-                            if isinstance(created_at, str):
-                                payroll_date = created_at.split("T")[0] if "T" in created_at else created_at
-                            else:
-                                payroll_date = datetime.now().date().isoformat()
-                        else:
-                            payroll_date = datetime.now().date().isoformat()
-                        
-                        expenses_list.append({
-                            "type": "Payroll",
-                            "name": f"{worker.get('name', '')} {worker.get('surname', '')} ({dept_name})",
-                            "amount": worker.get("salary", 0),
-                            "date": payroll_date,
-                            "worker_id": worker_id,
-                            "expense_id": worker_id,
-                            "expense_type": "payroll"
-                        })
-                
-                for spending in spendings:
-                    if spending and isinstance(spending, dict):
-                        # Get date from spending (if available) or use current date
-                        from datetime import datetime
-                        expense_date = spending.get("created_at", datetime.now().isoformat())
-                        if isinstance(expense_date, str):
-                            # Extract date part if it's a datetime string
-                            expense_date = expense_date.split("T")[0] if "T" in expense_date else expense_date
-                        elif hasattr(expense_date, "date"):
-                            expense_date = expense_date.date().isoformat()
-                        else:
-                            expense_date = datetime.now().date().isoformat()
-                        
-                        expenses_list.append({
-                            "type": "Spending",
-                            "name": spending.get("name", ""),
-                            "amount": spending.get("amount", 0),
-                            "date": expense_date,
-                            "spending_id": spending.get("id"),
-                            "expense_id": spending.get("id"),
-                            "expense_type": "spending"
-                        })
-                
-                # Use Circle transactions if available and not empty, otherwise fallback to expenses_list
-                if circle_transactions and isinstance(circle_transactions, list) and len(circle_transactions) > 0:
-                    # Filter out None values from circle_transactions
-                    transactions_list = [tx for tx in circle_transactions if tx and isinstance(tx, dict)]
-                else:
-                    transactions_list = expenses_list
-                
-                return templates.TemplateResponse("dashboard.html", {
-                    "request": request,
-                    "total_workers": stats.get("total_workers", 0) if stats else 0,
-                    "total_departments": stats.get("total_departments", 0) if stats else 0,
-                    "total_payroll": stats.get("total_payroll", 0) if stats else 0,
-                    "total_spendings": stats.get("total_spendings", 0) if stats else 0,
-                    "total_expenses": stats.get("total_expenses", 0) if stats else 0,
-                    "total_revenue": stats.get("total_revenue", 0) if stats else 0,
-                    "profit": stats.get("profit", 0) if stats else 0,
-                    "wallet_balance": stats.get("wallet_balance") if stats else None,
-                    "dept_stats": dept_stats,
-                    "ceo_data": ceo_data,
-                    "revenues_list": revenues_list,
-                    "expenses_list": expenses_list,
-                    "circle_transactions": transactions_list
-                })
+                bundle = await client.get_page_bundle("dashboard")
+                return render_dashboard(request, DashboardView(bundle), bundle.get("versions"))
             except Exception as e:
                 # Log the error for debugging
                 import traceback
                 print(f"Error loading dashboard: {e}")
                 traceback.print_exc()
                 # If API fails, show empty dashboard
-                return templates.TemplateResponse("dashboard.html", {
-                    "request": request,
-                    "total_workers": 0,
-                    "total_departments": 0,
-                    "total_payroll": 0,
-                    "total_spendings": 0,
-                    "total_expenses": 0,
-                    "total_revenue": 0,
-                    "profit": 0,
-                    "wallet_balance": None,
-                    "dept_stats": [],
-                    "ceo_data": None,
-                    "revenues_list": [],
-                    "expenses_list": [],
-                    "circle_transactions": []
-                })
+                return render_dashboard(request, EMPTY_DASHBOARD)
         else:
-            # Fallback to in-memory
+            # Fallback to in-memory (never cached: no versions)
             org = fallback_data["organization"]
             total_workers = len(org["workers"])
             total_departments = len(org["departments"])
@@ -977,68 +885,47 @@ async def dashboard(request: Request):
                     "workers": workers_in_dept
                 })
             
-            revenues_list = org["revenues"]
+            today = datetime.now().date().isoformat()
             expenses_list = []
             for worker_id, worker in org["workers"].items():
-                dept_name = "Unknown"
-                for dept_id, dept in org["departments"].items():
-                    if dept_id == worker.get("department_id"):
-                        dept_name = dept.get("name", "Unknown")
-                        break
-                from datetime import datetime
+                dept_name = org["departments"].get(worker.get("department_id"), {}).get("name", "Unknown")
                 expenses_list.append({
                     "type": "Payroll",
                     "name": f"{worker.get('name', '')} {worker.get('surname', '')} ({dept_name})",
                     "amount": worker.get("salary", 0),
-                    "date": datetime.now().date().isoformat()
+                    "date": today
                 })
             
             for spending in org["spendings"]:
-                from datetime import datetime
                 expenses_list.append({
                     "type": "Spending",
                     "name": spending.get("name", ""),
                     "amount": spending.get("amount", 0),
-                    "date": datetime.now().date().isoformat()
+                    "date": today
                 })
             
-            return templates.TemplateResponse("dashboard.html", {
-                "request": request,
-                "total_workers": total_workers,
-                "total_departments": total_departments,
-                "total_payroll": total_payroll,
-                "total_spendings": total_spendings,
-                "total_expenses": total_expenses,
-                "total_revenue": total_revenue,
-                "profit": profit,
-                "wallet_balance": None,
-                "dept_stats": dept_stats,
-                "ceo_data": org["ceo"],
-                "revenues_list": revenues_list,
-                "expenses_list": expenses_list,
-                "circle_transactions": []
-            })
+            view = SimpleNamespace(
+                stat_values={
+                    "total_workers": total_workers,
+                    "total_departments": total_departments,
+                    "total_revenue": total_revenue,
+                    "total_expenses": total_expenses,
+                    "profit": profit,
+                    "wallet_balance": None,
+                },
+                ceo_data=org["ceo"],
+                dept_stats=dept_stats,
+                expenses_list=expenses_list,
+                table_expenses=expenses_list,
+                circle_transactions=[]
+            )
+            return render_dashboard(request, view)
     except Exception as e:
         # Log error but don't show it to user
         import traceback
         print(f"Error loading dashboard: {e}")
         traceback.print_exc()
-        return templates.TemplateResponse("dashboard.html", {
-            "request": request,
-            "total_workers": 0,
-            "total_departments": 0,
-            "total_payroll": 0,
-            "total_spendings": 0,
-            "total_expenses": 0,
-            "total_revenue": 0,
-            "profit": 0,
-            "wallet_balance": None,
-            "dept_stats": [],
-            "ceo_data": None,
-            "revenues_list": [],
-            "expenses_list": [],
-            "circle_transactions": []
-        })
+        return render_dashboard(request, EMPTY_DASHBOARD)
 
 
 if __name__ == "__main__":
@@ -21,6 +21,10 @@ fi
 echo "📦 Checking dependencies..."
 pip3 install -q -r requirements.txt
 
+# Apply database migrations
+echo "🗄️  Applying database migrations..."
+python3 migrate.py
+
 # Run backend
 echo "🚀 Starting on http://localhost:8000"
 python3 main.py